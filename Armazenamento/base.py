@@ -0,0 +1,66 @@
+# base.py
+# Interface comum das fontes de ocorrências. As páginas e a camada Dados/ocorrencias.py só
+# falam com ela; a fonte concreta (Google Sheets, Nextcloud ou SQLite local) é escolhida
+# na configuração. Todas usam o mesmo esquema: uma tabela/aba por categoria, com os mesmos
+# cabeçalhos da planilha (UG, ATIVO, DESLIGAMENTO, ...) e valores em texto.
+import pandas as pd
+
+class Armazenamento:
+    """Operações que as páginas precisam de uma fonte de ocorrências.
+
+    - carregar_ocorrencias(abas=None): DataFrame canônico (normalizado e tipado), com as
+      colunas 'Categoria' e 'Linha Planilha' (posição da linha na fonte). `abas` é uma dica
+      de quais abas mudaram desde a última carga.
+    - carregar_catalogos(): {aba de cadastro: DataFrame de texto}.
+    - incluir_linhas(aba, registros): acrescenta registros {cabeçalho: valor} e retorna a linha da primeira.
+    - atualizar_linha(aba, linha, id_esperado, alteracoes): grava {campo normalizado: texto} na linha,
+      se ela ainda for a ocorrência `id_esperado`. Retorna False quando a linha mudou de lugar.
+    - ultimo_delta(): ({aba: linhas alteradas}, ocorrências dessas linhas) da última carga, ou None
+      quando ela foi completa ou a fonte não sabe o que mudou.
+    """
+
+    nome = ''
+
+    def carregar_ocorrencias(self, abas=None):
+        raise NotImplementedError
+
+    def carregar_catalogos(self):
+        raise NotImplementedError
+
+    def incluir_linhas(self, aba, registros):
+        raise NotImplementedError
+
+    def atualizar_linha(self, aba, linha, id_esperado, alteracoes):
+        raise NotImplementedError
+
+    def ultimo_delta(self):
+        return None
+
+    def recarregar_completo(self):
+        """Descarta estados incrementais; a próxima carga lê tudo de novo."""
+
+def colunas_alteradas(cabecalho, alteracoes, mapa_renomear):
+    """{índice da coluna: texto} das colunas do cabeçalho cujo campo normalizado está em `alteracoes`."""
+    celulas = {}
+    for i, h in enumerate(cabecalho):
+        h_strip = h.replace('\xa0', '').strip()
+        campo = mapa_renomear.get(h_strip.upper(), h_strip)
+        if campo in alteracoes:
+            celulas[i] = alteracoes[campo]
+    return celulas
+
+def como_texto(df):
+    """DataFrame tipado (ex.: lido de um .xlsx) -> texto como a planilha entrega ('' para vazio)."""
+    texto = {}
+    for col in df.columns:
+        serie = df[col]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            texto[col] = serie.dt.strftime('%Y-%m-%d %H:%M:%S').fillna('')
+        elif pd.api.types.is_float_dtype(serie):
+            # 2.0 -> '2': inteiros que o Excel devolveu como float voltam como estavam na planilha
+            texto[col] = serie.map(lambda v: '' if pd.isna(v) else (str(int(v)) if float(v).is_integer() else str(v)))
+        else:
+            texto[col] = serie.map(lambda v: '' if v is None or (not isinstance(v, str) and pd.isna(v)) else str(v))
+    resultado = pd.DataFrame(texto, index=df.index)
+    resultado.columns = [str(c).replace('\xa0', '').strip() for c in df.columns]
+    return resultado
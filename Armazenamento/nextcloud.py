@@ -0,0 +1,115 @@
+# nextcloud.py
+# Fonte Nextcloud: um .xlsx com as mesmas abas da planilha Google (DESLIGAMENTOS,
+# EQUIPAMENTOS, DADOS, Usinas_Detalhado). Lê pelo conector (download condicional por ETag,
+# uma aba por vez) e grava a pasta de volta pelo caminho atômico do conector. As cargas pedem
+# só as colunas usadas (as do MAPA_RENOMEAR nas ocorrências); as escritas leem a aba inteira.
+# Cada escrita grava condicionada à versão que leu: se outra sessão salvou no meio, relê o
+# arquivo e refaz a alteração (até TENTATIVAS_CONFLITO vezes).
+import pandas as pd
+from Armazenamento.base import Armazenamento, colunas_alteradas, como_texto
+from Dados.sincronizacao import COLUNA_LINHA
+from Dados.escrita import FORMATO_DATA_HORA
+from Dados.instrumentacao import etapa
+from NextCloud.nextcloud_connector import (read_excel_from_nextcloud, write_excel_to_nextcloud, ler_para_escrita,
+                                           ConflitoEscrita)
+
+TENTATIVAS_CONFLITO = 3
+
+def _atribuir(df, coluna, posicoes, textos):
+    """Grava textos do app numa coluna tipada do .xlsx, convertendo para o tipo da coluna.
+
+    Texto que não converte (ex.: 'N/A' numa coluna numérica) fica como texto e a coluna vira object.
+    """
+    textos = pd.Series(textos, index=df.index[posicoes], dtype=object).replace('', None)
+    serie = df[coluna]
+    if serie.isna().all() and textos.notna().any():
+        # Coluna ainda vazia no .xlsx (sem tipo): vira data se os textos forem datas do app
+        datas = pd.to_datetime(textos, errors='coerce', format=FORMATO_DATA_HORA)
+        if datas.notna().sum() == textos.notna().sum():
+            df[coluna] = pd.Series(pd.NaT, index=df.index, dtype=datas.dtype)
+            serie = df[coluna]
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        valores = pd.to_datetime(textos, errors='coerce', format='mixed')
+    elif pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        valores = pd.to_numeric(textos, errors='coerce')
+    else:
+        valores = textos
+    if (valores.isna() & textos.notna()).any():
+        df[coluna] = serie.astype(object)
+        valores = valores.astype(object).where(valores.notna() | textos.isna(), textos)
+    df.loc[valores.index, coluna] = valores
+
+class ArmazenamentoNextcloud(Armazenamento):
+    nome = 'Nextcloud'
+
+    def __init__(self, abas_ocorrencias, abas_catalogo, normalizar, tipar, mapa_renomear, id_da_linha,
+                 colunas_catalogo=None):
+        self.abas_ocorrencias = list(abas_ocorrencias)
+        self.abas_catalogo = list(abas_catalogo)
+        self.normalizar = normalizar
+        self.tipar = tipar
+        self.mapa_renomear = mapa_renomear
+        self.id_da_linha = id_da_linha
+        self.colunas_catalogo = colunas_catalogo or {}
+
+    def _ler(self, abas, colunas=None):
+        lidas = read_excel_from_nextcloud(abas=abas, colunas=colunas)
+        if lidas is None:
+            raise FileNotFoundError("Arquivo do Nextcloud indisponível e sem cópia local.")
+        return lidas
+
+    def carregar_ocorrencias(self, abas=None):
+        frames = []
+        colunas = {aba: list(self.mapa_renomear) for aba in self.abas_ocorrencias}
+        for nome, df in self._ler(self.abas_ocorrencias, colunas).items():
+            texto = como_texto(df)
+            texto[COLUNA_LINHA] = pd.array(df.index + 2, dtype='int64')   # linha 1 = cabeçalho
+            frames.append(texto)
+        with etapa('normalizar'):
+            return self.tipar(self.normalizar(*frames))
+
+    def carregar_catalogos(self):
+        return {nome: como_texto(df) for nome, df in self._ler(self.abas_catalogo, self.colunas_catalogo).items()}
+
+    def _alterar(self, aba, alterar):
+        """Lê a pasta, aplica `alterar(df_aba)` -> (resultado, df_aba novo ou None para não gravar) e
+        grava condicionada à versão lida; em conflito, relê e refaz a alteração."""
+        for tentativa in range(TENTATIVAS_CONFLITO):
+            versao, todas = ler_para_escrita()
+            resultado, df_aba = alterar(todas[aba])
+            if df_aba is None:
+                return resultado
+            todas[aba] = df_aba
+            try:
+                if not write_excel_to_nextcloud(todas, versao):
+                    raise IOError("Falha ao gravar o arquivo no Nextcloud.")
+                return resultado
+            except ConflitoEscrita:
+                if tentativa == TENTATIVAS_CONFLITO - 1:
+                    raise
+
+    def incluir_linhas(self, aba, registros):
+        def alterar(df):
+            primeira = len(df) + 2
+            # Linhas vazias no fim, mantendo o tipo de cada coluna (datas continuam datas)
+            df = df.reset_index(drop=True).reindex(pd.RangeIndex(len(df) + len(registros)))
+            posicoes = list(range(primeira - 2, primeira - 2 + len(registros)))
+            for coluna in df.columns:
+                limpo = str(coluna).replace('\xa0', '').strip()
+                _atribuir(df, coluna, posicoes, [registro.get(limpo, '') for registro in registros])
+            return primeira, df
+        return self._alterar(aba, alterar)
+
+    def atualizar_linha(self, aba, linha, id_esperado, alteracoes):
+        def alterar(df):
+            posicao = linha - 2
+            if not 0 <= posicao < len(df):
+                return False, None
+            texto = como_texto(df.iloc[[posicao]])
+            # Conferido a cada tentativa: depois de um conflito a linha pode ter mudado
+            if self.id_da_linha(list(texto.columns), texto.iloc[0].tolist()) != id_esperado:
+                return False, None
+            for i, valor in colunas_alteradas(list(texto.columns), alteracoes, self.mapa_renomear).items():
+                _atribuir(df, df.columns[i], [posicao], [valor])
+            return True, df
+        return self._alterar(aba, alterar)
@@ -0,0 +1,69 @@
+# sheets.py
+# Fonte Google Sheets: leitura incremental (SincronizadorOcorrencias), edição por célula
+# com conferência do ID e inclusão pelo cursor de linhas livres (LayoutAba).
+import threading
+from Armazenamento.base import Armazenamento, colunas_alteradas
+from Dados.escrita import ler_linha, gravar_celulas, LayoutAba
+
+# Colunas que o app grava ao incluir; as demais (ex.: CLIENTE e SIGLA, calculadas por
+# fórmula a partir da UG) ficam como estão na planilha.
+COLUNAS_EDITAVEIS = [
+    "UG", "TIPO DE OCORRÊNCIA", "ATIVO", "NOME ATIVO", "OCORRÊNCIA",
+    "OPERADOR", "DESLIGAMENTO", "CLIENTE AVISADO", "ATENDIMENTO LOOP",
+    "ATENDIMENTO TERCEIROS", "NORMALIZAÇÃO", "DESCRIÇÃO", "PROTOCOLO", "OS",
+    "QUANTIDADE"
+]
+
+def montar_linha(registro, cabecalho):
+    """Valores na ordem do cabeçalho; None nas colunas que não são do app (a célula fica intacta)."""
+    linha = []
+    for col_header in cabecalho:
+        col_strip = col_header.strip()
+        linha.append(registro.get(col_strip, '') if col_strip in COLUNAS_EDITAVEIS else None)
+    return linha
+
+class ArmazenamentoSheets(Armazenamento):
+    nome = 'Google Sheets'
+
+    def __init__(self, abrir_planilha, sincronizador, mapa_renomear, id_da_linha):
+        self.abrir_planilha = abrir_planilha
+        self.sincronizador = sincronizador
+        self.mapa_renomear = mapa_renomear
+        self.id_da_linha = id_da_linha
+        self._layouts = {}
+        self._lock = threading.Lock()
+
+    def carregar_ocorrencias(self, abas=None):
+        return self.sincronizador.sincronizar(self.abrir_planilha(), abas)
+
+    def ultimo_delta(self):
+        return self.sincronizador.ultimo_delta
+
+    def carregar_catalogos(self):
+        return self.sincronizador.catalogos(self.abrir_planilha())
+
+    def layout(self, aba):
+        """Cabeçalho + cursor de inclusão da aba, semeado com as linhas já sincronizadas."""
+        with self._lock:
+            if aba not in self._layouts:
+                layout = LayoutAba(aba)
+                estado = self.sincronizador.estados.get(aba)
+                if estado is not None and estado.cabecalho:
+                    layout.semear(estado.cabecalho, estado.linhas)
+                self._layouts[aba] = layout
+            return self._layouts[aba]
+
+    def incluir_linhas(self, aba, registros):
+        return self.layout(aba).incluir(self.abrir_planilha(), registros, montar_linha)
+
+    def atualizar_linha(self, aba, linha, id_esperado, alteracoes):
+        workbook = self.abrir_planilha()
+        # Uma leitura pequena (cabeçalho + a linha) e uma escrita só com as células alteradas
+        cabecalho, valores = ler_linha(workbook, aba, linha)
+        if self.id_da_linha(cabecalho, valores) != id_esperado:
+            return False
+        gravar_celulas(workbook, aba, linha, colunas_alteradas(cabecalho, alteracoes, self.mapa_renomear))
+        return True
+
+    def recarregar_completo(self):
+        self.sincronizador.exigir_carga_completa()
@@ -0,0 +1,108 @@
+# sqlite_local.py
+# Fonte local em SQLite (biblioteca padrão), para desenvolver e testar sem credenciais nem rede.
+# Mesmo esquema da planilha: uma tabela por aba, com os mesmos cabeçalhos como colunas TEXT.
+# O rowid faz o papel do número da linha da planilha.
+#
+# Para popular a partir de um .xlsx exportado da planilha:
+#     python -m Armazenamento.sqlite_local --xlsx Ocorrencias.xlsx --banco ocorrencias.db
+import argparse
+import sqlite3
+import threading
+import pandas as pd
+from Armazenamento.base import Armazenamento, colunas_alteradas, como_texto
+from Dados.sincronizacao import COLUNA_LINHA
+from Dados.instrumentacao import etapa
+
+# Colunas consultadas com frequência (filtros e busca por período)
+COLUNAS_INDICE = ['UG', 'DESLIGAMENTO', 'NORMALIZAÇÃO']
+
+def _nome(identificador):
+    return '"' + str(identificador).replace('"', '""') + '"'
+
+class ArmazenamentoSQLite(Armazenamento):
+    nome = 'SQLite local'
+
+    def __init__(self, caminho, abas_ocorrencias, abas_catalogo, normalizar, tipar, mapa_renomear, id_da_linha):
+        self.caminho = caminho
+        self.abas_ocorrencias = list(abas_ocorrencias)
+        self.abas_catalogo = list(abas_catalogo)
+        self.normalizar = normalizar
+        self.tipar = tipar
+        self.mapa_renomear = mapa_renomear
+        self.id_da_linha = id_da_linha
+        # Uma conexão para o processo; o Streamlit chama de várias threads
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def _colunas(self, aba):
+        return [linha[1] for linha in self._conexao.execute(f'PRAGMA table_info({_nome(aba)})')]
+
+    def importar_abas(self, abas):
+        """Recria as tabelas a partir de {aba: DataFrame} (ex.: as abas de um .xlsx)."""
+        with self._lock, self._conexao:
+            for aba, df in abas.items():
+                texto = como_texto(df)
+                self._conexao.execute(f'DROP TABLE IF EXISTS {_nome(aba)}')
+                self._conexao.execute(f'CREATE TABLE {_nome(aba)} ('
+                                      + ', '.join(f'{_nome(c)} TEXT' for c in texto.columns) + ')')
+                for coluna in COLUNAS_INDICE:
+                    if coluna in texto.columns:
+                        self._conexao.execute(f'CREATE INDEX {_nome(f"idx_{aba}_{coluna}")} '
+                                              f'ON {_nome(aba)} ({_nome(coluna)})')
+                marcadores = ', '.join('?' * len(texto.columns))
+                self._conexao.executemany(f'INSERT INTO {_nome(aba)} VALUES ({marcadores})',
+                                          texto.itertuples(index=False, name=None))
+
+    def _ler(self, aba, com_linha=False):
+        with self._lock:
+            cursor = self._conexao.execute(f'SELECT {"rowid, " if com_linha else ""}* FROM {_nome(aba)} ORDER BY rowid')
+            colunas = [d[0] for d in cursor.description]
+            linhas = cursor.fetchall()
+        df = pd.DataFrame(linhas, columns=colunas, dtype=object).fillna('')
+        if com_linha:
+            df = df.rename(columns={colunas[0]: COLUNA_LINHA})
+            df[COLUNA_LINHA] = pd.array(df[COLUNA_LINHA].tolist(), dtype='int64')
+            # Mesma posição da coluna nas outras fontes: no fim
+            df = df[colunas[1:] + [COLUNA_LINHA]]
+        return df
+
+    def carregar_ocorrencias(self, abas=None):
+        frames = [self._ler(aba, com_linha=True) for aba in self.abas_ocorrencias]
+        with etapa('normalizar'):
+            return self.tipar(self.normalizar(*frames))
+
+    def carregar_catalogos(self):
+        return {aba: self._ler(aba) for aba in self.abas_catalogo}
+
+    def incluir_linhas(self, aba, registros):
+        with self._lock, self._conexao:
+            colunas = self._colunas(aba)
+            marcadores = ', '.join('?' * len(colunas))
+            primeira = None
+            for registro in registros:
+                cursor = self._conexao.execute(f'INSERT INTO {_nome(aba)} VALUES ({marcadores})',
+                                               [str(registro.get(c, '') or '') for c in colunas])
+                primeira = primeira or cursor.lastrowid
+            return primeira
+
+    def atualizar_linha(self, aba, linha, id_esperado, alteracoes):
+        with self._lock, self._conexao:
+            colunas = self._colunas(aba)
+            atual = self._conexao.execute(f'SELECT * FROM {_nome(aba)} WHERE rowid = ?', (linha,)).fetchone()
+            if atual is None or self.id_da_linha(colunas, ['' if v is None else v for v in atual]) != id_esperado:
+                return False
+            celulas = colunas_alteradas(colunas, alteracoes, self.mapa_renomear)
+            if celulas:
+                atribuicoes = ', '.join(f'{_nome(colunas[i])} = ?' for i in celulas)
+                self._conexao.execute(f'UPDATE {_nome(aba)} SET {atribuicoes} WHERE rowid = ?',
+                                      [*celulas.values(), linha])
+            return True
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Cria o banco SQLite local a partir de um .xlsx com as abas da planilha.')
+    parser.add_argument('--xlsx', required=True)
+    parser.add_argument('--banco', default='ocorrencias.db')
+    args = parser.parse_args()
+    abas = pd.read_excel(args.xlsx, sheet_name=None)
+    ArmazenamentoSQLite(args.banco, [], [], None, None, {}, None).importar_abas(abas)
+    print(f"{len(abas)} abas importadas para {args.banco}: {', '.join(abas)}")
@@ -0,0 +1,90 @@
+# cards.py
+# Geração vetorizada dos cards de ocorrência: cada página de cards vira um único
+# documento HTML (grade CSS), enviado ao navegador em um só elemento st.html.
+import pandas as pd
+
+TAMANHOS_PAGINA = [8, 16, 32, 64]
+COLUNAS_GRADE = 4
+
+ESTILO_GRADE = f"""
+<style>
+    .card-grid {{ display: grid; grid-template-columns: repeat({COLUNAS_GRADE}, minmax(0, 1fr)); gap: 15px; }}
+    .card-grid .card-container {{ margin-bottom: 0; }}
+</style>
+"""
+
+def _escapar(serie):
+    # Equivalente vetorizado de html.escape(str(valor))
+    return (serie.str.replace('&', '&amp;', regex=False)
+                 .str.replace('<', '&lt;', regex=False)
+                 .str.replace('>', '&gt;', regex=False)
+                 .str.replace('"', '&quot;', regex=False)
+                 .str.replace("'", '&#x27;', regex=False))
+
+def _texto(df, coluna, padrao=''):
+    if coluna not in df.columns:
+        return pd.Series(padrao, index=df.index, dtype=object)
+    valores = df[coluna].astype(object)
+    return _escapar(valores.where(valores.notna(), '').astype(str))
+
+def _data_hora(df, coluna):
+    if coluna not in df.columns:
+        vazio = pd.Series('', index=df.index, dtype=object)
+        return vazio, vazio
+    datas = df[coluna]
+    return datas.dt.strftime('%d/%m/%Y').fillna(''), datas.dt.strftime('%H:%M').fillna('')
+
+def _item(rotulo, valores):
+    return '<div class="card-item"><span class="card-label">' + rotulo + ':</span> ' + valores + '</div>'
+
+def gerar_html_cards(df):
+    """Retorna o HTML de todos os cards do DataFrame, em uma única grade."""
+    if df.empty:
+        return ''
+
+    data_ocor, hora_ocor = _data_hora(df, 'Desligamento')
+    data_ca, hora_ca = _data_hora(df, 'Cliente Avisado')
+    data_loop, hora_loop = _data_hora(df, 'Atendimento Loop')
+    data_terc, hora_terc = _data_hora(df, 'Atendimento Terceiros')
+    data_norm, hora_norm = _data_hora(df, 'Normalização')
+
+    quantidade_html = pd.Series('', index=df.index, dtype=object)
+    if 'Quantidade' in df.columns:
+        quantidade = pd.to_numeric(df['Quantidade'], errors='coerce')
+        mostrar = (df['Categoria'].astype(str) == 'EQUIPAMENTOS') & (quantidade > 0).fillna(False)
+        quantidade_html[mostrar] = _item('Quantidade', quantidade[mostrar].astype('int64').astype(str))
+
+    cards = ('<div class="card-container">'
+             + '<div class="card-title">' + _texto(df, 'UG', 'N/A') + '</div>'
+             + _item('Categoria', _texto(df, 'Categoria'))
+             + _item('Tipo de Ocorrência', _texto(df, 'Tipo de ocorrência'))
+             + _item('Ativo', _texto(df, 'Ativo'))
+             + _item('Nome do ativo', _texto(df, 'Nome Ativo'))
+             + _item('Ocorrência', _texto(df, 'Ocorrência'))
+             + _item('Operador', _texto(df, 'Operador'))
+             + quantidade_html
+             + '<br>'
+             + _item('Data da ocorrência', data_ocor)
+             + _item('Hora da ocorrência', hora_ocor)
+             + _item('Data cliente avisado', data_ca)
+             + _item('Hora cliente avisado', hora_ca)
+             + _item('Data do atendimento LOOP', data_loop)
+             + _item('Hora do atendimento LOOP', hora_loop)
+             + _item('Data do atendimento de terceiros', data_terc)
+             + _item('Hora do atendimento de terceiros', hora_terc)
+             + _item('Data de normalização', data_norm)
+             + _item('Hora de normalização', hora_norm)
+             + '<br>'
+             + _item('Descrição', _texto(df, 'Descrição').str.replace('\n', '<br>', regex=False))
+             + _item('Protocolo', _texto(df, 'Protocolo'))
+             + _item('OS', _texto(df, 'OS'))
+             + '</div>')
+    return ESTILO_GRADE + '<div class="card-grid">' + ''.join(cards.tolist()) + '</div>'
+
+def total_paginas(total_linhas, tamanho_pagina):
+    return max(1, -(-total_linhas // tamanho_pagina))
+
+def fatia_pagina(df, pagina, tamanho_pagina):
+    """Linhas da página (1-based) pedida."""
+    inicio = (pagina - 1) * tamanho_pagina
+    return df.iloc[inicio:inicio + tamanho_pagina]
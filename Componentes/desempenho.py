@@ -0,0 +1,103 @@
+# desempenho.py
+# Painel de desempenho opcional na barra lateral. Cada página chama iniciar_medicao() no
+# topo do script e painel_desempenho() no fim; com o painel desligado (e sem DESEMPENHO_LOG),
+# nada é medido.
+from contextlib import contextmanager
+import pandas as pd
+import streamlit as st
+from Dados import instrumentacao
+from GoogleSheets.sheets_connector import controle_cota
+from Dados.ocorrencias import cache_consultas
+
+CHAVE_PAINEL = 'painel_desempenho'
+ROTULOS_COTA = {
+    'leituras': 'Leituras enviadas',
+    'escritas': 'Escritas enviadas',
+    'coalescidas': 'Leituras coalescidas',
+    'esperas_cota': 'Esperas por cota',
+    'segundos_espera_cota': 'Segundos esperando cota',
+    'retentativas': 'Retentativas',
+    'respostas_429': 'Respostas 429',
+    'falhas': 'Falhas após retentativas',
+}
+ROTULOS_CONSULTAS = {
+    'acertos': 'Acertos',
+    'faltas': 'Faltas',
+    'descartes': 'Descartes (LRU)',
+    'entradas': 'Entradas guardadas',
+    'taxa_acertos': 'Taxa de acertos (%)',
+}
+
+def iniciar_medicao(pagina):
+    """Abre a medição deste rerun se o painel estiver ligado na sessão."""
+    return instrumentacao.iniciar(pagina, ativa=st.session_state.get(CHAVE_PAINEL, False))
+
+@contextmanager
+def medir_fragmento(pagina, nome):
+    """Mede um fragmento: etapa `nome` dentro do rerun completo ou, num rerun só do fragmento,
+    uma medição própria (vai para o log; o painel só é redesenhado no rerun completo)."""
+    if instrumentacao.atual() is not None:
+        with instrumentacao.etapa(nome):
+            yield
+        return
+    iniciar_medicao(f"{pagina} ({nome})")
+    try:
+        yield
+    finally:
+        instrumentacao.finalizar()
+
+def _tabela_etapas(medicao):
+    # Etapas aninhadas recuadas sob a etapa pai
+    return pd.DataFrame([{'Etapa': '\u2003' * caminho.count('/') + caminho.rsplit('/', 1)[-1], 'ms': ms}
+                         for caminho, ms in medicao.etapas], columns=['Etapa', 'ms'])
+
+def _mostrar_medicao(medicao):
+    st.caption(f"{medicao.nome}: {medicao.duracao_ms:.0f} ms no total, "
+               f"{sum(medicao.chamadas.values())} chamada(s) de API")
+    if medicao.etapas:
+        st.dataframe(_tabela_etapas(medicao), hide_index=True, use_container_width=True)
+    if medicao.chamadas:
+        st.dataframe(pd.DataFrame({'API': list(medicao.chamadas), 'Chamadas': list(medicao.chamadas.values())}),
+                     hide_index=True, use_container_width=True)
+    if medicao.caches:
+        st.dataframe(pd.DataFrame([{'Cache': nome, 'Acertos': a, 'Faltas': f} for nome, (a, f) in medicao.caches.items()]),
+                     hide_index=True, use_container_width=True)
+
+def _mostrar_cota():
+    metricas = controle_cota().metricas()
+    if not metricas['leituras'] and not metricas['escritas']:
+        return
+    # Acumulado do processo (todas as sessões e recargas em segundo plano)
+    with st.expander("Cota do Google Sheets"):
+        st.dataframe(pd.DataFrame({'Métrica': [ROTULOS_COTA[chave] for chave in metricas],
+                                   'Total': [round(valor, 1) for valor in metricas.values()]}),
+                     hide_index=True, use_container_width=True)
+
+def _mostrar_consultas():
+    metricas = cache_consultas().metricas()
+    if not metricas['acertos'] and not metricas['faltas']:
+        return
+    # Acumulado do processo: acertos vindos desta e de outras sessões
+    metricas['taxa_acertos'] *= 100
+    with st.expander("Cache de consultas"):
+        st.dataframe(pd.DataFrame({'Métrica': [ROTULOS_CONSULTAS[chave] for chave in ROTULOS_CONSULTAS],
+                                   'Total': [round(metricas[chave], 1) for chave in ROTULOS_CONSULTAS]}),
+                     hide_index=True, use_container_width=True)
+
+def painel_desempenho():
+    """Fecha a medição do rerun e, com o painel ligado, mostra etapas, chamadas de API, caches, consultas e cota."""
+    medicao = instrumentacao.finalizar()
+    with st.sidebar:
+        st.toggle("Painel de desempenho", key=CHAVE_PAINEL)
+        if not st.session_state.get(CHAVE_PAINEL):
+            return
+        if medicao is None:
+            st.caption("A medição começa no próximo rerun.")
+            return
+        with st.expander("Desempenho deste rerun", expanded=True):
+            _mostrar_medicao(medicao)
+        for nome, recarga in instrumentacao.ultimas_em_segundo_plano().items():
+            with st.expander(f"Última {nome} ({recarga.iniciado_em.strftime('%H:%M:%S')})"):
+                _mostrar_medicao(recarga)
+        _mostrar_consultas()
+        _mostrar_cota()
@@ -0,0 +1,95 @@
+# atualizador.py
+# Stale-while-revalidate: as páginas sempre leem a última versão em memória, enquanto uma
+# thread recarrega os dados periodicamente (ou quando uma escrita avisa que algo mudou)
+# e troca a versão de uma vez só.
+import threading
+import time
+from datetime import datetime
+from Dados.instrumentacao import etapa, medir_em_segundo_plano
+
+class VersaoDados:
+    """Uma versão imutável dos dados servidos. Trocada inteira, nunca alterada no lugar."""
+
+    def __init__(self, df, numero, carregado_em, origem):
+        self.df = df
+        self.numero = numero
+        self.carregado_em = carregado_em
+        self.origem = origem    # 'planilha' ou 'snapshot'
+
+    @property
+    def idade_segundos(self):
+        return (datetime.now() - self.carregado_em).total_seconds()
+
+class AtualizadorEmSegundoPlano:
+    """Mantém uma versão quente dos dados e a recarrega fora do caminho das páginas.
+
+    `carregar` é chamado sem argumentos e retorna o novo DataFrame. Recargas são
+    single-flight: chamadas simultâneas esperam a recarga em andamento em vez de
+    disparar outra.
+    """
+
+    def __init__(self, chave, carregar, intervalo):
+        self.chave = chave
+        self._carregar = carregar
+        self._intervalo = intervalo
+        self._atual = None
+        self._lock_recarga = threading.Lock()
+        self._lock_thread = threading.Lock()
+        self._evento = threading.Event()
+        self._thread = None
+        self.ultimo_erro = None
+
+    @property
+    def atual(self):
+        return self._atual
+
+    def semear(self, df, carregado_em, origem):
+        """Define uma versão inicial (ex.: snapshot em disco) sem consultar a fonte."""
+        if self._atual is None:
+            self._atual = VersaoDados(df, 0, carregado_em, origem)
+
+    def recarregar(self):
+        """Recarrega agora. Se outra recarga já estava em andamento, apenas aguarda o resultado dela."""
+        numero_visto = self._atual.numero if self._atual else -1
+        with self._lock_recarga:
+            if self._atual is not None and self._atual.numero != numero_visto:
+                return self._atual
+            try:
+                with etapa(f'recarga {self.chave}'):
+                    df = self._carregar()
+            except Exception as e:
+                self.ultimo_erro = e
+                raise
+            self.ultimo_erro = None
+            # Troca atômica: quem já pegou a versão anterior continua lendo a anterior.
+            self._atual = VersaoDados(df, numero_visto + 1, datetime.now(), 'planilha')
+            return self._atual
+
+    def obter(self):
+        """Versão atual; só bloqueia na primeira carga do processo."""
+        self.iniciar()
+        if self._atual is None:
+            return self.recarregar()
+        return self._atual
+
+    def sinalizar_alteracao(self):
+        """Pede uma recarga imediata em segundo plano (ex.: após uma escrita na planilha)."""
+        self.iniciar()
+        self._evento.set()
+
+    def iniciar(self):
+        if self._thread is None:
+            with self._lock_thread:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._laco, name=f"atualizador-{self.chave}", daemon=True)
+                    self._thread.start()
+
+    def _laco(self):
+        while True:
+            self._evento.wait(timeout=self._intervalo)
+            self._evento.clear()
+            try:
+                medir_em_segundo_plano(f'recarga de {self.chave}', self.recarregar)
+            except Exception:
+                # O erro fica em ultimo_erro; as páginas continuam servindo a versão anterior.
+                time.sleep(1)
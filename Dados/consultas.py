@@ -0,0 +1,150 @@
+# consultas.py
+# Visões da Página Principal (filtros + ordenação) em forma canônica e um cache LRU dos
+# resultados compartilhado entre as sessões.
+# Operadores diferentes costumam olhar a mesma visão ("mês atual, todos os clientes"): com a
+# consulta canônica como chave, a segunda sessão recebe as posições já filtradas e ordenadas
+# em vez de refazer as nove máscaras e a ordenação. A mesma consulta vira parâmetros de URL,
+# para compartilhar a visão por link.
+import threading
+from collections import OrderedDict
+import numpy as np
+from Dados.facetas import DIMENSOES_FILTRO
+from Dados.instrumentacao import registrar_cache
+
+# Dimensão -> parâmetro da URL
+PARAMETROS = {
+    'Mês': 'mes', 'Ano': 'ano', 'Dia': 'dia', 'Categoria': 'categoria', 'Cliente': 'cliente',
+    'UG': 'ug', 'Tipo de ocorrência': 'tipo', 'Ativo': 'ativo', 'Ocorrência': 'ocorrencia',
+}
+PARAMETRO_ORDEM = 'ordem'
+PARAMETRO_CRESCENTE = 'crescente'
+PARAMETRO_NENHUM = 'nenhum'   # dimensões com a seleção vazia (um parâmetro sem valores não sobrevive na URL)
+PARAMETROS_CONSULTA = set(PARAMETROS.values()) | {PARAMETRO_ORDEM, PARAMETRO_CRESCENTE, PARAMETRO_NENHUM}
+# Ordenações da lista (rótulo -> coluna) e as equivalentes: tempo desligado crescente = desligamento mais recente primeiro
+ORDENACOES = {
+    'Data do Desligamento': 'Desligamento',
+    'Tempo de Desligamento': 'Tempo em Segundos',
+    'UG': 'UG',
+    'Ativo': 'Ativo',
+}
+ORDEM_EQUIVALENTE = {'Tempo em Segundos': 'Desligamento'}
+ORDEM_PADRAO = ('Desligamento', False)
+
+MAX_CONSULTAS_EM_CACHE = 128
+
+class Consulta:
+    """Filtros e ordenação de uma visão. Igualdade e hash pelo conteúdo; dimensão ausente = todos os valores."""
+
+    __slots__ = ('filtros', 'ordenar_por', 'crescente', '_chave')
+
+    def __init__(self, filtros, ordenar_por=ORDEM_PADRAO[0], crescente=ORDEM_PADRAO[1]):
+        if ordenar_por in ORDEM_EQUIVALENTE:
+            ordenar_por, crescente = ORDEM_EQUIVALENTE[ordenar_por], not crescente
+        self.filtros = tuple((dim, tuple(sorted(set(filtros[dim]), key=str)))
+                             for dim in DIMENSOES_FILTRO if filtros.get(dim) is not None)
+        self.ordenar_por = ordenar_por
+        self.crescente = bool(crescente)
+        self._chave = (self.filtros, self.ordenar_por, self.crescente)
+
+    def __eq__(self, outra):
+        return isinstance(outra, Consulta) and self._chave == outra._chave
+
+    def __hash__(self):
+        return hash(self._chave)
+
+    def __repr__(self):
+        return f"Consulta({dict(self.filtros)!r}, {self.ordenar_por!r}, crescente={self.crescente})"
+
+    @classmethod
+    def de_selecao(cls, selecao, indice, ordenar_por=ORDEM_PADRAO[0], crescente=ORDEM_PADRAO[1]):
+        """Consulta a partir de {dimensão: valores marcados}. Valores ausentes dos dados não entram na
+        chave, e dimensões com todas as opções marcadas saem dela."""
+        filtros = {}
+        for dim, valores in selecao.items():
+            if dim not in indice.dimensoes:
+                continue
+            opcoes = indice.opcoes(dim)
+            if set(opcoes).issubset(valores):
+                continue
+            filtros[dim] = set(valores).intersection(opcoes)
+        return cls(filtros, ordenar_por, crescente)
+
+    def selecao(self, indice):
+        """{dimensão: valores} para IndiceFacetas.filtrar, com as dimensões ausentes completas."""
+        filtros = dict(self.filtros)
+        return {dim: list(filtros[dim]) if dim in filtros else indice.opcoes(dim)
+                for dim in DIMENSOES_FILTRO if dim in indice.dimensoes}
+
+    # --- URL ---
+    def como_parametros(self):
+        """{parâmetro: [valores em texto]} para st.query_params."""
+        parametros = {PARAMETROS[dim]: [str(v) for v in valores] for dim, valores in self.filtros if valores}
+        vazias = [PARAMETROS[dim] for dim, valores in self.filtros if not valores]
+        if vazias:
+            parametros[PARAMETRO_NENHUM] = vazias
+        if (self.ordenar_por, self.crescente) != ORDEM_PADRAO:
+            parametros[PARAMETRO_ORDEM] = [self.ordenar_por]
+            parametros[PARAMETRO_CRESCENTE] = ['1' if self.crescente else '0']
+        return parametros
+
+    @classmethod
+    def de_parametros(cls, parametros, indice):
+        """Consulta a partir de {parâmetro: [textos]}; valores que não existem nos dados são ignorados."""
+        vazias = set(parametros.get(PARAMETRO_NENHUM, []))
+        filtros = {}
+        for dim, nome in PARAMETROS.items():
+            if dim not in indice.dimensoes:
+                continue
+            if nome in vazias:
+                filtros[dim] = []
+            elif nome in parametros:
+                opcoes = {str(o): o for o in indice.opcoes(dim)}
+                filtros[dim] = [opcoes[t] for t in parametros[nome] if t in opcoes]
+        ordenar_por = (parametros.get(PARAMETRO_ORDEM) or [ORDEM_PADRAO[0]])[0]
+        if ordenar_por not in ORDENACOES.values():
+            ordenar_por = ORDEM_PADRAO[0]
+        crescente = (parametros.get(PARAMETRO_CRESCENTE) or ['0'])[0] == '1'
+        return cls(filtros, ordenar_por, crescente)
+
+def posicoes_desligadas(df, indice, consulta):
+    """Posições (iloc) das ocorrências abertas que atendem à consulta, na ordem pedida."""
+    mascara = indice.filtrar(consulta.selecao(indice)) & df['Normalização'].isna().to_numpy()
+    posicoes = np.flatnonzero(mascara)
+    chaves = df[consulta.ordenar_por].iloc[posicoes].reset_index(drop=True)
+    ordem = chaves.sort_values(ascending=consulta.crescente, kind='stable').index.to_numpy()
+    return posicoes[ordem]
+
+class CacheConsultas:
+    """LRU de resultados de consultas, compartilhado pelo processo, com contadores de acertos."""
+
+    def __init__(self, max_entradas=MAX_CONSULTAS_EM_CACHE):
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self._metricas = {'acertos': 0, 'faltas': 0, 'descartes': 0}
+
+    def obter(self, chave, calcular):
+        """Resultado guardado para `chave` ou, na falta, `calcular()` (fora do lock) guardado."""
+        with self._lock:
+            if chave in self._entradas:
+                self._entradas.move_to_end(chave)
+                self._metricas['acertos'] += 1
+                registrar_cache('consultas', acerto=True)
+                return self._entradas[chave]
+        resultado = calcular()
+        with self._lock:
+            self._metricas['faltas'] += 1
+            self._entradas[chave] = resultado
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self._metricas['descartes'] += 1
+        registrar_cache('consultas', acerto=False)
+        return resultado
+
+    def metricas(self):
+        with self._lock:
+            metricas = dict(self._metricas, entradas=len(self._entradas))
+        consultas = metricas['acertos'] + metricas['faltas']
+        metricas['taxa_acertos'] = metricas['acertos'] / consultas if consultas else 0.0
+        return metricas
@@ -0,0 +1,179 @@
+# cubo.py
+# Cubo diário de desligamentos: uma célula por dia × UG × Categoria × Tipo de ocorrência ×
+# Ocorrência, com o número de ocorrências, os segundos desligados das já normalizadas e as
+# abertas. Visões por mês ou ano agregam as células em vez de varrer todo o histórico.
+#
+# Manutenção incremental: o cubo guarda a contribuição de cada ocorrência (chave da linha de
+# origem, célula, valores e uma impressão digital). A cada nova versão dos dados só as linhas
+# novas, alteradas ou removidas mexem nas células (subtrai a contribuição antiga, soma a nova).
+# Quando a fonte informa quais linhas mudaram (sincronização incremental), só elas são
+# recalculadas; depois de uma carga completa ou sem contribuições salvas, a versão inteira é
+# comparada com a anterior.
+# Cubo e contribuições são gravados ao lado do snapshot e carregados na partida.
+#
+# O tempo das ocorrências abertas cresce com o relógio; em vez de segundos, a célula guarda a
+# soma dos instantes de desligamento delas ('Início abertas', segundos desde a época), e o
+# tempo até um instante T é Abertas * T - Início abertas.
+import threading
+import numpy as np
+import pandas as pd
+from Dados.sincronizacao import COLUNA_LINHA
+from Dados.snapshot import ARQUIVO_CUBO, ARQUIVO_CUBO_LINHAS, salvar_snapshot, carregar_snapshot
+
+DIMENSOES_CUBO = ['UG', 'Categoria', 'Tipo de ocorrência', 'Ocorrência']
+CHAVES_CELULA = ['Dia'] + DIMENSOES_CUBO
+MEDIDAS = ['Ocorrências', 'Segundos desligado', 'Abertas', 'Início abertas']
+FREQUENCIAS = {'Dia': 'D', 'Mês': 'M', 'Ano': 'Y'}
+
+# DataFrame de ocorrências sem linhas, para o cubo vazio
+_VAZIO = pd.DataFrame({'Desligamento': pd.Series(dtype='datetime64[ns]'),
+                       'Normalização': pd.Series(dtype='datetime64[ns]'),
+                       'Categoria': pd.Series(dtype=object),
+                       **{dim: pd.Series(dtype=object) for dim in DIMENSOES_CUBO if dim != 'Categoria'}})
+
+def _segundos_epoca(serie):
+    return serie.to_numpy(dtype='datetime64[s]').astype('int64')
+
+def chaves_origem(categorias, linhas):
+    """Hash de (Categoria, linha de origem): identifica a mesma ocorrência entre versões."""
+    origem = pd.DataFrame({'Categoria': np.asarray(categorias, dtype=object),
+                           'Linha': np.asarray(linhas, dtype='int64')})
+    return pd.util.hash_pandas_object(origem, index=False).to_numpy()
+
+def contribuicoes(df):
+    """Uma linha por ocorrência com data de desligamento: célula, medidas e impressão digital.
+
+    O índice é chaves_origem() de cada ocorrência.
+    """
+    df = df[df['Desligamento'].notna()]
+    origem = df[COLUNA_LINHA] if COLUNA_LINHA in df.columns else np.arange(len(df))
+    chave = chaves_origem(df['Categoria'], origem)
+
+    aberta = df['Normalização'].isna().to_numpy()
+    duracao = (df['Normalização'] - df['Desligamento']).dt.total_seconds().to_numpy(dtype='float64', na_value=0)
+    linhas = pd.DataFrame({
+        'Dia': df['Desligamento'].dt.normalize(),
+        **{dim: df[dim] for dim in DIMENSOES_CUBO},
+        'Ocorrências': 1,
+        'Segundos desligado': np.where(aberta, 0, np.clip(duracao, 0, None)).astype('int64'),
+        'Abertas': aberta.astype('int64'),
+        'Início abertas': np.where(aberta, _segundos_epoca(df['Desligamento']), 0),
+    })
+    linhas.index = pd.Index(chave, name='Chave')
+    linhas['Impressão'] = pd.util.hash_pandas_object(linhas, index=False).to_numpy()
+    return linhas
+
+def agregar(linhas):
+    """Soma as medidas das contribuições por célula."""
+    celulas = linhas.groupby(CHAVES_CELULA, observed=True, sort=False)[MEDIDAS].sum()
+    celulas.index = _indice_celulas(celulas.index)
+    return celulas
+
+def _indice_celulas(indice):
+    # Níveis sem categorias: células de versões com conjuntos de categorias diferentes se alinham pelo valor
+    return pd.MultiIndex.from_arrays(
+        [np.asarray(indice.get_level_values(nivel), dtype='datetime64[ns]' if nivel == 'Dia' else object)
+         for nivel in CHAVES_CELULA], names=CHAVES_CELULA)
+
+def agregar_celulas_salvas(celulas):
+    """Células lidas do Parquet -> mesmo formato de agregar()."""
+    celulas = celulas.set_index(CHAVES_CELULA)[MEDIDAS]
+    celulas.index = _indice_celulas(celulas.index)
+    return celulas
+
+class CuboDiario:
+    """Cubo diário de desligamentos mantido por diferença entre versões dos dados."""
+
+    def __init__(self, celulas=None, linhas=None):
+        self.celulas = celulas if celulas is not None else agregar(contribuicoes(_VAZIO))
+        self._linhas = linhas
+        self._lock = threading.Lock()
+
+    def atualizar(self, df, delta=None):
+        """Leva o cubo à versão `df`. Retorna quantas contribuições entraram ou saíram.
+
+        `delta` = ({aba: linhas alteradas}, ocorrências dessas linhas em `df`), como em
+        Armazenamento.ultimo_delta(): só essas linhas são recalculadas.
+        """
+        with self._lock:
+            anteriores = self._linhas
+            if delta is None or anteriores is None or not anteriores.index.is_unique:
+                return self._atualizar_completo(df)
+
+            alteradas, df_alteradas = delta
+            pares = [(aba, linha) for aba, linhas in alteradas.items() for linha in linhas]
+            if not pares:
+                return 0
+            categorias, linhas = zip(*pares)
+            posicoes = anteriores.index.get_indexer(chaves_origem(categorias, linhas))
+            saem = np.zeros(len(anteriores), dtype=bool)
+            saem[posicoes[posicoes >= 0]] = True
+            entram = contribuicoes(df_alteradas)
+            if not entram.index.is_unique:
+                return self._atualizar_completo(df)
+            # As chaves que entram são das linhas alteradas, que acabaram de sair: o índice continua único
+            saindo = anteriores[saem]
+            self._linhas = pd.concat([anteriores[~saem] if saem.any() else anteriores, entram])
+            return self._aplicar(entram, saindo)
+
+    def _atualizar_completo(self, df):
+        """Compara todas as contribuições de `df` com as guardadas (ou monta o cubo do zero)."""
+        novas = contribuicoes(df)
+        anteriores = self._linhas
+        if anteriores is None or not anteriores.index.is_unique or not novas.index.is_unique:
+            self.celulas, self._linhas = agregar(novas), novas
+            return len(novas)
+
+        posicoes = anteriores.index.get_indexer(novas.index)
+        iguais = posicoes >= 0
+        iguais[iguais] = (anteriores['Impressão'].to_numpy()[posicoes[iguais]] ==
+                          novas['Impressão'].to_numpy()[iguais])
+        saem = np.ones(len(anteriores), dtype=bool)
+        saem[posicoes[iguais]] = False
+        self._linhas = novas
+        return self._aplicar(novas[~iguais], anteriores[saem])
+
+    def _aplicar(self, entram, saindo):
+        """Soma as contribuições que entram e subtrai as que saem, mexendo só nas células tocadas."""
+        if entram.empty and saindo.empty:
+            return 0
+        delta = agregar(entram).sub(agregar(saindo), fill_value=0).astype('int64')
+        # Soma nas existentes, acrescenta as novas e tira as que zeraram
+        posicoes = self.celulas.index.get_indexer(delta.index)
+        existentes = posicoes >= 0
+        valores = self.celulas.to_numpy(copy=True)
+        valores[posicoes[existentes]] += delta.to_numpy()[existentes]
+        celulas = pd.DataFrame(valores, index=self.celulas.index, columns=MEDIDAS)
+        if not existentes.all():
+            celulas = pd.concat([celulas, delta[~existentes]])
+        self.celulas = celulas[celulas['Ocorrências'].to_numpy() != 0]
+        return len(entram) + len(saindo)
+
+    def resumo(self, frequencia='Mês', dimensao=None, agora=None):
+        """Ocorrências, horas desligado (abertas contadas até `agora`) e abertas por período (e dimensão)."""
+        celulas = self.celulas.reset_index()
+        periodo = celulas['Dia'].dt.to_period(FREQUENCIAS[frequencia]).dt.to_timestamp().rename('Período')
+        grupos = [periodo] + ([celulas[dimensao]] if dimensao else [])
+        soma = celulas[MEDIDAS].groupby(grupos, sort=True).sum()
+        agora_s = _segundos_epoca(pd.Series([pd.Timestamp(agora or pd.Timestamp.now())]))[0]
+        segundos = soma['Segundos desligado'] + soma['Abertas'] * agora_s - soma['Início abertas']
+        return pd.DataFrame({'Ocorrências': soma['Ocorrências'], 'Horas desligado': segundos / 3600,
+                             'Abertas': soma['Abertas']})
+
+    # --- Persistência (ao lado do snapshot) ---
+    def salvar(self, caminho_celulas=ARQUIVO_CUBO, caminho_linhas=ARQUIVO_CUBO_LINHAS):
+        with self._lock:
+            celulas, linhas = self.celulas, self._linhas
+        if linhas is None:
+            return
+        salvar_snapshot(linhas.reset_index(), caminho_linhas)
+        salvar_snapshot(celulas.reset_index(), caminho_celulas)
+
+    @classmethod
+    def carregar(cls, caminho_celulas=ARQUIVO_CUBO, caminho_linhas=ARQUIVO_CUBO_LINHAS):
+        """Cubo gravado por salvar(), ou vazio (a primeira atualização monta tudo)."""
+        celulas, _ = carregar_snapshot(caminho_celulas)
+        linhas, _ = carregar_snapshot(caminho_linhas)
+        if celulas is None or linhas is None:
+            return cls()
+        return cls(agregar_celulas_salvas(celulas), linhas.set_index('Chave'))
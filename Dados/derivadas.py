@@ -0,0 +1,58 @@
+# derivadas.py
+# Colunas derivadas calculadas de forma vetorizada (sem apply linha a linha).
+import re
+import numpy as np
+import pandas as pd
+
+_PARTES_ISO = {'Y': (0, 4), 'm': (5, 7), 'd': (8, 10), 'H': (11, 13), 'M': (14, 16), 'S': (17, 19)}
+
+def formatar_datas(serie, formato):
+    """Equivalente de serie.dt.strftime(formato) para %Y %m %d %H %M %S (NaT -> NaN).
+
+    O strftime do pandas formata valor a valor em Python; aqui a conversão para texto
+    é feita de uma vez pelo numpy (ISO 8601) e o formato é montado por fatias.
+    """
+    iso = pd.Series(np.datetime_as_string(serie.to_numpy(dtype='datetime64[s]'), unit='s'), index=serie.index)
+    resultado = ''
+    for token in re.split(r'(%[YmdHMS])', formato):
+        if not token:
+            continue
+        if len(token) == 2 and token[0] == '%':
+            inicio, fim = _PARTES_ISO[token[1]]
+            resultado = resultado + iso.str[inicio:fim]
+        else:
+            resultado = resultado + token
+    return resultado.where(serie.notna())
+
+def texto_maiusculo(serie):
+    """serie.astype(str).str.upper() calculado só sobre os valores distintos e espalhado pelos códigos."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy()
+        distintos = np.append(serie.cat.categories.astype(str).str.upper().to_numpy(dtype=object), 'NAN')
+    else:
+        codigos, valores = pd.factorize(serie.astype(str))
+        distintos = pd.Index(valores).str.upper().to_numpy(dtype=object)
+    return pd.Series(distintos[codigos], index=serie.index)
+
+def id_unico(df):
+    """Identificador estável de uma ocorrência: UG|ATIVO|OCORRÊNCIA|Desligamento."""
+    return (texto_maiusculo(df['UG']) + "|" +
+            texto_maiusculo(df['Ativo']) + "|" +
+            texto_maiusculo(df['Ocorrência']) + "|" +
+            df['Desligamento'].astype(str))
+
+def coluna_display(df):
+    """Rótulo da ocorrência no seletor de edição."""
+    return (df['UG'].astype(str) + " | " +
+            df['Ativo'].astype(str) + " | " +
+            df['Nome Ativo'].astype(str) + " | " +
+            df['Ocorrência'].astype(str) + " | " +
+            formatar_datas(df['Desligamento'], '%d/%m/%Y %H:%M'))
+
+def formatar_duracao(segundos):
+    """Segundos inteiros -> 'Xd Yh Zm', com aritmética inteira sobre a coluna inteira."""
+    segundos = segundos.astype('int64')
+    dias = (segundos // 86400).astype(str)
+    horas = ((segundos % 86400) // 3600).astype(str)
+    minutos = ((segundos % 3600) // 60).astype(str)
+    return dias + "d " + horas + "h " + minutos + "m"
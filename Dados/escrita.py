@@ -0,0 +1,142 @@
+# escrita.py
+# Caminho de escrita das ocorrências na planilha.
+# O DataFrame canônico já sabe de qual aba e linha veio cada ocorrência ('Categoria' e
+# 'Linha Planilha'); a edição lê só o cabeçalho e a linha alvo para conferir o ID e
+# grava só as células que mudaram, em vez de baixar a aba inteira e reescrever a linha toda.
+import re
+import threading
+from datetime import datetime
+import pandas as pd
+from gspread.utils import rowcol_to_a1
+from Dados.sincronizacao import COLUNA_LINHA
+
+FORMATO_DATA_HORA = '%Y-%m-%d %H:%M:%S'
+
+def indice_linhas(df):
+    """ID_Unico -> (posição no DataFrame, aba, linha da planilha). Em IDs repetidos vale o primeiro."""
+    if df.empty or 'ID_Unico' not in df.columns or COLUNA_LINHA not in df.columns:
+        return {}
+    unicos = ~df['ID_Unico'].duplicated()
+    posicoes = unicos.to_numpy().nonzero()[0]
+    return {id_: (int(pos), str(aba), int(linha))
+            for id_, pos, aba, linha in zip(df['ID_Unico'].to_numpy()[posicoes], posicoes,
+                                            df['Categoria'].to_numpy()[posicoes],
+                                            df[COLUNA_LINHA].to_numpy()[posicoes])}
+
+def ler_linha(workbook, aba, linha):
+    """Lê o cabeçalho e uma linha da aba numa única requisição. Retorna (cabecalho, valores)."""
+    resposta = workbook.values_batch_get([f"'{aba}'!1:1", f"'{aba}'!{linha}:{linha}"])
+    cabecalho, valores = [(vr.get('values') or [[]])[0] for vr in resposta.get('valueRanges', [])]
+    # A API omite as células vazias do fim da linha
+    return cabecalho, valores[:len(cabecalho)] + [''] * (len(cabecalho) - len(valores))
+
+def texto_celula(valor):
+    """Texto gravado na planilha para um valor do DataFrame ou do formulário."""
+    # Vazios (None, NaN, NaT, <NA>) como ''; NaT é testado antes porque também passa por datetime
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return ''
+    if isinstance(valor, (datetime, pd.Timestamp)):
+        return valor.strftime(FORMATO_DATA_HORA)
+    # Quantidade (Int64) e demais valores tipados voltam como texto
+    return valor if isinstance(valor, str) else str(valor)
+
+def campos_alterados(original, atualizado):
+    """{campo: novo texto} só dos campos cujo texto na planilha mudaria."""
+    return {campo: texto_celula(valor) for campo, valor in atualizado.items()
+            if texto_celula(valor) != texto_celula(original.get(campo))}
+
+def gravar_celulas(workbook, aba, linha, celulas):
+    """Grava {índice da coluna (0-based): texto} numa única requisição values:batchUpdate.
+
+    Colunas vizinhas vão no mesmo range; as demais células da linha não são reenviadas.
+    """
+    faixas = []
+    for coluna in sorted(celulas):
+        if faixas and coluna == faixas[-1][0] + len(faixas[-1][1]):
+            faixas[-1][1].append(celulas[coluna])
+        else:
+            faixas.append((coluna, [celulas[coluna]]))
+    workbook.values_batch_update({
+        'valueInputOption': 'USER_ENTERED',
+        'data': [{'range': f"'{aba}'!{rowcol_to_a1(linha, coluna + 1)}", 'values': [valores]}
+                 for coluna, valores in faixas],
+    })
+
+def _bloco_livre(valores_chave, quantidade):
+    """Primeira linha (1-based, depois do cabeçalho) a partir da qual `quantidade` linhas têm a coluna-chave vazia."""
+    vazias = 0
+    for i, valor in enumerate(valores_chave[1:], start=2):
+        vazias = vazias + 1 if valor == '' else 0
+        if vazias == quantidade:
+            return i - quantidade + 1
+    # Sem bloco no meio: continua o bloco vazio do fim (se houver) ou começa depois da última linha
+    return len(valores_chave) + 1 - vazias
+
+class LayoutAba:
+    """Cabeçalho e cursor de inclusão de uma aba, mantidos entre envios do formulário.
+
+    O cursor aponta para a próxima linha livre (coluna-chave vazia) e avança localmente a
+    cada inclusão. Antes de gravar, uma leitura mínima (cabeçalho + as células-chave das
+    linhas alvo) confere que nada mudou; só se mudou a coluna-chave inteira é relida.
+    """
+
+    def __init__(self, nome, coluna_chave='UG'):
+        self.nome = nome
+        self.coluna_chave = coluna_chave
+        self.cabecalho = None
+        self.proxima_linha = None
+        self._lock = threading.Lock()
+
+    def _definir(self, cabecalho, valores_chave, quantidade=1):
+        self.cabecalho = cabecalho
+        self.proxima_linha = _bloco_livre(valores_chave, quantidade)
+
+    def semear(self, cabecalho, linhas):
+        """Monta o layout a partir das linhas já sincronizadas (sem requisição)."""
+        colunas = [h.replace('\xa0', '').strip() for h in cabecalho]
+        if self.cabecalho is None and self.coluna_chave in colunas:
+            idx = colunas.index(self.coluna_chave)
+            self._definir(cabecalho, [cabecalho[idx]] + [linha[idx] for linha in linhas])
+
+    def _letra_chave(self):
+        colunas = [h.replace('\xa0', '').strip() for h in self.cabecalho]
+        return re.sub(r'\d', '', rowcol_to_a1(1, colunas.index(self.coluna_chave) + 1))
+
+    def _ler(self, workbook, faixa_chave):
+        """Cabeçalho e valores da coluna-chave numa faixa, numa única requisição batchGet."""
+        resposta = workbook.values_batch_get([f"'{self.nome}'!1:1", f"'{self.nome}'!{faixa_chave}"])
+        cabecalho, celulas = [vr.get('values', []) for vr in resposta.get('valueRanges', [])]
+        # Uma lista por linha; célula vazia (e linhas vazias do fim) não vêm na resposta
+        return (cabecalho[0] if cabecalho else []), [linha[0] if linha else '' for linha in celulas]
+
+    def _reler(self, workbook, quantidade):
+        # Cabeçalho primeiro (a coluna-chave pode ter mudado de lugar), depois a coluna-chave inteira
+        cabecalho, _ = self._ler(workbook, 'A1')
+        self.cabecalho = cabecalho
+        letra = self._letra_chave()
+        _, valores = self._ler(workbook, f'{letra}:{letra}')
+        self._definir(cabecalho, valores, quantidade)
+
+    def _conferir(self, workbook, quantidade):
+        """Confere o cabeçalho e se as linhas do cursor continuam livres (uma leitura pequena)."""
+        letra = self._letra_chave()
+        inicio, fim = self.proxima_linha, self.proxima_linha + quantidade - 1
+        cabecalho, celulas = self._ler(workbook, f'{letra}{inicio}:{letra}{fim}')
+        return cabecalho == self.cabecalho and not any(celulas)
+
+    def incluir(self, workbook, registros, montar_linha):
+        """Grava os registros nas próximas linhas livres e retorna a primeira linha usada.
+
+        `montar_linha(registro, cabecalho)` devolve a lista de valores na ordem das colunas
+        (None deixa a célula como está, preservando fórmulas).
+        """
+        quantidade = len(registros)
+        with self._lock:
+            if self.cabecalho is None or not self._conferir(workbook, quantidade):
+                self._reler(workbook, quantidade)
+            inicio = self.proxima_linha
+            linhas = [montar_linha(registro, self.cabecalho) for registro in registros]
+            workbook.values_update(f"'{self.nome}'!A{inicio}", params={'valueInputOption': 'USER_ENTERED'},
+                                   body={'values': linhas})
+            self.proxima_linha = inicio + quantidade
+            return inicio
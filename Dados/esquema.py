@@ -0,0 +1,65 @@
+# esquema.py
+# Tipos do DataFrame canônico de ocorrências. As dimensões de baixa cardinalidade viram
+# category (menos memória e isin mais rápido), as datas são lidas com formato explícito
+# e a quantidade vira inteiro anulável.
+import numpy as np
+import pandas as pd
+
+COLUNAS_CATEGORICAS = ['Categoria', 'Cliente', 'UG', 'Sigla', 'Tipo de ocorrência', 'Ativo',
+                       'Ocorrência', 'Operador']
+
+# Formato gravado pelo app (ver páginas de adicionar/editar); o que não casar cai na inferência do pandas.
+FORMATOS_DATA = ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M']
+
+TIPOS_INTEIROS = {'Ano': 'int16', 'Dia': 'int8', 'Linha Planilha': 'int32'}
+
+def converter_datas(serie):
+    """Converte texto em datetime tentando os formatos conhecidos antes de inferir valor a valor."""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    texto = serie.astype(str).str.strip()
+    resultado = pd.Series(pd.NaT, index=serie.index, dtype='datetime64[ns]')
+    pendentes = texto.ne('') & texto.ne('nan') & texto.ne('None')
+    for formato in FORMATOS_DATA:
+        if not pendentes.any():
+            break
+        resultado[pendentes] = pd.to_datetime(texto[pendentes], format=formato, errors='coerce')
+        pendentes &= resultado.isna()
+    if pendentes.any():
+        # Datas digitadas à mão na planilha em outro formato
+        resultado[pendentes] = pd.to_datetime(texto[pendentes], errors='coerce', format='mixed')
+    return resultado
+
+def converter_quantidade(serie):
+    """Texto -> Int64 (inteiro anulável). Aceita vírgula decimal e trunca como o card fazia."""
+    numeros = pd.to_numeric(serie.astype(str).str.replace(',', '.', regex=False).str.strip(), errors='coerce')
+    return pd.Series(np.trunc(numeros), index=serie.index).astype('Int64')
+
+def aplicar_esquema(df, meses_cronologicos=None):
+    """Aplica os tipos compactos ao DataFrame normalizado (retorna o mesmo objeto)."""
+    for col in COLUNAS_CATEGORICAS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    if 'Mês' in df.columns:
+        if meses_cronologicos:
+            df['Mês'] = pd.Categorical(df['Mês'], categories=meses_cronologicos, ordered=True)
+        else:
+            df['Mês'] = df['Mês'].astype('category')
+    if 'Quantidade' in df.columns and not isinstance(df['Quantidade'].dtype, pd.Int64Dtype):
+        df['Quantidade'] = converter_quantidade(df['Quantidade'])
+    for col, tipo in TIPOS_INTEIROS.items():
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = df[col].astype(tipo)
+    # Texto livre (ex.: 'Nome Ativo'): o concat da mescla incremental com um quadro vazio devolve
+    # object; volta para str, como na carga completa.
+    for col in df.columns[df.dtypes == object]:
+        if pd.api.types.infer_dtype(df[col], skipna=True) == 'string':
+            df[col] = df[col].astype('str')
+    return df
+
+def relatorio_memoria(df):
+    """Memória por coluna (bytes, incluindo o conteúdo das strings), da maior para a menor."""
+    uso = df.memory_usage(deep=True, index=False)
+    return (pd.DataFrame({'Coluna': uso.index, 'Tipo': [str(df[c].dtype) for c in uso.index], 'Bytes': uso.values})
+              .sort_values('Bytes', ascending=False)
+              .reset_index(drop=True))
@@ -0,0 +1,82 @@
+# facetas.py
+# Índice de facetas do painel de filtros, construído uma vez por versão dos dados.
+# Para cada dimensão guarda os códigos das linhas, a lista de posições de cada valor e a
+# lista de opções já ordenada. Filtrar vira interseção de máscaras booleanas (bitmaps)
+# sobre arrays numpy, sem isin nem unique() sobre o DataFrame a cada rerun.
+import numpy as np
+import pandas as pd
+
+DIMENSOES_FILTRO = ['Mês', 'Ano', 'Dia', 'Categoria', 'Cliente', 'UG', 'Tipo de ocorrência', 'Ativo', 'Ocorrência']
+
+class FacetaDimensao:
+    """Códigos, posições e opções ordenadas de uma dimensão."""
+
+    def __init__(self, serie):
+        categorica = serie if isinstance(serie.dtype, pd.CategoricalDtype) else serie.astype('category')
+        self.codigos = categorica.cat.codes.to_numpy()
+        self.categorias = categorica.cat.categories.tolist()
+        self.codigo_de = {valor: i for i, valor in enumerate(self.categorias)}
+
+        validos = self.codigos >= 0
+        self.tem_vazios = not validos.all()
+        self.contagens = np.bincount(self.codigos[validos], minlength=len(self.categorias))
+        # Posições das linhas de cada valor: um argsort estável partido pelas contagens
+        ordem = np.argsort(self.codigos, kind='stable')[np.count_nonzero(~validos):]
+        self.posicoes = np.split(ordem.astype(np.int32), np.cumsum(self.contagens)[:-1])
+        self.opcoes = sorted(self.categorias[i] for i in np.flatnonzero(self.contagens))
+
+    def codigos_de(self, valores):
+        return [self.codigo_de[v] for v in valores if v in self.codigo_de]
+
+    def mascara(self, valores, tamanho):
+        """Bitmap das linhas cujo valor está em `valores`."""
+        codigos = self.codigos_de(valores)
+        mascara = np.zeros(tamanho, dtype=bool)
+        if not codigos:
+            return mascara
+        selecionadas = int(self.contagens[codigos].sum())
+        if selecionadas < tamanho // 8:
+            # Poucas linhas: marca diretamente as posições de cada valor
+            for codigo in codigos:
+                mascara[self.posicoes[codigo]] = True
+        else:
+            # Muitas linhas: tabela de consulta por código (um gather sobre o array de códigos)
+            tabela = np.zeros(len(self.categorias) + 1, dtype=bool)
+            tabela[codigos] = True
+            mascara = tabela[self.codigos]   # código -1 (vazio) cai na última posição, sempre False
+        return mascara
+
+class IndiceFacetas:
+    """Índice de todas as dimensões de filtro de um DataFrame."""
+
+    def __init__(self, df, dimensoes=DIMENSOES_FILTRO):
+        self.tamanho = len(df)
+        self.dimensoes = {dim: FacetaDimensao(df[dim]) for dim in dimensoes if dim in df.columns}
+
+    def opcoes(self, dim):
+        """Valores presentes na dimensão, já ordenados."""
+        return list(self.dimensoes[dim].opcoes)
+
+    def mascara(self, dim, valores):
+        return self.dimensoes[dim].mascara(valores, self.tamanho)
+
+    def filtrar(self, selecoes):
+        """Interseção dos bitmaps de cada dimensão. `selecoes` = {dimensão: valores selecionados}."""
+        mascara = np.ones(self.tamanho, dtype=bool)
+        for dim, valores in selecoes.items():
+            faceta = self.dimensoes[dim]
+            valores = list(valores)
+            # Todas as opções marcadas (e nenhuma linha vazia): a dimensão não restringe nada
+            if not faceta.tem_vazios and set(faceta.opcoes).issubset(valores):
+                continue
+            mascara &= faceta.mascara(valores, self.tamanho)
+            if not mascara.any():
+                break
+        return mascara
+
+    def opcoes_onde(self, dim, mascara):
+        """Opções ordenadas da dimensão considerando só as linhas marcadas na máscara."""
+        faceta = self.dimensoes[dim]
+        codigos = faceta.codigos[mascara]
+        presentes = np.bincount(codigos[codigos >= 0], minlength=len(faceta.categorias))
+        return sorted(faceta.categorias[i] for i in np.flatnonzero(presentes))
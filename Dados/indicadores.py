@@ -0,0 +1,108 @@
+# indicadores.py
+# Indicadores de tempo das ocorrências (aviso ao cliente, primeiro atendimento e normalização),
+# calculados uma vez por versão dos dados sobre o DataFrame canônico.
+# Na construção ficam prontos os tempos em horas (um array por indicador), os percentis
+# gerais, a distribuição por faixa e a tendência mensal. Os agrupamentos por dimensão são
+# calculados na primeira vez que a dimensão é pedida (um groupby sobre os códigos da
+# categoria para todos os indicadores de uma vez) e guardados no próprio objeto: trocar a
+# dimensão na página depois disso é só uma consulta a um dicionário.
+import threading
+import numpy as np
+import pandas as pd
+
+# Indicador -> colunas de fim (com mais de uma, vale a primeira que aconteceu)
+INDICADORES = {
+    'Tempo até aviso': ['Cliente Avisado'],
+    'Tempo até atendimento': ['Atendimento Loop', 'Atendimento Terceiros'],
+    'Tempo até normalização': ['Normalização'],
+}
+DIMENSOES_AGRUPAMENTO = ['UG', 'Cliente', 'Tipo de ocorrência', 'Ativo']
+PERCENTIS = {'P50': 0.5, 'P75': 0.75, 'P90': 0.9, 'P95': 0.95}
+FAIXAS_HORAS = [0, 0.25, 0.5, 1, 2, 4, 8, 24, 72, 168, np.inf]
+ROTULOS_FAIXAS = ['< 15 min', '15-30 min', '30 min-1 h', '1-2 h', '2-4 h', '4-8 h', '8-24 h',
+                  '1-3 dias', '3-7 dias', '> 7 dias']
+
+def horas_entre(inicio, fim):
+    """Horas de `inicio` a `fim` (float64); NaN sem registro ou com fim antes do início."""
+    horas = (fim - inicio).dt.total_seconds().to_numpy(dtype='float64', na_value=np.nan) / 3600
+    horas[horas < 0] = np.nan
+    return horas
+
+def _codigos(serie):
+    categorica = serie if isinstance(serie.dtype, pd.CategoricalDtype) else serie.astype('category')
+    return categorica.cat.codes.to_numpy(), categorica.cat.categories
+
+def _resumo(grupos, n_grupos=None):
+    """Ocorrências, média e percentis de cada coluna de um groupby, indexados pelo grupo."""
+    contagens = grupos.count()
+    medias = grupos.mean()
+    quantis = grupos.quantile(list(PERCENTIS.values()))
+    resumo = {}
+    for indicador in contagens.columns:
+        tabela = pd.DataFrame({'Ocorrências': contagens[indicador], 'Média (h)': medias[indicador]})
+        por_quantil = quantis[indicador].unstack()
+        for rotulo, q in PERCENTIS.items():
+            tabela[f'{rotulo} (h)'] = por_quantil[q]
+        resumo[indicador] = tabela
+    return resumo
+
+class IndicadoresTempo:
+    """Tempos de atendimento de um DataFrame de ocorrências e seus agregados."""
+
+    def __init__(self, df):
+        self.tamanho = len(df)
+        self.horas = {}
+        self.inconsistentes = {}   # fim registrado antes do desligamento (provável erro de digitação)
+        for indicador, colunas in INDICADORES.items():
+            presentes = [c for c in colunas if c in df.columns]
+            if not presentes or 'Desligamento' not in df.columns:
+                continue
+            fim = df[presentes[0]] if len(presentes) == 1 else df[presentes].min(axis=1)
+            diferenca = (fim - df['Desligamento']).dt.total_seconds()
+            self.inconsistentes[indicador] = int((diferenca < 0).sum())
+            self.horas[indicador] = horas_entre(df['Desligamento'], fim)
+        self._tempos = pd.DataFrame(self.horas)
+
+        self.percentis = self._calcular_percentis()
+        self.distribuicao = self._calcular_distribuicao()
+        self.tendencia = self._calcular_tendencia(df)
+
+        self._codigos = {dim: _codigos(df[dim]) for dim in DIMENSOES_AGRUPAMENTO if dim in df.columns}
+        self._por_dimensao = {}
+        self._lock = threading.Lock()
+
+    def _calcular_percentis(self):
+        linhas = {}
+        for indicador, horas in self.horas.items():
+            validas = horas[~np.isnan(horas)]
+            linha = {'Ocorrências': len(validas), 'Média (h)': validas.mean() if len(validas) else np.nan}
+            valores = np.quantile(validas, list(PERCENTIS.values())) if len(validas) else [np.nan] * len(PERCENTIS)
+            linha.update({f'{rotulo} (h)': v for rotulo, v in zip(PERCENTIS, valores)})
+            linhas[indicador] = linha
+        return pd.DataFrame.from_dict(linhas, orient='index')
+
+    def _calcular_distribuicao(self):
+        """Ocorrências por faixa de duração (linhas na ordem das faixas, uma coluna por indicador)."""
+        contagens = {}
+        for indicador, horas in self.horas.items():
+            contagens[indicador], _ = np.histogram(horas[~np.isnan(horas)], bins=FAIXAS_HORAS)
+        return pd.DataFrame(contagens, index=pd.Index(ROTULOS_FAIXAS, name='Faixa'))
+
+    def _calcular_tendencia(self, df):
+        """Resumo por mês do desligamento: {indicador: DataFrame indexado pelo primeiro dia do mês}."""
+        if 'Desligamento' not in df.columns or self._tempos.empty:
+            return {}
+        mes = df['Desligamento'].dt.to_period('M').dt.to_timestamp().to_numpy()
+        return _resumo(self._tempos.groupby(mes, sort=True))
+
+    def por_dimensao(self, dimensao):
+        """{indicador: resumo por valor da dimensão}, calculado na primeira chamada."""
+        with self._lock:
+            if dimensao not in self._por_dimensao:
+                codigos, categorias = self._codigos[dimensao]
+                validas = codigos >= 0
+                resumo = _resumo(self._tempos[validas].groupby(codigos[validas], sort=False))
+                for tabela in resumo.values():
+                    tabela.index = pd.Index(categorias[tabela.index], name=dimensao)
+                self._por_dimensao[dimensao] = resumo
+            return self._por_dimensao[dimensao]
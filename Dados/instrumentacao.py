@@ -0,0 +1,178 @@
+# instrumentacao.py
+# Medição leve por rerun: tempo de cada etapa (busca, normalização, filtro, ordenação, tabela,
+# cards...), chamadas às APIs externas e acertos/faltas dos caches do Streamlit.
+# Cada página abre uma medição no início do script e a fecha no fim (painel na barra lateral
+# e uma linha JSON no log 'desempenho'). Sem medição aberta na thread, etapa() devolve um
+# gerenciador vazio e os contadores retornam na primeira linha: o custo com o painel
+# desligado é uma consulta a um threading.local.
+# As recargas em segundo plano (thread do atualizador) têm a sua própria medição; a última
+# de cada tipo fica guardada para o painel.
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# Caminho de um arquivo JSON Lines: liga a medição em todas as sessões e grava uma linha por rerun
+VARIAVEL_LOG = 'DESEMPENHO_LOG'
+
+logger = logging.getLogger('desempenho')
+_local = threading.local()
+_ultimas_em_segundo_plano = {}
+_lock = threading.Lock()
+_VAZIO = nullcontext()
+
+class Medicao:
+    """Etapas, chamadas de API e uso de cache de um rerun (ou de uma recarga em segundo plano)."""
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.inicio = time.perf_counter()
+        self.iniciado_em = datetime.now()
+        self.duracao_ms = None
+        self.etapas = []        # [[caminho 'pai/filho', ms]], na ordem de início (pai antes dos filhos)
+        self.chamadas = {}      # {api: quantidade}
+        self.caches = {}        # {função: [acertos, faltas]}
+        self._pilha = []
+
+    def como_dict(self):
+        return {
+            'pagina': self.nome,
+            'inicio': self.iniciado_em.isoformat(timespec='milliseconds'),
+            'duracao_ms': self.duracao_ms,
+            'etapas': [{'etapa': caminho, 'ms': ms} for caminho, ms in self.etapas],
+            'chamadas_api': dict(self.chamadas),
+            'caches': {nome: {'acertos': a, 'faltas': f} for nome, (a, f) in self.caches.items()},
+        }
+
+def _configurar_log():
+    caminho = os.environ.get(VARIAVEL_LOG)
+    if caminho and not any(getattr(h, 'baseFilename', None) == os.path.abspath(caminho) for h in logger.handlers):
+        manipulador = logging.FileHandler(caminho, encoding='utf-8')
+        manipulador.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(manipulador)
+        logger.setLevel(logging.INFO)
+
+def log_ativo():
+    return bool(os.environ.get(VARIAVEL_LOG))
+
+def atual():
+    return getattr(_local, 'medicao', None)
+
+def iniciar(nome, ativa=True):
+    """Abre a medição do rerun na thread atual (ou nenhuma, se `ativa` for falso)."""
+    _local.medicao = Medicao(nome) if ativa or log_ativo() else None
+    return _local.medicao
+
+def finalizar():
+    """Fecha a medição da thread, grava a linha no log e a devolve (None se não havia)."""
+    medicao = atual()
+    _local.medicao = None
+    if medicao is None:
+        return None
+    medicao.duracao_ms = round((time.perf_counter() - medicao.inicio) * 1000, 2)
+    # Só serializa com o log ligado: sem DESEMPENHO_LOG o rerun não paga o json.dumps
+    if log_ativo():
+        _configurar_log()
+        logger.info(json.dumps(medicao.como_dict(), ensure_ascii=False))
+    return medicao
+
+def etapa(nome):
+    """Gerenciador de contexto que mede uma etapa; etapas aninhadas viram 'pai/filho'."""
+    medicao = atual()
+    if medicao is None:
+        return _VAZIO
+    return _medir_etapa(medicao, nome)
+
+@contextmanager
+def _medir_etapa(medicao, nome):
+    medicao._pilha.append(nome)
+    registro = ['/'.join(medicao._pilha), None]
+    medicao.etapas.append(registro)
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registro[1] = round((time.perf_counter() - inicio) * 1000, 2)
+        medicao._pilha.pop()
+
+def registrar_chamada(api):
+    medicao = atual()
+    if medicao is not None:
+        medicao.chamadas[api] = medicao.chamadas.get(api, 0) + 1
+
+def contar_requisicoes(objeto, metodo, api):
+    """Troca `objeto.metodo` por uma versão que conta cada chamada como uma requisição à `api`."""
+    original = getattr(objeto, metodo)
+
+    @functools.wraps(original)
+    def contado(*args, **kwargs):
+        registrar_chamada(api)
+        return original(*args, **kwargs)
+
+    setattr(objeto, metodo, contado)
+    return objeto
+
+# --- Caches ---
+def registrar_cache(nome, acerto):
+    """Conta um acerto ou uma falta do cache `nome` na medição da thread."""
+    medicao = atual()
+    if medicao is not None:
+        contagem = medicao.caches.setdefault(nome, [0, 0])
+        contagem[0 if acerto else 1] += 1
+
+# O Streamlit não expõe acertos e faltas; a função decorada marca cada execução do corpo
+# (falta) e o invólucro externo conta a chamada como acerto quando o corpo não rodou.
+class _FuncaoMonitorada:
+    def __init__(self, nome, cacheada):
+        self._nome = nome
+        self._cacheada = cacheada
+        functools.update_wrapper(self, cacheada)
+
+    def __call__(self, *args, **kwargs):
+        medicao = atual()
+        if medicao is None:
+            return self._cacheada(*args, **kwargs)
+        faltas_antes = _local.faltas.get(self._nome, 0) if hasattr(_local, 'faltas') else 0
+        resultado = self._cacheada(*args, **kwargs)
+        registrar_cache(self._nome, getattr(_local, 'faltas', {}).get(self._nome, 0) == faltas_antes)
+        return resultado
+
+    def __getattr__(self, nome):
+        # .clear() e demais métodos da função em cache
+        return getattr(self._cacheada, nome)
+
+def monitorar_cache(decorador_cache):
+    """Aplica `decorador_cache` (ex.: st.cache_data(ttl=600)) contando acertos e faltas por rerun."""
+    def decorar(funcao):
+        nome = funcao.__name__
+
+        @functools.wraps(funcao)
+        def executar(*args, **kwargs):
+            if not hasattr(_local, 'faltas'):
+                _local.faltas = {}
+            _local.faltas[nome] = _local.faltas.get(nome, 0) + 1
+            return funcao(*args, **kwargs)
+
+        return _FuncaoMonitorada(nome, decorador_cache(executar))
+    return decorar
+
+# --- Recargas em segundo plano ---
+def medir_em_segundo_plano(nome, funcao):
+    """Executa `funcao` com uma medição própria e guarda a mais recente de cada `nome`."""
+    anterior = atual()
+    _local.medicao = Medicao(nome)
+    try:
+        return funcao()
+    finally:
+        medicao = finalizar()
+        _local.medicao = anterior
+        with _lock:
+            _ultimas_em_segundo_plano[nome] = medicao
+
+def ultimas_em_segundo_plano():
+    with _lock:
+        return dict(_ultimas_em_segundo_plano)
@@ -0,0 +1,123 @@
+# intervalos.py
+# Índice de intervalos [Desligamento, Normalização) de todas as ocorrências, construído uma vez
+# por versão dos dados, para responder "o que estava desligado no instante T" (ou numa janela)
+# sem varrer o histórico. Ocorrências ainda abertas terminam "agora".
+#
+# Estrutura (arrays numpy ordenados, sem árvore de objetos):
+#   - abertas: inícios ordenados; as que contêm T são o prefixo com início <= T;
+#   - fechadas, separadas por classe de duração [2^c, 2^(c+1)) segundos, cada classe com os
+#     inícios ordenados: um intervalo da classe só contém T se começou em (T - 2^(c+1), T].
+#     Os que começaram em (T - 2^c, T] são acerto garantido; os da metade mais antiga podem já
+#     ter terminado. Consulta = duas buscas binárias por classe (~30 classes) + filtro
+#     vetorizado dos candidatos: O(log n + k + m), sendo m os candidatos da metade antiga que
+#     não contêm T (em geral poucos, mas sem limite se os inícios se concentram ali);
+#   - varredura: todos os inícios (+1) e fins (-1) ordenados com a soma acumulada, que dá o
+#     número de ocorrências simultâneas em qualquer instante e o pico de uma janela.
+import numpy as np
+import pandas as pd
+
+def segundos(valor):
+    """Timestamp, datetime ou Series de datas -> segundos desde a época (int64)."""
+    if isinstance(valor, pd.Series):
+        return valor.to_numpy(dtype='datetime64[s]').astype('int64')
+    return int(pd.Timestamp(valor).to_datetime64().astype('datetime64[s]').astype('int64'))
+
+class _ClasseDuracao:
+    """Intervalos fechados com duração em [2^c, 2^(c+1)), ordenados pelo início."""
+
+    def __init__(self, limite, inicios, fins, posicoes):
+        ordem = np.argsort(inicios, kind='stable')
+        self.limite = limite
+        self.inicios = inicios[ordem]
+        self.fins = fins[ordem]
+        self.posicoes = posicoes[ordem]
+
+    def sobrepostos(self, a, b):
+        """Posições dos intervalos que se sobrepõem a [a, b) (a == b: os que contêm a).
+
+        Varre os que começaram em (a - limite, b]; os que terminaram antes de a são descartados no filtro."""
+        lo = np.searchsorted(self.inicios, a - self.limite, side='right')
+        hi = np.searchsorted(self.inicios, b, side='right' if a == b else 'left')
+        return self.posicoes[lo:hi][self.fins[lo:hi] > a]
+
+class IndiceIntervalos:
+    """Consultas de pontualidade, sobreposição e simultaneidade sobre os desligamentos de um DataFrame."""
+
+    def __init__(self, df):
+        self.tamanho = len(df)
+        inicios = segundos(df['Desligamento'])
+        fins = segundos(df['Normalização'])
+        validas = df['Desligamento'].notna().to_numpy()
+        abertas = validas & df['Normalização'].isna().to_numpy()
+        duracoes = np.where(validas & ~abertas, fins - inicios, 0)
+        # Sem duração (ou normalização antes do desligamento): nunca contém instante algum
+        fechadas = validas & ~abertas & (duracoes > 0)
+
+        posicoes_abertas = np.flatnonzero(abertas)
+        ordem = np.argsort(inicios[posicoes_abertas], kind='stable')
+        self._abertas_inicios = inicios[posicoes_abertas][ordem]
+        self._abertas_posicoes = posicoes_abertas[ordem]
+
+        posicoes_fechadas = np.flatnonzero(fechadas)
+        classes = np.floor(np.log2(duracoes[posicoes_fechadas])).astype('int64')
+        self._classes = []
+        for c in np.unique(classes):
+            membros = posicoes_fechadas[classes == c]
+            self._classes.append(_ClasseDuracao(2 ** (int(c) + 1), inicios[membros], fins[membros], membros))
+
+        # Varredura: no mesmo instante os fins (-1) vêm antes dos inícios (+1), pois o intervalo é semiaberto
+        tempos = np.concatenate([inicios[abertas | fechadas], fins[fechadas]])
+        variacoes = np.concatenate([np.ones(np.count_nonzero(abertas | fechadas), dtype='int32'),
+                                    -np.ones(np.count_nonzero(fechadas), dtype='int32')])
+        ordem = np.lexsort((variacoes, tempos))
+        self._tempos = tempos[ordem]
+        self._simultaneas = np.cumsum(variacoes[ordem], dtype='int64')
+        self.primeiro = pd.Timestamp(self._tempos[0], unit='s') if len(self._tempos) else None
+
+    def em(self, instante):
+        """Posições (iloc) das ocorrências em andamento no instante."""
+        return self.durante(instante, instante)
+
+    def durante(self, inicio, fim):
+        """Posições (iloc) das ocorrências em andamento em algum momento de [inicio, fim)."""
+        a, b = segundos(inicio), segundos(fim)
+        lado = 'right' if a == b else 'left'
+        partes = [self._abertas_posicoes[:np.searchsorted(self._abertas_inicios, b, side=lado)]]
+        partes += [classe.sobrepostos(a, b) for classe in self._classes]
+        return np.sort(np.concatenate(partes))
+
+    def simultaneas(self, instante):
+        """Quantas ocorrências estavam em andamento no instante (O(log n))."""
+        i = np.searchsorted(self._tempos, segundos(instante), side='right')
+        return int(self._simultaneas[i - 1]) if i else 0
+
+    def pico(self, inicio, fim):
+        """(máximo de ocorrências simultâneas em [inicio, fim), instante em que foi atingido)."""
+        a, b = segundos(inicio), segundos(fim)
+        i = np.searchsorted(self._tempos, a, side='right')
+        j = np.searchsorted(self._tempos, b, side='left')
+        maximo, instante = (int(self._simultaneas[i - 1]) if i else 0), a
+        if j > i:
+            k = i + int(np.argmax(self._simultaneas[i:j]))
+            if self._simultaneas[k] > maximo:
+                maximo, instante = int(self._simultaneas[k]), int(self._tempos[k])
+        return maximo, pd.Timestamp(instante, unit='s')
+
+    def serie_simultaneas(self, inicio, fim, pontos=500):
+        """Máximo de ocorrências simultâneas em cada um de `pontos` trechos iguais de [inicio, fim)."""
+        bordas = np.linspace(segundos(inicio), segundos(fim), pontos + 1).astype('int64')
+        indice = pd.to_datetime(bordas[:-1], unit='s')
+        if not len(self._tempos):
+            return pd.Series(0, index=indice, name='Simultâneas')
+        # Valor vigente no começo de cada trecho...
+        i = np.searchsorted(self._tempos, bordas[:-1], side='right')
+        maximos = np.where(i > 0, self._simultaneas[np.maximum(i - 1, 0)], 0)
+        # ...e o maior valor atingido dentro dele
+        j = np.searchsorted(self._tempos, bordas[1:], side='left')
+        com_eventos = j > i
+        if com_eventos.any():
+            # reduceat sobre os pares [i, j) intercalados; as posições ímpares (entre trechos) são descartadas
+            limites = np.column_stack([i[com_eventos], j[com_eventos]]).ravel()
+            dentro = np.maximum.reduceat(np.append(self._simultaneas, 0), limites)[::2]
+            maximos[com_eventos] = np.maximum(maximos[com_eventos], dentro)
+        return pd.Series(maximos, index=indice, name='Simultâneas')
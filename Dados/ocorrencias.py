@@ -0,0 +1,320 @@
+# ocorrencias.py
+# Camada única de acesso aos dados de ocorrências, compartilhada por todas as páginas.
+import os
+import streamlit as st
+import pandas as pd
+import gspread
+from GoogleSheets.sheets_connector import CREDS_FILE, abrir_planilha, valores_para_df
+from GoogleSheets.cota import eh_erro_de_cota, MENSAGEM_COTA
+from Dados.sincronizacao import SincronizadorOcorrencias
+from Dados.snapshot import salvar_snapshot, carregar_snapshot
+from Dados.atualizador import AtualizadorEmSegundoPlano
+from Dados.esquema import aplicar_esquema, converter_datas, relatorio_memoria
+from Dados.facetas import IndiceFacetas
+from Dados.indicadores import IndicadoresTempo
+from Dados.cubo import CuboDiario
+from Dados.intervalos import IndiceIntervalos
+from Dados.consultas import CacheConsultas, posicoes_desligadas
+from Dados.derivadas import id_unico, coluna_display, formatar_datas
+from Dados.escrita import indice_linhas
+from Dados.versoes import RegistroVersoes
+from Dados.instrumentacao import etapa, monitorar_cache
+
+PLANILHA_DESLIGAMENTOS = 'DESLIGAMENTOS'
+PLANILHA_EQUIPAMENTOS = 'EQUIPAMENTOS'
+PLANILHA_DADOS = 'DADOS'
+PLANILHA_DETALHADA = 'Usinas_Detalhado'
+ABAS_OCORRENCIAS = [PLANILHA_DESLIGAMENTOS, PLANILHA_EQUIPAMENTOS]
+ABAS_CATALOGO = [PLANILHA_DADOS, PLANILHA_DETALHADA]
+TODAS_AS_ABAS = ABAS_OCORRENCIAS + ABAS_CATALOGO
+# Colunas dos cadastros lidas pelos formulários (opções e busca de cliente/sigla/UG do ativo)
+COLUNAS_CATALOGO = {
+    PLANILHA_DADOS: ['CLIENTE', 'UG', 'SIGLA', 'OCORRÊNCIA', 'TIPO DE OCORRÊNCIA', 'ATIVO', 'OPERADOR'],
+    PLANILHA_DETALHADA: ['Usina', 'Inversor Conectado', 'Tracker Conectado', 'Nome String'],
+}
+
+MAPA_RENOMEAR = {
+    'IDENTIFICADOR': 'Identificador', 'CLIENTE': 'Cliente', 'UG': 'UG', 'TIPO DE OCORRÊNCIA': 'Tipo de ocorrência',
+    'ATIVO': 'Ativo', 'NOME ATIVO': 'Nome Ativo', 'OCORRÊNCIA': 'Ocorrência',
+    'QUANTIDADE': 'Quantidade', 'SIGLA': 'Sigla', 'NORMALIZAÇÃO': 'Normalização',
+    'DESLIGAMENTO': 'Desligamento', 'OPERADOR': 'Operador', 'DESCRIÇÃO': 'Descrição',
+    'OS': 'OS', 'ATENDIMENTO LOOP': 'Atendimento Loop',
+    'ATENDIMENTO TERCEIROS': 'Atendimento Terceiros', 'PROTOCOLO': 'Protocolo', 'CLIENTE AVISADO': 'Cliente Avisado'
+}
+
+COLUNAS_DATETIME = ['Normalização', 'Desligamento', 'Atendimento Loop', 'Atendimento Terceiros', 'Cliente Avisado']
+COLUNAS_TEXTO = ['Operador', 'Descrição', 'OS', 'Protocolo']
+
+INTERVALO_ATUALIZACAO = 600   # segundos entre recargas em segundo plano
+
+# Fonte dos dados: 'sheets' (padrão), 'nextcloud' ou 'sqlite:<caminho do banco>'
+VARIAVEL_ARMAZENAMENTO = 'ARMAZENAMENTO_OCORRENCIAS'
+
+meses_traducao = {
+    'January': 'Janeiro', 'February': 'Fevereiro', 'March': 'Março',
+    'April': 'Abril', 'May': 'Maio', 'June': 'Junho',
+    'July': 'Julho', 'August': 'Agosto', 'September': 'Setembro',
+    'October': 'Outubro', 'November': 'Novembro', 'December': 'Dezembro'
+}
+meses_cronologicos = list(meses_traducao.values())
+
+def normalizar_ocorrencias(df_desligamentos, df_equipamentos):
+    """Junta DESLIGAMENTOS e EQUIPAMENTOS e aplica renomeação, limpeza e colunas derivadas."""
+    for df in (df_desligamentos, df_equipamentos):
+        if 'IDENTIFICADOR' in df.columns:
+            df['IDENTIFICADOR'] = df['IDENTIFICADOR'].astype(str)
+        df.dropna(how='all', inplace=True)
+
+    df_desligamentos['Categoria'] = PLANILHA_DESLIGAMENTOS
+    df_equipamentos['Categoria'] = PLANILHA_EQUIPAMENTOS
+    df_todos_dados = pd.concat([df_desligamentos, df_equipamentos], ignore_index=True)
+
+    renomear_final = {}
+    for col in df_todos_dados.columns:
+        col_strip_upper = col.strip().upper()
+        if col_strip_upper in MAPA_RENOMEAR:
+            renomear_final[col] = MAPA_RENOMEAR[col_strip_upper]
+    df_todos_dados.rename(columns=renomear_final, inplace=True)
+
+    df_todos_dados.fillna('', inplace=True)
+
+    # Garante que a coluna 'Cliente' existe antes de filtrar
+    if 'Cliente' in df_todos_dados.columns:
+        df_todos_dados = df_todos_dados[
+            (df_todos_dados['Cliente'] != '') &
+            (df_todos_dados['UG'] != '') &
+            (df_todos_dados['Sigla'] != '')
+        ].copy()
+
+    for col in COLUNAS_DATETIME:
+        if col in df_todos_dados.columns:
+            df_todos_dados[col] = converter_datas(df_todos_dados[col])
+
+    for col in COLUNAS_TEXTO:
+        if col in df_todos_dados.columns:
+            df_todos_dados[col] = df_todos_dados[col].astype(str).fillna('')
+
+    # Verifica se a coluna 'Desligamento' existe e não está vazia antes de processar
+    if 'Desligamento' in df_todos_dados.columns and not df_todos_dados['Desligamento'].isnull().all():
+        df_todos_dados['Data'] = formatar_datas(df_todos_dados['Desligamento'], '%Y-%m-%d')
+        df_todos_dados['Hora'] = formatar_datas(df_todos_dados['Desligamento'], '%H:%M:%S')
+        df_todos_dados['Mês'] = df_todos_dados['Desligamento'].dt.month.map(dict(enumerate(meses_cronologicos, start=1)))
+        df_todos_dados['Ano'] = df_todos_dados['Desligamento'].dt.year.fillna(0).astype(int)
+        df_todos_dados['Dia'] = df_todos_dados['Desligamento'].dt.day.fillna(0).astype(int)
+
+        df_todos_dados['ID_Unico'] = id_unico(df_todos_dados)
+    else:
+        # Cria colunas vazias se 'Desligamento' não existir, para evitar erros posteriores
+        for col in ['Data', 'Hora', 'Mês', 'Ano', 'Dia', 'ID_Unico']:
+            df_todos_dados[col] = None
+
+    return df_todos_dados
+
+def id_da_linha(cabecalho, valores):
+    """ID_Unico de uma linha bruta da planilha, calculado como na carga."""
+    df = valores_para_df([cabecalho, valores])
+    df = df.rename(columns={c: MAPA_RENOMEAR[c.upper()] for c in df.columns if c.upper() in MAPA_RENOMEAR})
+    df['Desligamento'] = converter_datas(df['Desligamento'])
+    return id_unico(df).iloc[0]
+
+def tipar_ocorrencias(df):
+    """Converte o DataFrame normalizado para os tipos compactos (category, Int64, inteiros curtos)."""
+    return aplicar_esquema(df, meses_cronologicos)
+
+# --- Estado de sincronização compartilhado pelo processo ---
+# Guarda as linhas brutas e o DataFrame normalizado entre recargas, para que cada
+# atualização baixe apenas as linhas novas ou alteradas. A primeira carga traz as
+# quatro abas em uma única requisição.
+@st.cache_resource
+def obter_sincronizador():
+    return SincronizadorOcorrencias(ABAS_OCORRENCIAS, ABAS_CATALOGO, normalizar_ocorrencias, tipar_ocorrencias)
+
+# --- Fonte de armazenamento (compartilhada pelo processo) ---
+# Todas implementam Armazenamento/base.py com o mesmo esquema de abas e cabeçalhos.
+@st.cache_resource
+def obter_armazenamento():
+    configuracao = os.environ.get(VARIAVEL_ARMAZENAMENTO, 'sheets')
+    if configuracao == 'nextcloud':
+        from Armazenamento.nextcloud import ArmazenamentoNextcloud
+        return ArmazenamentoNextcloud(ABAS_OCORRENCIAS, ABAS_CATALOGO, normalizar_ocorrencias, tipar_ocorrencias,
+                                      MAPA_RENOMEAR, id_da_linha, COLUNAS_CATALOGO)
+    if configuracao.startswith('sqlite:'):
+        from Armazenamento.sqlite_local import ArmazenamentoSQLite
+        return ArmazenamentoSQLite(configuracao[len('sqlite:'):], ABAS_OCORRENCIAS, ABAS_CATALOGO,
+                                   normalizar_ocorrencias, tipar_ocorrencias, MAPA_RENOMEAR, id_da_linha)
+    from Armazenamento.sheets import ArmazenamentoSheets
+    return ArmazenamentoSheets(abrir_planilha, obter_sincronizador(), MAPA_RENOMEAR, id_da_linha)
+
+# --- Versões por aba ---
+# Escritas invalidam só a aba afetada; os caches dependentes trazem a versão na chave.
+@st.cache_resource
+def registro_versoes():
+    return RegistroVersoes()
+
+# --- Cubo diário (compartilhado pelo processo) ---
+# Atualizado a cada nova versão só com as ocorrências que mudaram; gravado junto com o snapshot.
+@st.cache_resource
+def cubo_diario():
+    return CuboDiario.carregar()
+
+def _carregar_da_planilha():
+    # Depois de uma escrita, só a aba escrita é conferida; nas recargas periódicas, todas.
+    abas_escritas = registro_versoes().consumir_pendentes(ABAS_OCORRENCIAS)
+    armazenamento = obter_armazenamento()
+    df = armazenamento.carregar_ocorrencias(abas_escritas or None)
+    with etapa('cubo'):
+        cubo_diario().atualizar(df, armazenamento.ultimo_delta())
+    try:
+        salvar_snapshot(df)
+        cubo_diario().salvar()
+    except Exception:
+        # Sem snapshot a próxima partida só fica mais lenta; não é motivo para falhar a carga.
+        pass
+    return df
+
+# --- Versão quente das ocorrências (compartilhada pelo processo) ---
+# As páginas sempre leem a versão em memória; a recarga acontece numa thread,
+# a cada INTERVALO_ATUALIZACAO ou quando uma escrita sinaliza alteração.
+@st.cache_resource
+def obter_atualizador():
+    atualizador = AtualizadorEmSegundoPlano('ocorrencias', _carregar_da_planilha, INTERVALO_ATUALIZACAO)
+    # Partida a frio: serve o snapshot local na hora e sincroniza com a planilha em segundo plano.
+    df_snapshot, salvo_em = carregar_snapshot()
+    if df_snapshot is not None:
+        df_snapshot = tipar_ocorrencias(df_snapshot)
+        # O cubo gravado corresponde a este snapshot; se não, a diferença o acerta aqui.
+        cubo_diario().atualizar(df_snapshot)
+        atualizador.semear(df_snapshot, salvo_em, 'snapshot')
+        atualizador.sinalizar_alteracao()
+    return atualizador
+
+def _mostrar_erro_carga(e):
+    if isinstance(e, FileNotFoundError):
+        st.error(f"Erro: O arquivo de credenciais '{CREDS_FILE}' não foi encontrado. Verifique se ele está na mesma pasta do seu script principal (app.py).")
+    elif isinstance(e, gspread.exceptions.SpreadsheetNotFound):
+        st.error("Erro: Planilha não encontrada. Verifique o link e se você compartilhou a planilha com o email da conta de serviço.")
+    elif eh_erro_de_cota(e):
+        st.error(MENSAGEM_COTA)
+    else:
+        st.error(f"Ocorreu um erro ao carregar ou processar os dados do Google Sheets: {e}")
+
+def versao_ocorrencias():
+    """Versão atual das ocorrências (DataFrame, número, data de carga e origem), ou None se nunca carregou."""
+    try:
+        return obter_atualizador().obter()
+    except Exception as e:
+        _mostrar_erro_carga(e)
+        return None
+
+# --- Dados de ocorrências (DESLIGAMENTOS + EQUIPAMENTOS) ---
+# Fonte única: todas as páginas leem deste mesmo DataFrame canônico.
+def carregar_ocorrencias():
+    """Retorna o DataFrame canônico de ocorrências. É compartilhado entre sessões: não altere no lugar."""
+    versao = versao_ocorrencias()
+    return versao.df if versao is not None else pd.DataFrame()
+
+@monitorar_cache(st.cache_data(max_entries=4))
+def memoria_por_coluna(numero_versao, _df):
+    """Relatório de memória por coluna, calculado uma vez por versão dos dados."""
+    return relatorio_memoria(_df)
+
+@monitorar_cache(st.cache_resource(max_entries=2))
+def indice_facetas(numero_versao, _df):
+    """Índice de facetas do painel de filtros, construído uma vez por versão dos dados."""
+    return IndiceFacetas(_df)
+
+@monitorar_cache(st.cache_resource(max_entries=2))
+def indicadores_tempo(numero_versao, _df):
+    """Tempos de aviso, atendimento e normalização e seus agregados, uma vez por versão dos dados."""
+    return IndicadoresTempo(_df)
+
+@monitorar_cache(st.cache_resource(max_entries=2))
+def indice_intervalos(numero_versao, _df):
+    """Índice dos intervalos [Desligamento, Normalização), construído uma vez por versão dos dados."""
+    return IndiceIntervalos(_df)
+
+@monitorar_cache(st.cache_resource(max_entries=2))
+def display_ocorrencias(numero_versao, _df):
+    """Coluna 'Display' do seletor de edição, calculada uma vez por versão dos dados."""
+    return coluna_display(_df)
+
+@monitorar_cache(st.cache_resource(max_entries=2))
+def localizacao_ocorrencias(numero_versao, _df):
+    """Índice ID_Unico -> (posição, aba, linha da planilha), construído uma vez por versão dos dados."""
+    return indice_linhas(_df)
+
+# --- Consultas da Página Principal (compartilhadas pelo processo) ---
+# LRU limitado, com chave (versão dos dados, consulta canônica): sessões com os mesmos filtros
+# e a mesma ordenação reaproveitam o resultado umas das outras.
+@st.cache_resource
+def cache_consultas():
+    """Resultados das consultas da Página Principal, compartilhados por todas as sessões."""
+    return CacheConsultas()
+
+def desligadas_da_consulta(versao, consulta):
+    """Posições (iloc) em versao.df das ocorrências abertas que atendem à consulta, já ordenadas."""
+    return cache_consultas().obter(
+        (versao.numero, consulta),
+        lambda: posicoes_desligadas(versao.df, indice_facetas(versao.numero, versao.df), consulta))
+
+def atualizar_agora():
+    """Recarrega as ocorrências de forma síncrona (botão 'Atualizar Dados')."""
+    try:
+        obter_atualizador().recarregar()
+    except Exception as e:
+        _mostrar_erro_carga(e)
+
+def recarregar_completo():
+    """Recarga completa síncrona, para quando as linhas da planilha mudaram de posição."""
+    obter_armazenamento().recarregar_completo()
+    atualizar_agora()
+
+def sinalizar_alteracao():
+    """Avisa que a planilha de ocorrências foi alterada; a recarga roda em segundo plano."""
+    obter_atualizador().sinalizar_alteracao()
+
+def _opcoes_unicas(df, coluna):
+    return sorted(df[df[coluna] != ''][coluna].unique().tolist())
+
+def normalizar_opcoes(df_dados, df_detalhado):
+    """Limpa DADOS e Usinas_Detalhado e extrai as listas de opções dos formulários."""
+    df_dados = df_dados.fillna('')
+    df_detalhado = df_detalhado.fillna('')
+    for df in (df_dados, df_detalhado):
+        for col in df.columns:
+            if df[col].dtype == 'object':
+                df[col] = df[col].str.strip()
+
+    return {
+        'df_dados': df_dados, 'df_detalhado': df_detalhado,
+        'Cliente': _opcoes_unicas(df_dados, 'CLIENTE'),
+        'Ocorrência': _opcoes_unicas(df_dados, 'OCORRÊNCIA'),
+        'Tipo de ocorrência': _opcoes_unicas(df_dados, 'TIPO DE OCORRÊNCIA'),
+        'Ativo': _opcoes_unicas(df_dados, 'ATIVO'),
+        'Operador': _opcoes_unicas(df_dados, 'OPERADOR'),
+    }
+
+# --- Cadastros (DADOS + Usinas_Detalhado) usados pelos formulários ---
+# A chave inclui a versão das duas abas: só uma escrita nelas descarta as opções.
+@monitorar_cache(st.cache_data(ttl=600))
+def _carregar_opcoes(versao_catalogos):
+    try:
+        abas = obter_armazenamento().carregar_catalogos()
+        return normalizar_opcoes(abas[PLANILHA_DADOS], abas[PLANILHA_DETALHADA])
+    except Exception as e:
+        st.error(f"Erro ao carregar os dados das planilhas: {e}")
+        return {}
+
+def carregar_opcoes():
+    """Retorna DADOS e Usinas_Detalhado limpos e as listas de opções."""
+    return _carregar_opcoes(registro_versoes().versao(*ABAS_CATALOGO))
+
+def registrar_escrita(aba):
+    """Invalida só o que depende da aba escrita.
+
+    Abas de ocorrências: nova versão e recarga em segundo plano apenas daquela aba.
+    Abas de cadastro: nova versão, que muda a chave de carregar_opcoes.
+    """
+    registro_versoes().invalidar(aba)
+    if aba in ABAS_OCORRENCIAS:
+        sinalizar_alteracao()
@@ -0,0 +1,241 @@
+# sincronizacao.py
+# Sincronização incremental das abas de ocorrências.
+# Depois da primeira carga completa, cada atualização baixa apenas:
+#   - o cabeçalho (para detectar mudanças de estrutura);
+#   - as linhas a partir do fim conhecido menos uma janela de revalidação (linhas novas + edições recentes);
+#   - as linhas ainda abertas (Normalização em branco), que são as que costumam ser editadas.
+# Tudo vai em uma única requisição batchGet. Uma carga completa é refeita periodicamente para
+# capturar edições fora dessas faixas e linhas apagadas no meio da aba.
+import re
+import threading
+import time
+import zlib
+import pandas as pd
+from gspread.utils import rowcol_to_a1
+from GoogleSheets.sheets_connector import valores_para_df
+from Dados.instrumentacao import etapa
+
+JANELA_REVALIDACAO = 300                    # últimas linhas conferidas em toda sincronização
+INTERVALO_SINCRONIZACAO_COMPLETA = 3600     # segundos entre cargas completas
+MAX_FAIXAS_ABERTAS = 50                     # limite de ranges de linhas abertas por aba
+COLUNA_NORMALIZACAO = 'NORMALIZAÇÃO'
+COLUNA_LINHA = 'Linha Planilha'
+
+def impressao_digital(linha):
+    """Hash estável do conteúdo de uma linha da planilha."""
+    return zlib.crc32('\x1f'.join(linha).encode('utf-8'))
+
+def _agrupar_faixas(numeros_linhas, max_faixas):
+    """Agrupa números de linha ordenados em no máximo `max_faixas` faixas [(inicio, fim), ...].
+
+    Quando há faixas demais, junta as separadas pelas menores lacunas (baixando
+    algumas linhas a mais em troca de menos ranges na requisição).
+    """
+    faixas = []
+    for n in numeros_linhas:
+        if faixas and n == faixas[-1][1] + 1:
+            faixas[-1][1] = n
+        else:
+            faixas.append([n, n])
+    if len(faixas) > max_faixas:
+        lacunas = sorted(range(len(faixas) - 1), key=lambda i: faixas[i + 1][0] - faixas[i][1])
+        juntar = set(lacunas[:len(faixas) - max_faixas])
+        agrupadas = []
+        for i, faixa in enumerate(faixas):
+            if agrupadas and (i - 1) in juntar:
+                agrupadas[-1][1] = faixa[1]
+            else:
+                agrupadas.append(faixa)
+        faixas = agrupadas
+    return [tuple(f) for f in faixas]
+
+class EstadoAba:
+    """Cópia local das linhas brutas de uma aba e da impressão digital de cada linha."""
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.cabecalho = []
+        self.linhas = []
+        self.digitais = []
+
+    @property
+    def coluna_final(self):
+        return re.sub(r'\d', '', rowcol_to_a1(1, max(len(self.cabecalho), 1)))
+
+    def _completar(self, linha):
+        largura = len(self.cabecalho)
+        return linha[:largura] + [''] * (largura - len(linha))
+
+    def carregar_completo(self, valores):
+        self.cabecalho = valores[0] if valores else []
+        self.linhas = [self._completar(linha) for linha in valores[1:]]
+        self.digitais = [impressao_digital(linha) for linha in self.linhas]
+
+    def como_df(self, numeros_linhas=None):
+        """DataFrame bruto (cabeçalho limpo) com a coluna 'Linha Planilha'."""
+        if numeros_linhas is None:
+            numeros_linhas = range(2, len(self.linhas) + 2)
+        numeros_linhas = list(numeros_linhas)
+        df = valores_para_df([self.cabecalho] + [self.linhas[n - 2] for n in numeros_linhas])
+        if self.cabecalho:
+            df[COLUNA_LINHA] = pd.array(numeros_linhas, dtype='int64')
+        return df
+
+    def faixas_delta(self):
+        """Retorna [(tipo, primeira_linha, ultima_linha, range_a1)] a buscar numa sincronização incremental."""
+        col = self.coluna_final
+        inicio_janela = max(2, len(self.linhas) + 2 - JANELA_REVALIDACAO)
+        faixas = [('cabecalho', 1, 1, f"'{self.nome}'!1:1"),
+                  ('cauda', inicio_janela, None, f"'{self.nome}'!A{inicio_janela}:{col}")]
+
+        cabecalho_limpo = [h.replace('\xa0', '').strip().upper() for h in self.cabecalho]
+        if COLUNA_NORMALIZACAO in cabecalho_limpo:
+            idx_norm = cabecalho_limpo.index(COLUNA_NORMALIZACAO)
+            abertas = [i + 2 for i, linha in enumerate(self.linhas[:inicio_janela - 2])
+                       if any(linha) and linha[idx_norm] == '']
+            agrupadas = _agrupar_faixas(abertas, MAX_FAIXAS_ABERTAS)
+            faixas += [('abertas', a, b, f"'{self.nome}'!A{a}:{col}{b}") for a, b in agrupadas]
+        return faixas
+
+    def aplicar_delta(self, faixas, respostas):
+        """Mescla as faixas recebidas. Retorna as linhas alteradas, ou None se for preciso recarregar tudo."""
+        alteradas = set()
+        for (tipo, primeira, ultima, _), valores in zip(faixas, respostas):
+            if tipo == 'cabecalho':
+                if (valores[0] if valores else []) != self.cabecalho:
+                    return None
+                continue
+
+            if tipo == 'cauda':
+                esperadas = len(self.linhas) - (primeira - 2)
+                # Menos linhas do que o conhecido: algo foi apagado, os números de linha mudaram.
+                if len(valores) < esperadas:
+                    return None
+                quantidade = len(valores)
+            else:
+                # Linhas vazias no fim da faixa não vêm na resposta
+                quantidade = ultima - primeira + 1
+
+            for k in range(quantidade):
+                numero = primeira + k
+                linha = self._completar(valores[k] if k < len(valores) else [])
+                digital = impressao_digital(linha)
+                idx = numero - 2
+                if idx < len(self.linhas):
+                    if self.digitais[idx] != digital:
+                        self.linhas[idx] = linha
+                        self.digitais[idx] = digital
+                        alteradas.add(numero)
+                else:
+                    self.linhas.append(linha)
+                    self.digitais.append(digital)
+                    alteradas.add(numero)
+        return alteradas
+
+class SincronizadorOcorrencias:
+    """Mantém o DataFrame normalizado de ocorrências e o atualiza apenas com as linhas que mudaram."""
+
+    def __init__(self, abas_ocorrencias, abas_catalogo, normalizar, tipar=None):
+        self.abas_ocorrencias = list(abas_ocorrencias)
+        self.abas_catalogo = list(abas_catalogo)
+        self.normalizar = normalizar
+        # Aplicado ao DataFrame completo depois de cada carga ou mescla (categorias podem mudar)
+        self.tipar = tipar or (lambda df: df)
+        self.estados = {nome: EstadoAba(nome) for nome in self.abas_ocorrencias}
+        self.df = None
+        self.ultima_completa = 0.0
+        # Última mudança: ({aba: linhas alteradas}, ocorrências dessas linhas na versão nova), ou
+        # None depois de uma carga completa (quem deriva dados do df precisa refazer tudo)
+        self.ultimo_delta = None
+        self._catalogos_pre_carregados = None
+        self._lock = threading.Lock()
+
+    def _normalizar_linhas(self, linhas_por_aba=None):
+        frames = []
+        for nome in self.abas_ocorrencias:
+            numeros = None if linhas_por_aba is None else sorted(linhas_por_aba.get(nome, ()))
+            frames.append(self.estados[nome].como_df(numeros))
+        return self.normalizar(*frames)
+
+    def _sincronizacao_completa(self, workbook):
+        abas = self.abas_ocorrencias + self.abas_catalogo
+        with etapa('sheets'):
+            resposta = workbook.values_batch_get([f"'{nome}'" for nome in abas])
+        valores = [vr.get('values', []) for vr in resposta.get('valueRanges', [])]
+        for nome, vals in zip(self.abas_ocorrencias, valores):
+            self.estados[nome].carregar_completo(vals)
+        # As abas de cadastro vieram de carona; ficam guardadas para a próxima leitura de opções.
+        self._catalogos_pre_carregados = {nome: valores_para_df(vals)
+                                          for nome, vals in zip(self.abas_catalogo, valores[len(self.abas_ocorrencias):])}
+        with etapa('normalizar'):
+            self.df = self.tipar(self._normalizar_linhas())
+        self.ultimo_delta = None
+        self.ultima_completa = time.time()
+
+    def _sincronizacao_incremental(self, workbook, abas=None):
+        plano = []
+        for nome in [n for n in self.abas_ocorrencias if not abas or n in abas]:
+            plano.append((nome, self.estados[nome].faixas_delta()))
+
+        ranges = [f[3] for _, faixas in plano for f in faixas]
+        with etapa('sheets'):
+            resposta = workbook.values_batch_get(ranges)
+        valores = [vr.get('values', []) for vr in resposta.get('valueRanges', [])]
+
+        alteradas_por_aba = {}
+        pos = 0
+        for nome, faixas in plano:
+            alteradas = self.estados[nome].aplicar_delta(faixas, valores[pos:pos + len(faixas)])
+            pos += len(faixas)
+            if alteradas is None:
+                return False
+            if alteradas:
+                alteradas_por_aba[nome] = alteradas
+
+        if alteradas_por_aba:
+            with etapa('normalizar'):
+                self._mesclar_delta(alteradas_por_aba)
+        else:
+            self.ultimo_delta = ({}, self.df.iloc[:0])
+        return True
+
+    def _mesclar_delta(self, alteradas_por_aba):
+        """Troca no DataFrame só as linhas alteradas de cada aba."""
+        df_delta = self._normalizar_linhas(alteradas_por_aba)
+        if self.df.empty or COLUNA_LINHA not in self.df.columns:
+            self.df = self.tipar(self._normalizar_linhas())
+            self.ultimo_delta = None
+            return
+        manter = pd.Series(True, index=self.df.index)
+        for nome, alteradas in alteradas_por_aba.items():
+            manter &= ~((self.df['Categoria'] == nome) & self.df[COLUNA_LINHA].isin(alteradas))
+        self.df = self.tipar(pd.concat([self.df[manter], df_delta], ignore_index=True)
+                               .sort_values(['Categoria', COLUNA_LINHA], kind='stable')
+                               .reset_index(drop=True))
+        self.ultimo_delta = (alteradas_por_aba, df_delta)
+
+    def sincronizar(self, workbook, abas=None):
+        """Atualiza o estado local (completo ou incremental) e retorna o DataFrame normalizado.
+
+        `abas` restringe a sincronização incremental às abas indicadas (ex.: só a que recebeu uma escrita).
+        """
+        with self._lock:
+            precisa_completa = (self.df is None or
+                                time.time() - self.ultima_completa > INTERVALO_SINCRONIZACAO_COMPLETA)
+            if precisa_completa or not self._sincronizacao_incremental(workbook, abas):
+                self._sincronizacao_completa(workbook)
+            return self.df
+
+    def exigir_carga_completa(self):
+        """Faz a próxima sincronização ser completa (ex.: linhas inseridas no meio da aba)."""
+        self.ultima_completa = 0.0
+
+    def catalogos(self, workbook):
+        """Retorna {aba: DataFrame} das abas de cadastro, reaproveitando a carga completa se houver."""
+        with self._lock:
+            if self._catalogos_pre_carregados is not None:
+                catalogos, self._catalogos_pre_carregados = self._catalogos_pre_carregados, None
+                return catalogos
+        resposta = workbook.values_batch_get([f"'{nome}'" for nome in self.abas_catalogo])
+        return {nome: valores_para_df(vr.get('values', []))
+                for nome, vr in zip(self.abas_catalogo, resposta.get('valueRanges', []))}
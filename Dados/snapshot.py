@@ -0,0 +1,51 @@
+# snapshot.py
+# Cópia local dos dados (Parquet para o DataFrame canônico, bytes brutos para o xlsx do Nextcloud).
+# Serve para a partida instantânea após reiniciar o servidor e como reserva quando a
+# fonte remota está fora do ar.
+import os
+from datetime import datetime
+import pandas as pd
+
+PASTA_SNAPSHOT = '.snapshot'
+ARQUIVO_OCORRENCIAS = os.path.join(PASTA_SNAPSHOT, 'ocorrencias.parquet')
+ARQUIVO_NEXTCLOUD = os.path.join(PASTA_SNAPSHOT, 'nextcloud.xlsx')
+ARQUIVO_NEXTCLOUD_VERSAO = os.path.join(PASTA_SNAPSHOT, 'nextcloud.etag')   # ETag da cópia acima
+ARQUIVO_CUBO = os.path.join(PASTA_SNAPSHOT, 'cubo_diario.parquet')            # células do cubo diário
+ARQUIVO_CUBO_LINHAS = os.path.join(PASTA_SNAPSHOT, 'cubo_linhas.parquet')     # contribuição de cada ocorrência
+
+def _escrever_atomico(caminho, escrever):
+    # Grava num arquivo temporário e troca de uma vez: um leitor nunca vê o arquivo pela metade.
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    escrever(temporario)
+    os.replace(temporario, caminho)
+
+def _data_arquivo(caminho):
+    return datetime.fromtimestamp(os.path.getmtime(caminho))
+
+def salvar_snapshot(df, caminho=ARQUIVO_OCORRENCIAS):
+    """Persiste o DataFrame em Parquet."""
+    _escrever_atomico(caminho, lambda tmp: df.to_parquet(tmp, index=False))
+
+def carregar_snapshot(caminho=ARQUIVO_OCORRENCIAS):
+    """Retorna (DataFrame, data do salvamento) ou (None, None) se não houver snapshot legível."""
+    if not os.path.exists(caminho):
+        return None, None
+    try:
+        return pd.read_parquet(caminho), _data_arquivo(caminho)
+    except Exception:
+        return None, None
+
+def salvar_bytes(conteudo, caminho=ARQUIVO_NEXTCLOUD):
+    """Persiste um arquivo baixado (ex.: o xlsx do Nextcloud) como veio."""
+    def escrever(tmp):
+        with open(tmp, 'wb') as f:
+            f.write(conteudo)
+    _escrever_atomico(caminho, escrever)
+
+def carregar_bytes(caminho=ARQUIVO_NEXTCLOUD):
+    """Retorna (bytes, data do salvamento) ou (None, None)."""
+    if not os.path.exists(caminho):
+        return None, None
+    with open(caminho, 'rb') as f:
+        return f.read(), _data_arquivo(caminho)
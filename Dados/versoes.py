@@ -0,0 +1,31 @@
+# versoes.py
+# Invalidação por fonte em vez de st.cache_data.clear(): cada aba (ou arquivo) tem um contador
+# de versão. Uma escrita incrementa só a fonte afetada e os caches que dependem dela trazem a
+# versão na chave, então os demais caches (de todas as sessões) continuam quentes.
+import threading
+
+class RegistroVersoes:
+    """Versão de cada fonte de dados e as fontes escritas que ainda não foram recarregadas."""
+
+    def __init__(self):
+        self._versoes = {}
+        self._pendentes = set()
+        self._lock = threading.Lock()
+
+    def versao(self, *fontes):
+        """Tupla com a versão de cada fonte, para usar como parte da chave de um cache."""
+        with self._lock:
+            return tuple(self._versoes.get(fonte, 0) for fonte in fontes)
+
+    def invalidar(self, fonte):
+        """Registra uma escrita na fonte: nova versão e recarga pendente."""
+        with self._lock:
+            self._versoes[fonte] = self._versoes.get(fonte, 0) + 1
+            self._pendentes.add(fonte)
+
+    def consumir_pendentes(self, fontes):
+        """Retira e retorna as fontes (dentre `fontes`) com escrita ainda não recarregada."""
+        with self._lock:
+            pendentes = self._pendentes & set(fontes)
+            self._pendentes -= pendentes
+            return pendentes
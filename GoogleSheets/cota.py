@@ -0,0 +1,171 @@
+# cota.py
+# Controle de cota das requisições ao Google Sheets, instalado no cliente HTTP do gspread.
+# A API limita leituras e escritas por minuto; com vários operadores ao mesmo tempo (e as
+# recargas em segundo plano) o app estourava o limite e recebia 429. Aqui:
+#   - cada requisição reserva uma vaga numa janela de 60 s (leituras e escritas em separado);
+#     sem vaga, espera a próxima em vez de disparar e levar 429;
+#   - leituras idênticas em andamento são coalescidas: quem chega depois espera a resposta
+#     da primeira em vez de repetir a requisição;
+#   - 429 e 5xx (e falhas de conexão) são repetidos com backoff exponencial com jitter,
+#     respeitando o Retry-After quando o servidor manda;
+#   - contadores de requisições, coalescências, esperas por cota e retentativas para o painel.
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from gspread.exceptions import APIError
+from Dados.instrumentacao import registrar_chamada
+
+# Cota padrão da API por usuário (a conta de serviço) e por minuto; ajustável por variável de ambiente
+LEITURAS_POR_MINUTO = int(os.environ.get('SHEETS_LEITURAS_POR_MINUTO', 60))
+ESCRITAS_POR_MINUTO = int(os.environ.get('SHEETS_ESCRITAS_POR_MINUTO', 60))
+MAX_TENTATIVAS = 6
+ESPERA_INICIAL = 1.0     # segundos antes da primeira retentativa (dobra a cada tentativa)
+ESPERA_MAXIMA = 32.0
+STATUS_REPETIVEIS = {429, 500, 502, 503, 504}
+MENSAGEM_COTA = ("O Google Sheets está limitando as requisições (cota por minuto excedida) mesmo após novas tentativas. "
+                 "Aguarde um minuto e tente novamente.")
+
+def eh_erro_de_cota(erro):
+    """True para o 429 da API (limite de requisições por minuto)."""
+    return isinstance(erro, APIError) and getattr(erro.response, 'status_code', None) == 429
+
+class JanelaRequisicoes:
+    """No máximo `limite` requisições em qualquer janela de `periodo` segundos."""
+
+    def __init__(self, limite, periodo=60.0, relogio=time.monotonic):
+        self.limite = limite
+        self.periodo = periodo
+        self._relogio = relogio
+        self._horarios = deque()   # horários (já concedidos ou agendados) das últimas requisições
+        self._lock = threading.Lock()
+
+    def reservar(self):
+        """Reserva a próxima vaga e retorna quantos segundos esperar até usá-la."""
+        with self._lock:
+            agora = self._relogio()
+            while len(self._horarios) >= self.limite and self._horarios[0] <= agora - self.periodo:
+                self._horarios.popleft()
+            if len(self._horarios) < self.limite:
+                horario = agora
+            else:
+                # A vaga abre quando a requisição de `limite` posições atrás sair da janela
+                horario = max(agora, self._horarios[-self.limite] + self.periodo)
+            self._horarios.append(horario)
+            return horario - agora
+
+class _Voo:
+    """Uma leitura em andamento, compartilhada pelas chamadas idênticas."""
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resposta = None
+        self.erro = None
+
+class ControleCota:
+    """Orçamento, coalescência e retentativas das requisições de um cliente HTTP do gspread."""
+
+    def __init__(self, leituras_por_minuto=LEITURAS_POR_MINUTO, escritas_por_minuto=ESCRITAS_POR_MINUTO,
+                 max_tentativas=MAX_TENTATIVAS, dormir=time.sleep, relogio=time.monotonic):
+        self.leituras = JanelaRequisicoes(leituras_por_minuto, relogio=relogio)
+        self.escritas = JanelaRequisicoes(escritas_por_minuto, relogio=relogio)
+        self.max_tentativas = max_tentativas
+        self._dormir = dormir
+        self._em_andamento = {}
+        self._lock = threading.Lock()
+        self._metricas = {
+            'leituras': 0, 'escritas': 0, 'coalescidas': 0,
+            'esperas_cota': 0, 'segundos_espera_cota': 0.0,
+            'retentativas': 0, 'respostas_429': 0, 'falhas': 0,
+        }
+
+    def _somar(self, chave, valor=1):
+        with self._lock:
+            self._metricas[chave] += valor
+
+    def metricas(self):
+        with self._lock:
+            return dict(self._metricas)
+
+    def instalar(self, http_client):
+        """Passa todas as requisições do cliente (gspread.http_client.HTTPClient) por este controle."""
+        enviar = http_client.request
+
+        def request(method, endpoint, params=None, data=None, json=None, files=None, headers=None):
+            return self.requisitar(enviar, method, endpoint, params=params, data=data, json=json,
+                                   files=files, headers=headers)
+
+        http_client.request = request
+        return http_client
+
+    def requisitar(self, enviar, method, endpoint, params=None, data=None, json=None, files=None, headers=None):
+        argumentos = dict(params=params, data=data, json=json, files=files, headers=headers)
+        leitura = method.upper() == 'GET'
+        if not leitura or data is not None or json is not None or files is not None:
+            return self._enviar(enviar, method, endpoint, argumentos, leitura)
+
+        chave = (endpoint, repr(sorted((params or {}).items())))
+        with self._lock:
+            voo = self._em_andamento.get(chave)
+            dono = voo is None
+            if dono:
+                voo = self._em_andamento[chave] = _Voo()
+            else:
+                self._metricas['coalescidas'] += 1
+        if not dono:
+            voo.evento.wait()
+            if voo.erro is not None:
+                raise voo.erro
+            return voo.resposta
+        try:
+            voo.resposta = self._enviar(enviar, method, endpoint, argumentos, leitura)
+            return voo.resposta
+        except Exception as e:
+            voo.erro = e
+            raise
+        finally:
+            with self._lock:
+                del self._em_andamento[chave]
+            voo.evento.set()
+
+    def _enviar(self, enviar, method, endpoint, argumentos, leitura):
+        janela = self.leituras if leitura else self.escritas
+        for tentativa in range(1, self.max_tentativas + 1):
+            espera = janela.reservar()
+            if espera > 0:
+                self._somar('esperas_cota')
+                self._somar('segundos_espera_cota', espera)
+                self._dormir(espera)
+            self._somar('leituras' if leitura else 'escritas')
+            registrar_chamada('Google Sheets')
+            try:
+                return enviar(method, endpoint, **argumentos)
+            except APIError as e:
+                status = getattr(e.response, 'status_code', None)
+                if status == 429:
+                    self._somar('respostas_429')
+                if status not in STATUS_REPETIVEIS or tentativa == self.max_tentativas:
+                    self._somar('falhas')
+                    raise
+                retry_after = e.response.headers.get('Retry-After') if e.response is not None else None
+            except (requests.ConnectionError, requests.Timeout):
+                if tentativa == self.max_tentativas:
+                    self._somar('falhas')
+                    raise
+                retry_after = None
+            self._somar('retentativas')
+            self._dormir(self._espera_retentativa(tentativa, retry_after))
+
+    def _espera_retentativa(self, tentativa, retry_after=None):
+        if retry_after:
+            # Limitado: a espera roda na thread do script e, com a coalescência, segura todas as sessões à espera
+            try:
+                return min(float(retry_after), ESPERA_MAXIMA)
+            except ValueError:
+                pass
+        # Backoff exponencial com jitter: metade fixa, metade sorteada (espalha os clientes que erraram juntos)
+        teto = min(ESPERA_MAXIMA, ESPERA_INICIAL * 2 ** (tentativa - 1))
+        return teto / 2 + random.uniform(0, teto / 2)
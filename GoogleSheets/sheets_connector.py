@@ -0,0 +1,66 @@
+# sheets_connector.py
+import os
+import streamlit as st
+import pandas as pd
+import gspread
+from google.oauth2.service_account import Credentials
+from GoogleSheets.cota import ControleCota
+
+# Define os "escopos" - as permissões que nosso script solicitará.
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive",
+]
+CREDS_FILE = "google_credentials.json"
+SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/1KeJjbsLVP9DkxPCmNSN4VzbSBeG3SFSCAdPhir39iqg/edit?usp=sharing"
+
+# --- Cota da API ---
+# Um controle por processo, fora do TTL do cliente: o orçamento por minuto e as métricas
+# continuam valendo quando o cliente é recriado.
+@st.cache_resource
+def controle_cota():
+    """Orçamento, coalescência de leituras e retentativas de todas as requisições ao Google Sheets."""
+    return ControleCota()
+
+# --- Função para conectar ao Google Sheets ---
+# Um único recurso compartilhado por todas as páginas.
+@st.cache_resource(ttl=600)
+def connect_to_google_sheets():
+    """Autentica com a conta de serviço (arquivo local ou st.secrets) e retorna o cliente gspread."""
+    # Verifica se está rodando localmente (o arquivo existe) ou na nuvem (usa st.secrets)
+    if os.path.exists(CREDS_FILE):
+        creds = Credentials.from_service_account_file(CREDS_FILE, scopes=SCOPES)
+    else:
+        creds = Credentials.from_service_account_info(st.secrets["gcp_service_account"], scopes=SCOPES)
+
+    client = gspread.authorize(creds)
+    # Toda requisição HTTP passa pelo controle de cota (que também a conta no painel de desempenho)
+    controle_cota().instalar(client.http_client)
+    return client
+
+# O handle da planilha também fica em cache: open_by_url custa uma ida ao servidor (metadados).
+@st.cache_resource(ttl=600)
+def abrir_planilha():
+    """Abre a planilha principal de ocorrências."""
+    client = connect_to_google_sheets()
+    return client.open_by_url(SPREADSHEET_URL)
+
+def valores_para_df(data):
+    """Converte a matriz de valores (primeira linha = cabeçalho) em DataFrame."""
+    if not data:
+        return pd.DataFrame()
+    headers = [h.replace('\xa0', '').strip() for h in data[0]]
+    # A API de valores omite as células vazias do fim de cada linha; completa para o tamanho do cabeçalho.
+    largura = len(headers)
+    linhas = [linha[:largura] + [''] * (largura - len(linha)) for linha in data[1:]]
+    return pd.DataFrame(linhas, columns=headers)
+
+def fetch_sheet_as_df(worksheet):
+    return valores_para_df(worksheet.get_all_values())
+
+def fetch_sheets_as_dfs(workbook, nomes_abas):
+    """Baixa várias abas em uma única requisição (values:batchGet) e retorna {aba: DataFrame}."""
+    ranges = [f"'{nome}'" for nome in nomes_abas]
+    resposta = workbook.values_batch_get(ranges)
+    value_ranges = resposta.get('valueRanges', [])
+    return {nome: valores_para_df(vr.get('values', [])) for nome, vr in zip(nomes_abas, value_ranges)}
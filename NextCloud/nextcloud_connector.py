@@ -1,8 +1,17 @@
 # nextcloud_connector.py
 import streamlit as st
 import pandas as pd
-from webdav3.client import Client
+from webdav3.client import Client, WebDavXmlUtils
+from webdav3.exceptions import ResponseErrorCode
+from webdav3.urn import Urn
+import importlib.util
 import io
+import tempfile
+import time
+import uuid
+from Dados.instrumentacao import contar_requisicoes, etapa, monitorar_cache
+from Dados.snapshot import salvar_bytes, carregar_bytes, ARQUIVO_NEXTCLOUD_VERSAO
+from NextCloud.xlsx_parcial import regravar_abas
 
 # --- Função para conectar ao cliente WebDAV ---
 # O @st.cache_resource garante que a conexão seja feita apenas uma vez.
@@ -15,53 +24,207 @@ def get_nextcloud_client():
             'webdav_login':    st.secrets["nextcloud"]["login"],
             'webdav_password': st.secrets["nextcloud"]["password"]
         }
-        return Client(options)
+        return contar_requisicoes(Client(options), 'execute_request', 'Nextcloud')
     except Exception as e:
         st.error(f"Erro ao conectar ao Nextcloud. Verifique suas credenciais em st.secrets: {e}")
         return None
 
+# --- Versão do arquivo remoto ---
+# Um PROPFIND (Depth 0) traz só a ETag e a data de modificação: poucos bytes, em vez do
+# arquivo inteiro. O download e a leitura do Excel só acontecem quando a versão muda.
+INTERVALO_VERIFICACAO = 10   # segundos entre consultas da versão remota
+
+def _versao_remota(client, remote_path):
+    """ETag (ou, na falta dela, a data de modificação) do arquivo no servidor."""
+    urn = Urn(remote_path)
+    resposta = client.execute_request(action='info', path=urn.quote(), headers_ext=['Depth: 0'])
+    info = WebDavXmlUtils.parse_info_response(content=resposta.content, path=client.get_full_path(urn),
+                                              hostname=client.webdav.hostname)
+    return info.get('etag') or info.get('modified')
+
+@monitorar_cache(st.cache_data(ttl=INTERVALO_VERIFICACAO, show_spinner=False))
+def versao_arquivo_nextcloud():
+    """Versão atual do arquivo remoto, consultada no máximo a cada INTERVALO_VERIFICACAO segundos."""
+    client = get_nextcloud_client()
+    if client is None:
+        return None
+    versao = _versao_remota(client, st.secrets["nextcloud"]["path"])
+    # Servidor sem ETag nem data de modificação: cai no comportamento antigo (um download por minuto)
+    return versao or f"sem-versao-{int(time.time() // 60)}"
+
+def _baixar_arquivo(versao):
+    """Bytes do arquivo remoto. Reaproveita a cópia local se ela já é desta versão."""
+    conteudo, _ = carregar_bytes()
+    versao_local, _ = carregar_bytes(ARQUIVO_NEXTCLOUD_VERSAO)
+    if conteudo is not None and versao_local is not None and versao_local.decode('utf-8') == versao:
+        return conteudo
+    client = get_nextcloud_client()
+    with etapa('download'):
+        resposta = client.execute_request(action='download', path=Urn(st.secrets["nextcloud"]["path"]).quote())
+        conteudo = resposta.content
+    try:
+        salvar_bytes(conteudo)
+        salvar_bytes(resposta.headers.get('ETag', versao).encode('utf-8'), ARQUIVO_NEXTCLOUD_VERSAO)
+    except OSError:
+        pass
+    return conteudo
+
+# --- Leitura do Excel ---
+# Cada aba é lida e guardada em cache separadamente, com só as colunas pedidas: o custo
+# acompanha o que as páginas usam, não o tamanho da pasta de trabalho. O leitor é o
+# calamine (python-calamine, em Rust) quando instalado; senão o openpyxl em modo read-only.
+MOTOR_EXCEL = 'calamine' if importlib.util.find_spec('python_calamine') else 'openpyxl'
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _bytes_versao(versao):
+    """Bytes do arquivo de uma versão, mantidos em memória enquanto ela for a atual."""
+    return _baixar_arquivo(versao)
+
+def _nomes_abas_de(conteudo):
+    with pd.ExcelFile(io.BytesIO(conteudo), engine=MOTOR_EXCEL) as arquivo:
+        return list(arquivo.sheet_names)
+
+def _ler_aba_de(conteudo, aba, colunas=None):
+    # Colunas como filtro (e não lista): uma coluna que não existe na aba é ignorada em vez de dar erro.
+    # Nomes comparados sem espaços nas pontas e sem diferenciar maiúsculas, como na renomeação das ocorrências.
+    pedidas = None if colunas is None else frozenset(str(c).strip().upper() for c in colunas)
+    usecols = None if pedidas is None else (lambda nome: str(nome).strip().upper() in pedidas)
+    with etapa(f'leitura {aba}'):
+        return pd.read_excel(io.BytesIO(conteudo), sheet_name=aba, usecols=usecols, engine=MOTOR_EXCEL)
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def _nomes_abas(versao):
+    return _nomes_abas_de(_bytes_versao(versao))
+
+@monitorar_cache(st.cache_data(max_entries=32, show_spinner=False))
+def _ler_aba(versao, aba, colunas):
+    """Uma aba de uma versão do arquivo (colunas = tupla de nomes ou None para todas)."""
+    return _ler_aba_de(_bytes_versao(versao), aba, colunas)
+
+def _ler_selecao(nomes_abas, ler_aba, abas, colunas):
+    abas = nomes_abas() if abas is None else abas
+    colunas = colunas or {}
+    return {aba: ler_aba(aba, tuple(colunas[aba]) if aba in colunas else None) for aba in abas}
+
+def ler_para_escrita():
+    """(versão, {aba: DataFrame}) com todas as abas lidas de uma mesma versão do arquivo: a base de uma gravação."""
+    versao = versao_arquivo_nextcloud()
+    if versao is None:
+        raise IOError("Nextcloud indisponível: não é possível gravar.")
+    return versao, _ler_selecao(lambda: _nomes_abas(versao), lambda aba, cols: _ler_aba(versao, aba, cols), None, None)
+
 # --- Função para ler o arquivo Excel do Nextcloud ---
-# O @st.cache_data garante que o arquivo não seja baixado repetidamente sem necessidade.
-@st.cache_data(ttl=60)
-def read_excel_from_nextcloud():
-    """Baixa o arquivo Excel da nuvem e o carrega em um dicionário de DataFrames (um por aba)."""
+# O cache é por versão do arquivo: enquanto a ETag não muda, as abas já lidas são reaproveitadas.
+def read_excel_from_nextcloud(abas=None, colunas=None):
+    """Baixa o arquivo Excel da nuvem (só quando mudou) e o carrega em um dicionário de DataFrames (um por aba).
+
+    `abas` limita as abas lidas (padrão: todas) e `colunas` = {aba: [colunas]} limita as colunas de cada uma.
+    """
     try:
-        client = get_nextcloud_client()
-        if client:
-            remote_path = st.secrets["nextcloud"]["path"]
-            # Baixa o arquivo para a memória do aplicativo
-            response = client.resource(remote_path).read()
-            file_in_memory = io.BytesIO(response)
-            # Lê todas as abas de uma vez
-            all_sheets = pd.read_excel(file_in_memory, sheet_name=None, engine='openpyxl')
-            return all_sheets
-        return None
+        versao = versao_arquivo_nextcloud()
+        if versao is not None:
+            return _ler_selecao(lambda: _nomes_abas(versao), lambda aba, cols: _ler_aba(versao, aba, cols), abas, colunas)
+        return _ler_copia_local(abas, colunas)
     except Exception as e:
         st.error(f"Erro ao ler o arquivo do Nextcloud. Verifique o caminho do arquivo e as permissões: {e}")
+        return _ler_copia_local(abas, colunas)
+
+def _ler_copia_local(abas=None, colunas=None):
+    """Lê a última cópia do arquivo baixada com sucesso, se existir."""
+    conteudo, salvo_em = carregar_bytes()
+    if conteudo is None:
         return None
+    st.warning(f"Nextcloud indisponível. Usando a cópia local de {salvo_em.strftime('%d/%m/%Y %H:%M')}.")
+    return _ler_selecao(lambda: _nomes_abas_de(conteudo), lambda aba, cols: _ler_aba_de(conteudo, aba, cols), abas, colunas)
 
 # --- Função para salvar o arquivo Excel de volta no Nextcloud ---
-def write_excel_to_nextcloud(all_sheets_dict):
-    """Recebe um dicionário de DataFrames e salva como um arquivo .xlsx, substituindo o antigo."""
+# O arquivo é montado num temporário em disco/memória (não em dois BytesIO), enviado por
+# streaming para um caminho temporário ao lado do original e só então movido por cima dele:
+# quem lê nunca vê um arquivo pela metade. As abas sem alteração são copiadas do arquivo atual.
+# O MOVE só sobrescreve se o arquivo ainda estiver na versão (ETag) usada como base; se outro
+# escritor salvou no meio, o servidor responde 412 e a gravação vira ConflitoEscrita.
+LIMITE_MEMORIA_UPLOAD = 16 * 1024 * 1024   # acima disso o temporário vai para o disco
+
+class ConflitoEscrita(Exception):
+    """O arquivo remoto mudou desde a versão usada como base da gravação."""
+
+    def __init__(self):
+        super().__init__("O arquivo do Nextcloud foi alterado por outra gravação. Tente novamente.")
+
+def _eh_etag(versao):
+    # ETags vêm entre aspas (fortes ou W/); a data de modificação e a versão sintética não servem de condição
+    return isinstance(versao, str) and versao.startswith(('"', 'W/"'))
+
+def _abas_alteradas(versao, all_sheets_dict):
+    """Abas cujo conteúdo difere da versão atual do arquivo (todas, se não houver com o que comparar)."""
+    if versao is None:
+        return set(all_sheets_dict)
+    existentes = _nomes_abas(versao)
+    return {nome for nome, df in all_sheets_dict.items()
+            if nome not in existentes or not df.equals(_ler_aba(versao, nome, None))}
+
+def _serializar(versao, all_sheets_dict, alteradas, destino):
+    """Grava o .xlsx em `destino`: regravação parcial quando possível, pasta inteira caso contrário."""
+    if versao is not None and regravar_abas(io.BytesIO(_bytes_versao(versao)), all_sheets_dict, alteradas, destino):
+        return
+    destino.seek(0)
+    destino.truncate()
+    with pd.ExcelWriter(destino, engine='openpyxl') as writer:
+        for sheet_name, df in all_sheets_dict.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+def _enviar_atomico(client, remote_path, arquivo, etag=None):
+    """PUT num caminho temporário na mesma pasta e MOVE (com sobrescrita) para o caminho final.
+
+    Com `etag`, o MOVE só acontece se o destino ainda tiver essa ETag (senão, ConflitoEscrita)."""
+    destino = Urn(remote_path)
+    url_destino = client.get_url(destino.quote())
+    temporario = Urn(f"{destino.parent()}.{destino.filename()}.{uuid.uuid4().hex[:8]}.tmp")
+    client.execute_request(action='upload', path=temporario.quote(), data=arquivo)
+    cabecalhos = [f"Destination: {url_destino}", "Overwrite: T"]
+    if etag:
+        # If-Match num MOVE vale para a origem (o temporário); a condição sobre o destino vai no
+        # cabeçalho If com a URL dele (RFC 4918, 10.4)
+        cabecalhos.append(f"If: <{url_destino}> ([{etag}])")
+    try:
+        client.execute_request(action='move', path=temporario.quote(), headers_ext=cabecalhos)
+    except Exception as e:
+        try:
+            client.execute_request(action='clean', path=temporario.quote())
+        except Exception:
+            pass
+        if isinstance(e, ResponseErrorCode) and e.code == 412:
+            raise ConflitoEscrita() from e
+        raise
+
+def write_excel_to_nextcloud(all_sheets_dict, versao=None):
+    """Recebe um dicionário de DataFrames e salva como um arquivo .xlsx, substituindo o antigo.
+
+    `versao` é a versão de onde os DataFrames foram lidos (ver ler_para_escrita). Se o arquivo
+    mudou desde então, levanta ConflitoEscrita em vez de sobrescrever a outra gravação.
+    """
     try:
         client = get_nextcloud_client()
         if client:
             remote_path = st.secrets["nextcloud"]["path"]
-            buffer = io.BytesIO()
-            
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                for sheet_name, df in all_sheets_dict.items():
-                    df.to_excel(writer, sheet_name=sheet_name, index=False)
-            
-            buffer.seek(0) # Retorna ao início do buffer para leitura
-            
-            # Envia o arquivo em memória para o Nextcloud
-            client.resource(remote_path).write(buffer.read())
-            
-            # Limpa o cache para forçar a releitura dos dados na próxima interação
-            st.cache_data.clear()
+            versao = versao_arquivo_nextcloud() if versao is None else versao
+            alteradas = _abas_alteradas(versao, all_sheets_dict)
+            if not alteradas and list(_nomes_abas(versao)) == list(all_sheets_dict):
+                return True   # nada mudou: não há o que enviar
+
+            with tempfile.SpooledTemporaryFile(max_size=LIMITE_MEMORIA_UPLOAD) as arquivo:
+                _serializar(versao, all_sheets_dict, alteradas, arquivo)
+                arquivo.seek(0)
+                _enviar_atomico(client, remote_path, arquivo, versao if _eh_etag(versao) else None)
+
+            # A próxima leitura consulta a nova ETag; as abas da versão anterior saem do cache sozinhas
+            versao_arquivo_nextcloud.clear()
             return True
         return False
+    except ConflitoEscrita:
+        # A próxima leitura já consulta a versão nova
+        versao_arquivo_nextcloud.clear()
+        raise
     except Exception as e:
         st.error(f"Erro ao salvar o arquivo no Nextcloud: {e}")
-        return False
\ No newline at end of file
+        return False
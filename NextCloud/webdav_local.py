@@ -0,0 +1,197 @@
+# webdav_local.py
+# Servidor WebDAV mínimo sobre uma pasta local, para testar o conector do Nextcloud sem rede.
+# Implementa o que o conector usa: GET/HEAD (com If-None-Match), PUT, DELETE, MKCOL, MOVE (com a
+# condição `If: <destino> (["etag"])`) e PROPFIND (Depth 0/1) com ETag e data de modificação.
+#
+# Uso:
+#   python -m NextCloud.webdav_local --pasta ./webdav_teste --porta 8089
+# e em .streamlit/secrets.toml:
+#   [nextcloud]
+#   url = "http://localhost:8089"
+#   login = "teste"
+#   password = "teste"
+#   path = "Ocorrencias.xlsx"
+import argparse
+import os
+import re
+import shutil
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse, quote
+from xml.sax.saxutils import escape
+
+def etag_arquivo(caminho):
+    """ETag derivada do instante de modificação e do tamanho (muda a cada gravação)."""
+    info = os.stat(caminho)
+    return f'"{info.st_mtime_ns:x}-{info.st_size:x}"'
+
+class ManipuladorWebDAV(BaseHTTPRequestHandler):
+    pasta = '.'
+    contagem = {}               # requisições por método, para conferir o tráfego nos testes
+    _lock = threading.Lock()
+
+    def log_message(self, formato, *args):
+        if not getattr(self.server, 'silencioso', False):
+            super().log_message(formato, *args)
+
+    def _caminho(self, url=None):
+        relativo = unquote(urlparse(url or self.path).path).lstrip('/')
+        caminho = os.path.normpath(os.path.join(self.pasta, relativo))
+        if os.path.commonpath([os.path.abspath(caminho), os.path.abspath(self.pasta)]) != os.path.abspath(self.pasta):
+            raise PermissionError(relativo)
+        return caminho
+
+    def _contar(self):
+        with self._lock:
+            self.contagem[self.command] = self.contagem.get(self.command, 0) + 1
+
+    def _responder(self, status, corpo=b'', cabecalhos=None):
+        self.send_response(status)
+        for chave, valor in (cabecalhos or {}).items():
+            self.send_header(chave, valor)
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        if corpo and self.command != 'HEAD':
+            self.wfile.write(corpo)
+
+    def _ler_corpo(self):
+        tamanho = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(tamanho) if tamanho else b''
+
+    def do_OPTIONS(self):
+        self._contar()
+        self._responder(200, cabecalhos={'DAV': '1', 'Allow': 'OPTIONS, GET, HEAD, PUT, DELETE, MKCOL, MOVE, PROPFIND'})
+
+    def do_GET(self):
+        self._contar()
+        caminho = self._caminho()
+        if os.path.isdir(caminho):
+            self._responder(200)
+            return
+        if not os.path.exists(caminho):
+            self._responder(404)
+            return
+        etag = etag_arquivo(caminho)
+        cabecalhos = {'ETag': etag, 'Last-Modified': formatdate(os.path.getmtime(caminho), usegmt=True)}
+        if self.headers.get('If-None-Match') == etag:
+            self._responder(304, cabecalhos=cabecalhos)
+            return
+        with open(caminho, 'rb') as f:
+            corpo = f.read()
+        cabecalhos['Content-Type'] = 'application/octet-stream'
+        self._responder(200, corpo, cabecalhos)
+
+    do_HEAD = do_GET
+
+    def do_PUT(self):
+        self._contar()
+        caminho = self._caminho()
+        if not os.path.isdir(os.path.dirname(caminho)):
+            self._responder(409)
+            return
+        existia = os.path.exists(caminho)
+        # Grava em temporário e troca, como o Nextcloud faz com uploads completos
+        temporario = f"{caminho}.upload.tmp"
+        with open(temporario, 'wb') as f:
+            restante = int(self.headers.get('Content-Length') or 0)
+            while restante > 0:
+                bloco = self.rfile.read(min(restante, 1 << 20))
+                if not bloco:
+                    break
+                f.write(bloco)
+                restante -= len(bloco)
+        os.replace(temporario, caminho)
+        self._responder(204 if existia else 201, cabecalhos={'ETag': etag_arquivo(caminho)})
+
+    def do_DELETE(self):
+        self._contar()
+        caminho = self._caminho()
+        if not os.path.exists(caminho):
+            self._responder(404)
+        else:
+            shutil.rmtree(caminho) if os.path.isdir(caminho) else os.remove(caminho)
+            self._responder(204)
+
+    def do_MKCOL(self):
+        self._contar()
+        caminho = self._caminho()
+        if os.path.exists(caminho):
+            self._responder(405)
+        else:
+            os.makedirs(caminho)
+            self._responder(201)
+
+    def do_MOVE(self):
+        self._contar()
+        origem = self._caminho()
+        destino = self._caminho(self.headers.get('Destination', ''))
+        if not os.path.exists(origem):
+            self._responder(404)
+            return
+        existia = os.path.exists(destino)
+        if existia and self.headers.get('Overwrite', 'T').upper() == 'F':
+            self._responder(412)
+            return
+        # Condição sobre o destino: só sobrescreve se ele ainda tiver a ETag informada
+        for recurso, etag in re.findall(r'<([^>]+)>\s*\(\[([^\]]+)\]\)', self.headers.get('If', '')):
+            if self._caminho(recurso) == destino and (not existia or etag_arquivo(destino) != etag):
+                self._responder(412)
+                return
+        os.replace(origem, destino)
+        self._responder(204 if existia else 201)
+
+    def _propriedades(self, caminho, href):
+        info = os.stat(caminho)
+        diretorio = os.path.isdir(caminho)
+        props = [f'<d:displayname>{escape(os.path.basename(caminho.rstrip(os.sep)))}</d:displayname>',
+                 f'<d:getlastmodified>{formatdate(info.st_mtime, usegmt=True)}</d:getlastmodified>',
+                 f'<d:creationdate>{formatdate(info.st_ctime, usegmt=True)}</d:creationdate>',
+                 '<d:resourcetype><d:collection/></d:resourcetype>' if diretorio else '<d:resourcetype/>']
+        if not diretorio:
+            props += [f'<d:getcontentlength>{info.st_size}</d:getcontentlength>',
+                      f'<d:getetag>{escape(etag_arquivo(caminho))}</d:getetag>',
+                      '<d:getcontenttype>application/octet-stream</d:getcontenttype>']
+        return (f'<d:response><d:href>{escape(href)}</d:href><d:propstat><d:prop>{"".join(props)}</d:prop>'
+                f'<d:status>HTTP/1.1 200 OK</d:status></d:propstat></d:response>')
+
+    def do_PROPFIND(self):
+        self._contar()
+        self._ler_corpo()
+        caminho = self._caminho()
+        if not os.path.exists(caminho):
+            self._responder(404)
+            return
+        href = quote(unquote(urlparse(self.path).path))
+        respostas = [self._propriedades(caminho, href)]
+        if os.path.isdir(caminho) and self.headers.get('Depth', '1') != '0':
+            base = href if href.endswith('/') else href + '/'
+            for nome in sorted(os.listdir(caminho)):
+                filho = os.path.join(caminho, nome)
+                respostas.append(self._propriedades(filho, base + quote(nome) + ('/' if os.path.isdir(filho) else '')))
+        corpo = ('<?xml version="1.0" encoding="utf-8"?><d:multistatus xmlns:d="DAV:">'
+                 + ''.join(respostas) + '</d:multistatus>').encode('utf-8')
+        self._responder(207, corpo, {'Content-Type': 'application/xml; charset=utf-8'})
+
+def criar_servidor(pasta, porta=0, silencioso=True):
+    """Cria o servidor (porta 0 = porta livre qualquer). Use servidor.server_address para saber a porta."""
+    manipulador = type('Manipulador', (ManipuladorWebDAV,), {'pasta': os.path.abspath(pasta), 'contagem': {}})
+    servidor = ThreadingHTTPServer(('127.0.0.1', porta), manipulador)
+    servidor.silencioso = silencioso
+    return servidor
+
+def iniciar_em_segundo_plano(pasta, porta=0):
+    """Sobe o servidor numa thread daemon e retorna (servidor, url)."""
+    servidor = criar_servidor(pasta, porta)
+    threading.Thread(target=servidor.serve_forever, name='webdav-local', daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Servidor WebDAV local para testes do conector Nextcloud.')
+    parser.add_argument('--pasta', default='webdav_teste')
+    parser.add_argument('--porta', type=int, default=8089)
+    args = parser.parse_args()
+    os.makedirs(args.pasta, exist_ok=True)
+    servidor = criar_servidor(args.pasta, args.porta, silencioso=False)
+    print(f"WebDAV local em http://127.0.0.1:{args.porta} servindo {os.path.abspath(args.pasta)}")
+    servidor.serve_forever()
@@ -0,0 +1,184 @@
+# xlsx_parcial.py
+# Regravação parcial de um .xlsx: as abas que não mudaram são copiadas do arquivo original
+# (o XML de cada uma entra como está no novo pacote) e só as abas alteradas são serializadas,
+# direto em XML com strings inline, sem passar célula a célula pelo openpyxl.
+# Quando o arquivo original não permite (abas novas/removidas, sem estilo de data, etc.),
+# `regravar_abas` devolve False e quem chamou grava a pasta inteira pelo caminho normal.
+# Uma aba alterada vira só <sheetData>: se ela tinha relações próprias (tabelas, desenhos,
+# comentários) ou fórmulas, a regravação parcial deixaria referências quebradas e também cai
+# no caminho normal. O calcChain.xml (cadeia de cálculo, que aponta células com fórmula) sai
+# do pacote; o Excel o reconstrói ao abrir.
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+NS_PLANILHA = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+NS_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+NS_PACOTE = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+# Formato de data/hora que o pandas grava (ExcelWriter.datetime_format padrão)
+FORMATOS_DATA_HORA = {'yyyy-mm-dd hh:mm:ss', 'yyyy-mm-dd h:mm:ss'}
+EPOCA_EXCEL = np.datetime64('1899-12-30T00:00:00', 'ns')
+_CARACTERES_INVALIDOS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+CADEIA_CALCULO = 'xl/calcChain.xml'
+_REFERENCIAS_CADEIA = {
+    '[Content_Types].xml': re.compile(rb'<Override\b[^>]*PartName="/xl/calcChain\.xml"[^>]*/>'),
+    'xl/_rels/workbook.xml.rels': re.compile(rb'<Relationship\b[^>]*Target="[^"]*calcChain\.xml"[^>]*/>'),
+}
+
+def caminhos_abas(pacote):
+    """[(nome da aba, caminho do XML no pacote)], na ordem da pasta de trabalho."""
+    workbook = ET.fromstring(pacote.read('xl/workbook.xml'))
+    rels = ET.fromstring(pacote.read('xl/_rels/workbook.xml.rels'))
+    alvos = {}
+    for rel in rels.findall(f'{{{NS_PACOTE}}}Relationship'):
+        alvo = rel.get('Target')
+        alvos[rel.get('Id')] = alvo.lstrip('/') if alvo.startswith('/') else posixpath.normpath(posixpath.join('xl', alvo))
+    return [(aba.get('name'), alvos[aba.get(f'{{{NS_REL}}}id')])
+            for aba in workbook.iter(f'{{{NS_PLANILHA}}}sheet')]
+
+def _estilo_data_hora(pacote):
+    """Índice (cellXfs) do estilo de data/hora já presente no arquivo, ou None."""
+    estilos = ET.fromstring(pacote.read('xl/styles.xml'))
+    formatos = {f.get('numFmtId') for f in estilos.iter(f'{{{NS_PLANILHA}}}numFmt')
+                if f.get('formatCode', '').lower() in FORMATOS_DATA_HORA}
+    formatos.add('22')   # formato interno "m/d/yy h:mm"
+    cell_xfs = estilos.find(f'{{{NS_PLANILHA}}}cellXfs')
+    for i, xf in enumerate(cell_xfs if cell_xfs is not None else []):
+        if xf.get('numFmtId') in formatos:
+            return i
+    return None
+
+def _estilo_cabecalho(pacote, caminho):
+    """Estilo da célula A1 de uma aba existente (o cabeçalho que o pandas gravou)."""
+    with pacote.open(caminho) as arquivo:
+        for _, elemento in ET.iterparse(arquivo):
+            if elemento.tag == f'{{{NS_PLANILHA}}}c':
+                return elemento.get('s')
+    return None
+
+def _rels_aba(caminho):
+    pasta, arquivo = posixpath.split(caminho)
+    return posixpath.join(pasta, '_rels', f'{arquivo}.rels')
+
+def _tem_formulas(pacote, caminho):
+    with pacote.open(caminho) as arquivo:
+        return any(elemento.tag == f'{{{NS_PLANILHA}}}f' for _, elemento in ET.iterparse(arquivo))
+
+def _letra_coluna(indice):
+    letras = ''
+    indice += 1
+    while indice:
+        indice, resto = divmod(indice - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+def _atributo_estilo(estilo):
+    return f' s="{estilo}"' if estilo is not None else ''
+
+def _texto_inline(valor):
+    texto = escape(_CARACTERES_INVALIDOS.sub('', valor))
+    return f' t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+
+def _numero(valor):
+    # Como o pandas grava: 1 e não 1.0
+    return str(int(valor)) if valor.is_integer() else repr(valor)
+
+def _celula_objeto(valor, estilo_data):
+    """Corpo da célula (depois de '<c r="..."') para um valor de coluna object; '' para vazio."""
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return ''
+    if isinstance(valor, str):
+        return _texto_inline(valor) if valor != '' else ''
+    if isinstance(valor, (bool, np.bool_)):
+        return f' t="b"><v>{int(valor)}</v></c>'
+    if isinstance(valor, (int, np.integer)):
+        return f' t="n"><v>{int(valor)}</v></c>'
+    if isinstance(valor, (float, np.floating)):
+        return f' t="n"><v>{_numero(float(valor))}</v></c>' if np.isfinite(valor) else ''
+    if isinstance(valor, pd.Timestamp) or hasattr(valor, 'isoformat'):
+        if estilo_data is None:
+            raise ValueError('sem estilo de data')
+        serial = (np.datetime64(pd.Timestamp(valor).tz_localize(None), 'ns') - EPOCA_EXCEL) / np.timedelta64(1, 'D')
+        return f'{_atributo_estilo(estilo_data)} t="n"><v>{_numero(float(serial))}</v></c>'
+    return _texto_inline(str(valor))
+
+def _corpos_coluna(serie, estilo_data):
+    """Corpos das células de uma coluna (vetorizado para numéricos, booleanos e datas)."""
+    if pd.api.types.is_bool_dtype(serie) and not serie.hasnans:
+        return pd.Series(np.where(serie.to_numpy(dtype=bool), ' t="b"><v>1</v></c>', ' t="b"><v>0</v></c>'),
+                         index=serie.index, dtype=object)
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        numeros = serie.astype('float64') if pd.api.types.is_float_dtype(serie) or serie.hasnans else serie
+        texto = numeros.astype(str)
+        if pd.api.types.is_float_dtype(numeros):
+            # Inteiros em coluna float: o pandas grava 1 e não 1.0
+            texto = texto.str.replace(r'\.0$', '', regex=True)
+        corpos = ' t="n"><v>' + texto + '</v></c>'
+        return corpos.where(np.isfinite(numeros.astype('float64')), '')
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        if estilo_data is None:
+            raise ValueError('sem estilo de data')
+        valores = serie.dt.tz_localize(None) if getattr(serie.dt, 'tz', None) is not None else serie
+        seriais = (valores.to_numpy(dtype='datetime64[ns]') - EPOCA_EXCEL) / np.timedelta64(1, 'D')
+        corpos = pd.Series([_numero(s) if s == s else '' for s in seriais.tolist()], index=serie.index, dtype=object)
+        corpos = f'{_atributo_estilo(estilo_data)} t="n"><v>' + corpos + '</v></c>'
+        return corpos.where(serie.notna(), '')
+    return serie.astype(object).map(lambda v: _celula_objeto(v, estilo_data))
+
+def xml_aba(df, estilo_cabecalho=None, estilo_data=None):
+    """XML completo de uma aba (cabeçalho + dados, sem índice), como o pandas grava com index=False."""
+    letras = [_letra_coluna(j) for j in range(df.shape[1])]
+    cabecalho = ''.join(f'<c r="{letra}1"{_atributo_estilo(estilo_cabecalho)}' + _texto_inline(str(nome))
+                        for letra, nome in zip(letras, df.columns))
+    partes = [f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<worksheet xmlns="{NS_PLANILHA}"><sheetData>',
+              f'<row r="1">{cabecalho}</row>']
+    if len(df):
+        numeros = pd.Series(np.arange(2, len(df) + 2), index=df.index).astype(str)
+        linhas = pd.Series('', index=df.index, dtype=object)
+        for j, letra in enumerate(letras):
+            corpos = _corpos_coluna(df.iloc[:, j], estilo_data)
+            celulas = ('<c r="' + letra + numeros + '"' + corpos).where(corpos != '', '')
+            linhas = linhas + celulas
+        partes.extend(('<row r="' + numeros + '">' + linhas + '</row>').tolist())
+    partes.append('</sheetData></worksheet>')
+    return ''.join(partes).encode('utf-8')
+
+def regravar_abas(original, abas, alteradas, destino):
+    """Grava em `destino` (arquivo binário) o pacote `original` com as abas `alteradas` trocadas.
+
+    `abas` = {nome: DataFrame} com todas as abas na ordem final. Retorna False (sem gravar nada
+    útil) se a regravação parcial não for possível; nesse caso grave a pasta inteira.
+    """
+    try:
+        with zipfile.ZipFile(original) as pacote:
+            caminhos = caminhos_abas(pacote)
+            if [nome for nome, _ in caminhos] != list(abas):
+                return False
+            existentes = set(pacote.namelist())
+            for nome, caminho in caminhos:
+                if nome in alteradas and (_rels_aba(caminho) in existentes or _tem_formulas(pacote, caminho)):
+                    return False
+            estilo_data = _estilo_data_hora(pacote)
+            estilo_cabecalho = _estilo_cabecalho(pacote, caminhos[0][1])
+            novos = {caminho: xml_aba(abas[nome], estilo_cabecalho, estilo_data)
+                     for nome, caminho in caminhos if nome in alteradas}
+            sem_cadeia = bool(novos) and CADEIA_CALCULO in existentes
+            with zipfile.ZipFile(destino, 'w', compression=zipfile.ZIP_DEFLATED) as saida:
+                for info in pacote.infolist():
+                    if info.filename in novos:
+                        saida.writestr(info.filename, novos[info.filename])
+                    elif sem_cadeia and info.filename == CADEIA_CALCULO:
+                        continue
+                    elif sem_cadeia and info.filename in _REFERENCIAS_CADEIA:
+                        saida.writestr(info, _REFERENCIAS_CADEIA[info.filename].sub(b'', pacote.read(info.filename)))
+                    else:
+                        saida.writestr(info, pacote.read(info.filename))
+        return True
+    except (KeyError, ValueError, ET.ParseError, zipfile.BadZipFile):
+        return False
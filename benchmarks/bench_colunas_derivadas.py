@@ -0,0 +1,81 @@
+# bench_colunas_derivadas.py
+# Micro-benchmark das colunas derivadas da tabela de ocorrências abertas:
+# versão antiga (apply linha a linha / concatenação sobre o DataFrame inteiro)
+# contra os kernels vetorizados de Dados/derivadas.py.
+#
+# Uso (na raiz do projeto):
+#     python -m benchmarks.bench_colunas_derivadas
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from Dados.derivadas import coluna_display, formatar_duracao, id_unico
+
+def gerar_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    ugs = np.array([f"UFV {i:04d}" for i in range(max(n // 50, 10))])
+    inicio = np.datetime64('2023-01-01T00:00:00')
+    return pd.DataFrame({
+        'UG': pd.Categorical(rng.choice(ugs, n)),
+        'Ativo': pd.Categorical(rng.choice(['Inversor', 'Tracker', 'String', 'UG', 'Religador'], n)),
+        'Nome Ativo': rng.choice([f"INV-{i:02d}" for i in range(40)], n),
+        'Ocorrência': pd.Categorical(rng.choice(['Falha de comunicação', 'Desarme', 'Sobretensão'], n)),
+        'Desligamento': inicio + rng.integers(0, 3 * 365 * 86400, n).astype('timedelta64[s]'),
+        'Tempo em Segundos': rng.integers(0, 90 * 86400, n),
+    })
+
+# --- Implementações anteriores, copiadas das páginas ---
+def formatar_tempo_estatico(row):
+    dias = row['Tempo em Segundos'] // 86400
+    horas = (row['Tempo em Segundos'] % 86400) // 3600
+    minutos = (row['Tempo em Segundos'] % 3600) // 60
+    return f"{dias}d {horas}h {minutos}m"
+
+def duracao_antiga(df):
+    return df.apply(formatar_tempo_estatico, axis=1)
+
+def display_antigo(df):
+    return df['UG'].astype(str) + " | " + \
+           df['Ativo'].astype(str) + " | " + \
+           df['Nome Ativo'].astype(str) + " | " + \
+           df['Ocorrência'].astype(str) + " | " + \
+           df['Desligamento'].dt.strftime('%d/%m/%Y %H:%M')
+
+def id_unico_antigo(df):
+    return df['UG'].astype(str).str.upper() + "|" + \
+           df['Ativo'].astype(str).str.upper() + "|" + \
+           df['Ocorrência'].astype(str).str.upper() + "|" + \
+           df['Desligamento'].astype(str)
+
+CASOS = [
+    ('Tempo de Desligamento', duracao_antiga, lambda df: formatar_duracao(df['Tempo em Segundos'])),
+    ('Display', display_antigo, coluna_display),
+    ('ID_Unico', id_unico_antigo, id_unico),
+]
+
+def cronometrar(funcao, df, repeticoes):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(df)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--linhas', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'coluna':24s} {'linhas':>8s} {'antes (ms)':>11s} {'depois (ms)':>12s} {'ganho':>7s}")
+    for n in args.linhas:
+        df = gerar_frame(n)
+        for nome, antiga, nova in CASOS:
+            assert antiga(df).equals(nova(df)), f"{nome}: resultados diferentes"
+            t_antes = cronometrar(antiga, df, args.repeticoes)
+            t_depois = cronometrar(nova, df, args.repeticoes)
+            print(f"{nome:24s} {n:8d} {t_antes * 1000:11.1f} {t_depois * 1000:12.1f} {t_antes / t_depois:6.1f}x")
+
+if __name__ == '__main__':
+    main()
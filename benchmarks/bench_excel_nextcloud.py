@@ -0,0 +1,82 @@
+# bench_excel_nextcloud.py
+# Compara a leitura da pasta de trabalho do Nextcloud: caminho antigo (todas as abas, todas as
+# colunas, openpyxl) contra a leitura seletiva por aba/colunas, com openpyxl e com calamine
+# (quando python-calamine está instalado). Mede tempo e pico de memória (tracemalloc).
+#
+# Uso (na raiz do projeto; não precisa de rede, o arquivo é gerado em memória):
+#     python -m benchmarks.bench_excel_nextcloud --linhas 20000 --abas 5 --repeticoes 3
+import argparse
+import importlib.util
+import io
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from NextCloud.nextcloud_connector import _ler_aba_de
+
+def gerar_pasta(linhas, abas, colunas=15):
+    """xlsx sintético com `abas` abas de `linhas` x `colunas` (texto, números e datas)."""
+    rng = np.random.default_rng(0)
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        for a in range(abas):
+            dados = {}
+            for c in range(colunas):
+                if c % 3 == 0:
+                    dados[f'Texto {c}'] = rng.choice(['UFV A', 'UFV B', 'UFV C', 'UFV D'], linhas)
+                elif c % 3 == 1:
+                    dados[f'Numero {c}'] = rng.integers(0, 1000, linhas)
+                else:
+                    dados[f'Data {c}'] = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 10**7, linhas), unit='s')
+            pd.DataFrame(dados).to_excel(writer, sheet_name=f'Aba{a}', index=False)
+    return buffer.getvalue()
+
+def medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(tempos), pico
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compara a leitura do .xlsx do Nextcloud: pasta inteira contra abas e colunas selecionadas.")
+    parser.add_argument('--linhas', type=int, default=20000)
+    parser.add_argument('--abas', type=int, default=5)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    conteudo = gerar_pasta(args.linhas, args.abas)
+    colunas = ('Texto 0', 'Numero 1', 'Data 2')
+    print(f"Pasta sintética: {args.abas} abas x {args.linhas} linhas x 15 colunas, {len(conteudo) / 1e6:.1f} MB")
+
+    # A leitura seletiva tem que bater com a mesma aba/colunas do caminho antigo
+    completo = pd.read_excel(io.BytesIO(conteudo), sheet_name=None, engine='openpyxl')
+    seletivo = _ler_aba_de(conteudo, 'Aba0', colunas)
+    pd.testing.assert_frame_equal(completo['Aba0'][list(colunas)], seletivo, check_dtype=False)
+
+    casos = {
+        'antigo: todas as abas (openpyxl)':
+            lambda: pd.read_excel(io.BytesIO(conteudo), sheet_name=None, engine='openpyxl'),
+        'seletivo: 1 aba, 3 colunas (openpyxl)':
+            lambda: pd.read_excel(io.BytesIO(conteudo), sheet_name='Aba0', usecols=list(colunas), engine='openpyxl'),
+    }
+    if importlib.util.find_spec('python_calamine'):
+        casos['seletivo: 1 aba, 3 colunas (calamine)'] = \
+            lambda: pd.read_excel(io.BytesIO(conteudo), sheet_name='Aba0', usecols=list(colunas), engine='calamine')
+        casos['todas as abas (calamine)'] = \
+            lambda: pd.read_excel(io.BytesIO(conteudo), sheet_name=None, engine='calamine')
+
+    for nome, funcao in casos.items():
+        tempo, pico = medir(funcao, args.repeticoes)
+        print(f"{nome:45s} {tempo * 1000:9.0f} ms   pico {pico / 1e6:8.1f} MB")
+
+if __name__ == '__main__':
+    main()
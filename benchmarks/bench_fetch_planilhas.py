@@ -0,0 +1,55 @@
+# bench_fetch_planilhas.py
+# Compara o tempo de carga das abas: caminho antigo (open_by_url + get_all_values por aba)
+# contra o download em lote (um único values:batchGet com o handle da planilha em cache).
+#
+# Uso (na raiz do projeto, com google_credentials.json presente):
+#     python -m benchmarks.bench_fetch_planilhas --repeticoes 5
+import argparse
+import statistics
+import time
+
+from GoogleSheets.sheets_connector import (
+    SPREADSHEET_URL, connect_to_google_sheets, fetch_sheet_as_df, fetch_sheets_as_dfs
+)
+from Dados.ocorrencias import TODAS_AS_ABAS
+
+def caminho_por_aba(client):
+    """Caminho original: reabre a planilha e baixa cada aba em sequência."""
+    workbook = client.open_by_url(SPREADSHEET_URL)
+    return {nome: fetch_sheet_as_df(workbook.worksheet(nome)) for nome in TODAS_AS_ABAS}
+
+def caminho_em_lote(workbook):
+    """Novo caminho: handle já aberto e uma única requisição para as quatro abas."""
+    return fetch_sheets_as_dfs(workbook, TODAS_AS_ABAS)
+
+def medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compara a carga das abas por aba (get_all_values) e em lote (values:batchGet).")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    client = connect_to_google_sheets()
+    workbook = client.open_by_url(SPREADSHEET_URL)
+
+    # Confere que os dois caminhos produzem os mesmos dados antes de medir
+    antigo, novo = caminho_por_aba(client), caminho_em_lote(workbook)
+    for nome in TODAS_AS_ABAS:
+        assert antigo[nome].equals(novo[nome]), f"Aba {nome} difere entre os caminhos"
+
+    resultados = {
+        'fetch_sheet_as_df (por aba)': medir(lambda: caminho_por_aba(client), args.repeticoes),
+        'fetch_sheets_as_dfs (em lote)': medir(lambda: caminho_em_lote(workbook), args.repeticoes),
+    }
+    for nome, tempos in resultados.items():
+        print(f"{nome:32s} mediana {statistics.median(tempos):.3f}s  min {min(tempos):.3f}s  max {max(tempos):.3f}s")
+
+if __name__ == '__main__':
+    main()
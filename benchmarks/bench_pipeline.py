@@ -0,0 +1,252 @@
+# bench_pipeline.py
+# Mede as etapas principais do app sobre dados sintéticos (benchmarks/gerador_ocorrencias.py)
+# em volumes crescentes de DESLIGAMENTOS + EQUIPAMENTOS:
+#   carga         valores da API -> DataFrame -> normalizar_ocorrencias -> tipar_ocorrencias
+#   facetas       índice de facetas do painel de filtros (uma vez por versão dos dados)
+#   filtro        bitmaps dos filtros + ocorrências abertas, como na Página Principal
+#   ordenacao     'Tempo em Segundos' + sort_values
+#   tabela        colunas formatadas da tabela e o rótulo do seletor de edição
+#   cards         HTML de uma página de cards (a maior do seletor)
+#   indice_edicao índice ID_Unico -> (posição, aba, linha), uma vez por versão dos dados
+#   busca_edicao  100 consultas ao índice + leitura da linha, como na página de edição
+#   indicadores   tempos de aviso/atendimento/normalização, percentis, faixas e tendência mensal
+#   agrupamento   resumo dos indicadores por cada dimensão da página de indicadores
+#   intervalos    índice de intervalos [Desligamento, Normalização)
+#   instantes     100 consultas "o que estava desligado em T" + contagem e pico do dia seguinte
+#   consulta      filtro + ordenação da Página Principal pela consulta canônica (falta no cache)
+#   consulta_cache a mesma consulta servida pelo cache de consultas (acerto, como em outra sessão)
+# As etapas reproduzem o código das páginas (que roda no corpo do script do Streamlit).
+#
+# Cada execução acrescenta uma linha JSON por (volume, etapa) ao arquivo de resultados,
+# com commit, versões e tempos, e mostra a variação em relação à medição anterior.
+#
+# Uso (na raiz do projeto; 1M linhas precisa de alguns GB de memória):
+#     python -m benchmarks.bench_pipeline --linhas 1000 10000 100000 1000000 --repeticoes 3
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from GoogleSheets.sheets_connector import valores_para_df
+from Dados.ocorrencias import normalizar_ocorrencias, tipar_ocorrencias, meses_cronologicos
+from Dados.facetas import IndiceFacetas
+from Dados.derivadas import coluna_display, formatar_duracao
+from Dados.escrita import indice_linhas
+from Dados.indicadores import IndicadoresTempo, DIMENSOES_AGRUPAMENTO
+from Dados.intervalos import IndiceIntervalos
+from Dados.consultas import Consulta, CacheConsultas, posicoes_desligadas
+from Dados.sincronizacao import COLUNA_LINHA
+from Componentes.cards import TAMANHOS_PAGINA, gerar_html_cards, fatia_pagina
+from benchmarks.gerador_ocorrencias import gerar_planilha, como_valores
+
+ARQUIVO_RESULTADOS = os.path.join('benchmarks', 'resultados', 'pipeline.jsonl')
+COLUNAS_TABELA = ['Linha', 'Categoria', 'Tempo de Desligamento', 'UG', 'Data', 'Hora', 'Tipo de ocorrência',
+                  'Ativo', 'Ocorrência', 'Operador', 'Descrição', 'OS']
+CONSULTAS_EDICAO = 100
+CONSULTAS_INSTANTES = 100
+AGORA = datetime(2026, 1, 1)   # fixo: 'Tempo em Segundos' não depende do dia da medição
+
+def commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def selecao_tipica(indice):
+    """Filtros de uma sessão comum: último ano inteiro, metade dos clientes, demais dimensões completas."""
+    clientes = indice.opcoes('Cliente')
+    ano = max(indice.opcoes('Ano'))
+    return {
+        'Mês': meses_cronologicos,
+        'Ano': [ano],
+        'Dia': indice.opcoes('Dia'),
+        'Categoria': indice.opcoes('Categoria'),
+        'Cliente': clientes[:max(len(clientes) // 2, 1)],
+        'UG': indice.opcoes('UG'),
+        'Tipo de ocorrência': indice.opcoes('Tipo de ocorrência'),
+        'Ativo': indice.opcoes('Ativo'),
+        'Ocorrência': indice.opcoes('Ocorrência'),
+    }
+
+# --- Etapas (cada uma recebe o estado e devolve o que a próxima usa) ---
+def etapa_carga(estado):
+    frames = []
+    for aba in ('DESLIGAMENTOS', 'EQUIPAMENTOS'):
+        # Como EstadoAba.como_df: texto da API + número da linha na planilha
+        df = valores_para_df(estado['valores'][aba])
+        df[COLUNA_LINHA] = pd.array(range(2, len(df) + 2), dtype='int64')
+        frames.append(df)
+    return {'df': tipar_ocorrencias(normalizar_ocorrencias(*frames))}
+
+def etapa_facetas(estado):
+    return {'indice': IndiceFacetas(estado['df'])}
+
+def etapa_filtro(estado):
+    df = estado['df']
+    df_filtrado = df[estado['indice'].filtrar(selecao_tipica(estado['indice']))]
+    return {'df_desligadas': df_filtrado[df_filtrado['Normalização'].isna()].copy()}
+
+def etapa_ordenacao(estado):
+    df_desligadas = estado['df_desligadas'].copy()
+    df_desligadas['Tempo em Segundos'] = (AGORA - df_desligadas['Desligamento']).dt.total_seconds().astype(int)
+    return {'df_sorted': df_desligadas.sort_values(by='Desligamento', ascending=False)}
+
+def etapa_tabela(estado):
+    df_sorted = estado['df_sorted'].copy()
+    df_sorted['Display'] = estado['display'].loc[df_sorted.index]
+    df_para_tabela = df_sorted.reset_index(drop=True)
+    df_para_tabela['Tempo de Desligamento'] = formatar_duracao(df_para_tabela['Tempo em Segundos'])
+    df_para_tabela['Linha'] = df_para_tabela.index + 1
+    return {'tabela': df_para_tabela[COLUNAS_TABELA]}
+
+def etapa_cards(estado):
+    return {'html': gerar_html_cards(fatia_pagina(estado['df_sorted'], 1, max(TAMANHOS_PAGINA)))}
+
+def etapa_indice_edicao(estado):
+    return {'localizacao': indice_linhas(estado['df'])}
+
+def etapa_busca_edicao(estado):
+    df = estado['df']
+    for id_ in estado['ids_consulta']:
+        posicao, _, _ = estado['localizacao'][id_]
+        df.iloc[posicao].to_dict()
+    return {}
+
+def etapa_indicadores(estado):
+    return {'indicadores': IndicadoresTempo(estado['df'])}
+
+def etapa_agrupamento(estado):
+    # por_dimensao guarda o resultado da primeira chamada: cada repetição começa sem nenhum
+    indicadores = estado['indicadores']
+    indicadores._por_dimensao.clear()
+    for dimensao in DIMENSOES_AGRUPAMENTO:
+        indicadores.por_dimensao(dimensao)
+    return {}
+
+def etapa_intervalos(estado):
+    return {'intervalos': IndiceIntervalos(estado['df'])}
+
+def etapa_instantes(estado):
+    indice = estado['intervalos']
+    for instante in estado['instantes_consulta']:
+        estado['df'].iloc[indice.em(instante)]
+        indice.simultaneas(instante)
+        indice.pico(instante, instante + pd.Timedelta(days=1))
+    return {}
+
+def etapa_consulta(estado):
+    indice = estado['indice']
+    consulta = Consulta.de_selecao(selecao_tipica(indice), indice)
+    cache = CacheConsultas()
+    estado['df'].iloc[cache.obter(consulta, lambda: posicoes_desligadas(estado['df'], indice, consulta))]
+    return {'consulta': consulta, 'cache_consultas': cache}
+
+def etapa_consulta_cache(estado):
+    estado['df'].iloc[estado['cache_consultas'].obter(estado['consulta'], None)]
+    return {}
+
+ETAPAS = [
+    ('carga', etapa_carga),
+    ('facetas', etapa_facetas),
+    ('filtro', etapa_filtro),
+    ('ordenacao', etapa_ordenacao),
+    ('tabela', etapa_tabela),
+    ('cards', etapa_cards),
+    ('indice_edicao', etapa_indice_edicao),
+    ('busca_edicao', etapa_busca_edicao),
+    ('indicadores', etapa_indicadores),
+    ('agrupamento', etapa_agrupamento),
+    ('intervalos', etapa_intervalos),
+    ('instantes', etapa_instantes),
+    ('consulta', etapa_consulta),
+    ('consulta_cache', etapa_consulta_cache),
+]
+
+def medir(funcao, estado, repeticoes):
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(estado)
+        tempos.append(time.perf_counter() - inicio)
+    return tempos, resultado
+
+def medicoes_anteriores(caminho):
+    """Última medição registrada de cada (linhas, etapa)."""
+    anteriores = {}
+    if os.path.exists(caminho):
+        with open(caminho, encoding='utf-8') as arquivo:
+            for linha in arquivo:
+                if linha.strip():
+                    registro = json.loads(linha)
+                    anteriores[(registro['linhas'], registro['etapa'])] = registro
+    return anteriores
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark das etapas do app com dados sintéticos.')
+    parser.add_argument('--linhas', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--saida', default=ARQUIVO_RESULTADOS,
+                        help='arquivo JSON Lines onde cada medição é acrescentada')
+    args = parser.parse_args()
+
+    anteriores = medicoes_anteriores(args.saida)
+    contexto = {
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit_atual(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'maquina': platform.node(),
+        'repeticoes': args.repeticoes,
+        'seed': args.seed,
+    }
+    os.makedirs(os.path.dirname(args.saida) or '.', exist_ok=True)
+
+    print(f"{'linhas':>9s} {'etapa':15s} {'melhor (ms)':>12s} {'mediana (ms)':>13s} {'anterior':>10s}")
+    with open(args.saida, 'a', encoding='utf-8') as saida:
+        for n in args.linhas:
+            abas = gerar_planilha(n, args.seed)
+            estado = {'valores': {aba: como_valores(abas[aba]) for aba in ('DESLIGAMENTOS', 'EQUIPAMENTOS')}}
+            del abas
+            for nome, funcao in ETAPAS:
+                if nome == 'tabela':
+                    # O rótulo do seletor é calculado uma vez por versão (display_ocorrencias), fora do rerun
+                    estado['display'] = coluna_display(estado['df'])
+                if nome == 'busca_edicao':
+                    rng = np.random.default_rng(args.seed)
+                    ids = estado['df']['ID_Unico'].to_numpy()
+                    estado['ids_consulta'] = ids[rng.integers(0, len(ids), min(CONSULTAS_EDICAO, len(ids)))]
+                if nome == 'instantes':
+                    rng = np.random.default_rng(args.seed)
+                    desligamentos = estado['df']['Desligamento'].dropna()
+                    estado['instantes_consulta'] = pd.to_datetime(rng.integers(
+                        desligamentos.min().value, desligamentos.max().value, CONSULTAS_INSTANTES))
+                tempos, resultado = medir(funcao, estado, args.repeticoes)
+                estado.update(resultado)
+                if nome == 'carga':
+                    del estado['valores']
+
+                registro = dict(contexto, linhas=n, etapa=nome,
+                                melhor_ms=round(min(tempos) * 1000, 3),
+                                mediana_ms=round(statistics.median(tempos) * 1000, 3),
+                                linhas_resultado=len(estado['df_sorted']) if nome == 'ordenacao' else None)
+                saida.write(json.dumps(registro, ensure_ascii=False) + '\n')
+                saida.flush()
+
+                anterior = anteriores.get((n, nome))
+                variacao = f"{registro['melhor_ms'] / anterior['melhor_ms'] - 1:+.0%}" if anterior and anterior['melhor_ms'] else '-'
+                print(f"{n:9d} {nome:15s} {registro['melhor_ms']:12.1f} {registro['mediana_ms']:13.1f} {variacao:>10s}")
+    print(f"Resultados acrescentados em {args.saida}")
+
+if __name__ == '__main__':
+    main()
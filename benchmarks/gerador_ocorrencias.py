@@ -0,0 +1,159 @@
+# gerador_ocorrencias.py
+# Dados sintéticos no formato da planilha, para medir o app com qualquer volume sem rede:
+#   - DADOS: catálogo de clientes e UGs (mais as listas de tipos, ativos, ocorrências e operadores);
+#   - Usinas_Detalhado: inversores, trackers e strings de cada usina;
+#   - DESLIGAMENTOS e EQUIPAMENTOS: ocorrências com datas variadas, parte ainda aberta
+#     (Normalização em branco) e uma fração digitada à mão em outro formato de data.
+# Tudo em texto, como a API de valores entrega (valores_para_df). Gerado com numpy, sem laço por linha.
+#
+# Uso (na raiz do projeto):
+#     python -m benchmarks.gerador_ocorrencias --linhas 100000 --xlsx sintetico.xlsx
+import argparse
+import numpy as np
+import pandas as pd
+
+CABECALHO_OCORRENCIAS = [
+    'IDENTIFICADOR', 'CLIENTE', 'UG', 'SIGLA', 'TIPO DE OCORRÊNCIA', 'ATIVO', 'NOME ATIVO', 'OCORRÊNCIA',
+    'QUANTIDADE', 'OPERADOR', 'DESLIGAMENTO', 'CLIENTE AVISADO', 'ATENDIMENTO LOOP',
+    'ATENDIMENTO TERCEIROS', 'NORMALIZAÇÃO', 'DESCRIÇÃO', 'PROTOCOLO', 'OS',
+]
+TIPOS_OCORRENCIA = ['Desligamento total', 'Desligamento parcial', 'Perda de comunicação', 'Baixa geração']
+ATIVOS = ['UG', 'Inversor', 'Tracker', 'String', 'Religador', 'Transformador']
+OCORRENCIAS = ['Falha de comunicação', 'Desarme', 'Sobretensão', 'Subtensão', 'Falha de isolamento',
+               'Manutenção preventiva', 'Queda de rede da concessionária']
+OPERADORES = [f'Operador {i:02d}' for i in range(1, 21)]
+FRACAO_EQUIPAMENTOS = 0.3
+FRACAO_ABERTAS = 0.05
+FRACAO_DATA_MANUAL = 0.01
+PERIODO_SEGUNDOS = 3 * 365 * 86400
+
+def _objetos(valores):
+    # Arrays object: rng.choice devolve referências às mesmas strings (pouca memória em 1M linhas)
+    return np.array(list(valores), dtype=object)
+
+def gerar_catalogos(n_usinas=200, seed=0):
+    """(DADOS, Usinas_Detalhado) como DataFrames de texto."""
+    rng = np.random.default_rng(seed)
+    n_clientes = max(n_usinas // 8, 3)
+    clientes = [f'Cliente {i:03d}' for i in range(n_clientes)]
+    ugs = [f'UFV {i:04d}' for i in range(n_usinas)]
+    comprimento = max(n_usinas, len(OCORRENCIAS), len(OPERADORES))
+
+    def coluna(valores):
+        return list(valores) + [''] * (comprimento - len(valores))
+
+    dados = pd.DataFrame({
+        'CLIENTE': coluna(rng.choice(clientes, n_usinas).tolist()),
+        'UG': coluna(ugs),
+        'SIGLA': coluna([f'U{i:04d}' for i in range(n_usinas)]),
+        'TIPO DE OCORRÊNCIA': coluna(TIPOS_OCORRENCIA),
+        'ATIVO': coluna(ATIVOS),
+        'OCORRÊNCIA': coluna(OCORRENCIAS),
+        'OPERADOR': coluna(OPERADORES),
+    })
+
+    # Por usina: alguns inversores, cada um com trackers e strings
+    inversores_por_usina = rng.integers(2, 9, n_usinas)
+    usina = np.repeat(ugs, inversores_por_usina * 4)
+    inversor = np.concatenate([np.repeat([f'INV-{j:02d}' for j in range(1, k + 1)], 4) for k in inversores_por_usina])
+    sequencia = np.tile(np.arange(1, 5), len(inversor) // 4)
+    detalhado = pd.DataFrame({
+        'Usina': usina,
+        'Inversor Conectado': inversor,
+        'Tracker Conectado': [f'TRK-{i}-{s}' for i, s in zip(inversor, sequencia)],
+        'Nome String': [f'STR-{i}-{s}' for i, s in zip(inversor, sequencia)],
+    })
+    return dados, detalhado
+
+def _datas_texto(base_s, deslocamento_s, vazias):
+    """Datas (segundos desde a época) no formato gravado pelo app; '' onde `vazias`."""
+    datas = (base_s + deslocamento_s).astype('datetime64[s]')
+    texto = np.char.replace(np.datetime_as_string(datas, unit='s'), 'T', ' ').astype(object)
+    texto[vazias] = ''
+    return texto
+
+def gerar_aba_ocorrencias(n, dados, detalhado, seed=0):
+    """DataFrame de texto com `n` ocorrências e os cabeçalhos da planilha."""
+    rng = np.random.default_rng(seed)
+    catalogo = dados[dados['UG'] != '']
+    escolha = rng.integers(0, len(catalogo), n)
+    ugs = _objetos(catalogo['UG'])[escolha]
+    ativos = _objetos(ATIVOS)[rng.choice(len(ATIVOS), n, p=[0.35, 0.3, 0.15, 0.1, 0.05, 0.05])]
+
+    # Nome do ativo: o próprio nome da usina para UG/religador/trafo, um inversor qualquer para os demais
+    nomes_inversor = _objetos(detalhado['Inversor Conectado'].unique())
+    nomes = np.where(np.isin(ativos, ['Inversor', 'Tracker', 'String']),
+                     nomes_inversor[rng.integers(0, len(nomes_inversor), n)], ugs)
+
+    inicio = np.datetime64('2023-01-01T00:00:00', 's').astype('int64')
+    desligamento = inicio + rng.integers(0, PERIODO_SEGUNDOS, n)
+    abertas = rng.random(n) < FRACAO_ABERTAS
+    sem_aviso = rng.random(n) < 0.2
+    sem_loop = rng.random(n) < 0.4
+    sem_terceiros = rng.random(n) < 0.8
+
+    desligamento_texto = _datas_texto(desligamento, 0, np.zeros(n, dtype=bool))
+    manuais = np.flatnonzero(rng.random(n) < FRACAO_DATA_MANUAL)
+    if len(manuais):
+        # Digitadas à mão na planilha: dd/mm/aaaa hh:mm (cai na inferência de converter_datas)
+        desligamento_texto[manuais] = pd.to_datetime(desligamento[manuais], unit='s').strftime('%d/%m/%Y %H:%M').to_numpy()
+
+    protocolos = rng.integers(10000, 99999, n).astype(str).astype(object)
+    protocolos[rng.random(n) < 0.5] = ''
+    descricoes = _objetos(['', 'Equipe acionada.', 'Aguardando concessionária.',
+                           'Reset remoto sem sucesso.\nVisita técnica agendada.'])
+
+    return pd.DataFrame({
+        'IDENTIFICADOR': np.arange(1, n + 1).astype(str).astype(object),
+        'CLIENTE': _objetos(catalogo['CLIENTE'])[escolha],
+        'UG': ugs,
+        'SIGLA': _objetos(catalogo['SIGLA'])[escolha],
+        'TIPO DE OCORRÊNCIA': _objetos(TIPOS_OCORRENCIA)[rng.integers(0, len(TIPOS_OCORRENCIA), n)],
+        'ATIVO': ativos,
+        'NOME ATIVO': nomes,
+        'OCORRÊNCIA': _objetos(OCORRENCIAS)[rng.integers(0, len(OCORRENCIAS), n)],
+        'QUANTIDADE': rng.integers(1, 5, n).astype(str).astype(object),
+        'OPERADOR': _objetos(OPERADORES)[rng.integers(0, len(OPERADORES), n)],
+        'DESLIGAMENTO': desligamento_texto,
+        'CLIENTE AVISADO': _datas_texto(desligamento, rng.integers(60, 3600, n), sem_aviso),
+        'ATENDIMENTO LOOP': _datas_texto(desligamento, rng.integers(300, 4 * 3600, n), sem_loop),
+        'ATENDIMENTO TERCEIROS': _datas_texto(desligamento, rng.integers(3600, 3 * 86400, n), sem_terceiros),
+        'NORMALIZAÇÃO': _datas_texto(desligamento, rng.integers(600, 7 * 86400, n), abertas),
+        'DESCRIÇÃO': descricoes[rng.integers(0, len(descricoes), n)],
+        'PROTOCOLO': protocolos,
+        'OS': np.where(rng.random(n) < 0.3, 'OS' + rng.integers(1000, 9999, n).astype(str), '').astype(object),
+    }, columns=CABECALHO_OCORRENCIAS)
+
+def gerar_planilha(linhas, seed=0):
+    """{aba: DataFrame de texto} com as quatro abas; `linhas` ocorrências no total."""
+    n_usinas = int(min(max(linhas // 50, 20), 5000))
+    dados, detalhado = gerar_catalogos(n_usinas, seed)
+    n_equipamentos = int(linhas * FRACAO_EQUIPAMENTOS)
+    return {
+        'DESLIGAMENTOS': gerar_aba_ocorrencias(linhas - n_equipamentos, dados, detalhado, seed + 1),
+        'EQUIPAMENTOS': gerar_aba_ocorrencias(n_equipamentos, dados, detalhado, seed + 2),
+        'DADOS': dados,
+        'Usinas_Detalhado': detalhado,
+    }
+
+def como_valores(df):
+    """Matriz [cabeçalho, linha, ...] como a API de valores devolve (entrada de valores_para_df)."""
+    return [list(df.columns)] + df.to_numpy(dtype=object).tolist()
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera uma planilha sintética de ocorrências.')
+    parser.add_argument('--linhas', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--xlsx', help='grava as quatro abas neste arquivo (ex.: para o SQLite local ou o Nextcloud)')
+    args = parser.parse_args()
+    abas = gerar_planilha(args.linhas, args.seed)
+    for nome, df in abas.items():
+        print(f"{nome:18s} {len(df):>9d} linhas x {df.shape[1]} colunas")
+    if args.xlsx:
+        with pd.ExcelWriter(args.xlsx) as writer:
+            for nome, df in abas.items():
+                df.to_excel(writer, sheet_name=nome, index=False)
+        print(f"Gravado em {args.xlsx}")
+
+if __name__ == '__main__':
+    main()
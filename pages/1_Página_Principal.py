@@ -1,27 +1,30 @@
-import os
-from webdav3.client import Client
-import io
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-import html
-import gspread
-from google.oauth2.service_account import Credentials
-from gspread_dataframe import get_as_dataframe
+from Dados.ocorrencias import (versao_ocorrencias, obter_atualizador, atualizar_agora, memoria_por_coluna,
+                              indice_facetas, display_ocorrencias, desligadas_da_consulta, meses_traducao,
+                              meses_cronologicos)
+from Dados.consultas import Consulta, ORDENACOES, PARAMETROS_CONSULTA
+from Dados.derivadas import formatar_duracao
+from Componentes.cards import TAMANHOS_PAGINA, gerar_html_cards, total_paginas, fatia_pagina
+from Componentes.desempenho import iniciar_medicao, painel_desempenho, medir_fragmento
+from Dados.instrumentacao import etapa
+
+PAGINA = "Página Principal"
+INTERVALOS_ATUALIZACAO = {'30 s': 30, '1 min': 60, '5 min': 300}
+ORDENS = ['Descendente', 'Ascendente']
+# Dimensão -> lista de valores iniciais no session_state
+CHAVES_FILTROS = {
+    'Mês': 'filtros_meses', 'Ano': 'filtros_anos', 'Dia': 'filtros_dias', 'Categoria': 'filtros_categorias',
+    'Cliente': 'filtros_clientes', 'UG': 'filtros_ugs', 'Tipo de ocorrência': 'filtros_tipos',
+    'Ativo': 'filtros_ativos', 'Ocorrência': 'filtros_ocorrencias',
+}
 
 # --- 1. Configuração da Página e Layout ---
 st.set_page_config(layout="wide")
+iniciar_medicao(PAGINA)
 
-# --- 2. Dicionário para tradução dos meses ---
-meses_traducao = {
-    'January': 'Janeiro', 'February': 'Fevereiro', 'March': 'Março',
-    'April': 'Abril', 'May': 'Maio', 'June': 'Junho',
-    'July': 'Julho', 'August': 'Agosto', 'September': 'Setembro',
-    'October': 'Outubro', 'November': 'Novembro', 'December': 'Dezembro'
-}
-meses_cronologicos = list(meses_traducao.values())
-
-# --- 3. CSS ---
+# --- 2. CSS ---
 st.markdown("""
 <style>
     .stButton > button {
@@ -73,186 +76,163 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# --- 4. Carregar e Tratar os Dados ---
-
-# Define os "escopos" - as permissões que nosso script solicitará.
-SCOPES = [
-    "https://www.googleapis.com/auth/spreadsheets",
-    "https://www.googleapis.com/auth/drive",
-]
-
-# Nome das planilhas que vamos ler
-CREDS_FILE = "google_credentials.json"
-PLANILHA_NOME_1 = "DESLIGAMENTOS"
-PLANILHA_NOME_2 = "EQUIPAMENTOS"
-
-@st.cache_resource(ttl=600)
-def connect_to_google_sheets():
-    # Verifica se está rodando localmente (o arquivo existe) ou na nuvem (usa st.secrets)
-    if os.path.exists(CREDS_FILE):
-        creds = Credentials.from_service_account_file(CREDS_FILE, scopes=SCOPES)
-    else:
-        creds = Credentials.from_service_account_info(st.secrets["gcp_service_account"], scopes=SCOPES)
-    
-    client = gspread.authorize(creds)
-    return client
-
-def fetch_sheet_as_df(worksheet):
-    data = worksheet.get_all_values()
-    if not data:
-        return pd.DataFrame()
-    
-    headers = [header.strip() for header in data.pop(0)]
-    df = pd.DataFrame(data, columns=headers)
-    return df
-
-@st.cache_data(ttl=600)
-def carregar_dados_google_sheets():
-    try:
-        client = connect_to_google_sheets()
-        spreadsheet_url = "https://docs.google.com/spreadsheets/d/1KeJjbsLVP9DkxPCmNSN4VzbSBeG3SFSCAdPhir39iqg/edit?usp=sharing"
-        workbook = client.open_by_url(spreadsheet_url)
-
-        df_desligamentos = fetch_sheet_as_df(workbook.worksheet(PLANILHA_NOME_1))
-        df_equipamentos = fetch_sheet_as_df(workbook.worksheet(PLANILHA_NOME_2))
-
-        if 'IDENTIFICADOR' in df_desligamentos.columns:
-            df_desligamentos['IDENTIFICADOR'] = df_desligamentos['IDENTIFICADOR'].astype(str)
-        if 'IDENTIFICADOR' in df_equipamentos.columns:
-            df_equipamentos['IDENTIFICADOR'] = df_equipamentos['IDENTIFICADOR'].astype(str)
-
-        df_desligamentos.dropna(how='all', inplace=True)
-        df_equipamentos.dropna(how='all', inplace=True)
-        
-        df_desligamentos['Categoria'] = 'DESLIGAMENTOS'
-        df_equipamentos['Categoria']  = 'EQUIPAMENTOS'
-        df_todos_dados = pd.concat([df_desligamentos, df_equipamentos], ignore_index=True)
-
-        mapa_renomear = {
-            'IDENTIFICADOR': 'Identificador', 'CLIENTE': 'Cliente', 'UG': 'UG', 'TIPO DE OCORRÊNCIA': 'Tipo de ocorrência',
-            'ATIVO': 'Ativo', 'NOME ATIVO': 'Nome Ativo', 'OCORRÊNCIA': 'Ocorrência',
-            'QUANTIDADE': 'Quantidade', 'SIGLA': 'Sigla', 'NORMALIZAÇÃO': 'Normalização',
-            'DESLIGAMENTO': 'Desligamento', 'OPERADOR': 'Operador', 'DESCRIÇÃO': 'Descrição',
-            'OS': 'OS', 'ATENDIMENTO LOOP': 'Atendimento Loop',
-            'ATENDIMENTO TERCEIROS': 'Atendimento Terceiros', 'PROTOCOLO': 'Protocolo', 'CLIENTE AVISADO': 'Cliente Avisado'
-        }
-        colunas_atuais = df_todos_dados.columns
-        renomear_final = {}
-        for col in colunas_atuais:
-            col_strip_upper = col.strip().upper()
-            if col_strip_upper in mapa_renomear:
-                renomear_final[col] = mapa_renomear[col_strip_upper]
-        df_todos_dados.rename(columns=renomear_final, inplace=True)
-
-        df_todos_dados.fillna('', inplace=True)
-
-        # Garante que a coluna 'Cliente' existe antes de filtrar
-        if 'Cliente' in df_todos_dados.columns:
-            df_todos_dados = df_todos_dados[
-                (df_todos_dados['Cliente'] != '') &
-                (df_todos_dados['UG'] != '') &
-                (df_todos_dados['Sigla'] != '')
-            ].copy()
-        
-        colunas_datetime = ['Normalização', 'Desligamento', 'Atendimento Loop', 'Atendimento Terceiros', 'Cliente Avisado']
-        for col in colunas_datetime:
-            if col in df_todos_dados.columns:
-                df_todos_dados[col] = pd.to_datetime(df_todos_dados[col], errors='coerce')
-
-        colunas_texto = ['Operador', 'Descrição', 'OS', 'Protocolo']
-        for col in colunas_texto:
-            if col in df_todos_dados.columns:
-                 df_todos_dados[col] = df_todos_dados[col].astype(str).fillna('')
-
-        # Verifica se a coluna 'Desligamento' existe e não está vazia antes de processar
-        if 'Desligamento' in df_todos_dados.columns and not df_todos_dados['Desligamento'].isnull().all():
-            df_todos_dados['Data'] = df_todos_dados['Desligamento'].dt.strftime('%Y-%m-%d')
-            df_todos_dados['Hora'] = df_todos_dados['Desligamento'].dt.strftime('%H:%M:%S')
-            df_todos_dados['Mês']  = df_todos_dados['Desligamento'].dt.strftime('%B').map(meses_traducao)
-            df_todos_dados['Ano']  = df_todos_dados['Desligamento'].dt.year.fillna(0).astype(int)
-            df_todos_dados['Dia']  = df_todos_dados['Desligamento'].dt.day.fillna(0).astype(int)
-
-            df_todos_dados['ID_Unico'] = df_todos_dados['UG'].astype(str).str.upper() + "|" + \
-                                    df_todos_dados['Ativo'].astype(str).str.upper() + "|" + \
-                                    df_todos_dados['Ocorrência'].astype(str).str.upper() + "|" + \
-                                    df_todos_dados['Desligamento'].astype(str)
-        else:
-            # Cria colunas vazias se 'Desligamento' não existir, para evitar erros posteriores
-            for col in ['Data', 'Hora', 'Mês', 'Ano', 'Dia', 'ID_Unico']:
-                df_todos_dados[col] = None
-
-
-        return df_todos_dados
-
-    except FileNotFoundError:
-        st.error(f"Erro: O arquivo de credenciais '{CREDS_FILE}' não foi encontrado. Verifique se ele está na mesma pasta do seu script principal (app.py).")
-        return pd.DataFrame()
-    except gspread.exceptions.SpreadsheetNotFound:
-        st.error("Erro: Planilha não encontrada. Verifique o link e se você compartilhou a planilha com o email da conta de serviço.")
-        return pd.DataFrame()
-    except Exception as e:
-        st.error(f"Ocorreu um erro ao carregar ou processar os dados do Google Sheets: {e}")
-        return pd.DataFrame()
-
-
-
-df_todos_dados = carregar_dados_google_sheets()
-
+# --- 3. Carregar e Tratar os Dados ---
+# O DataFrame canônico vem da camada compartilhada (mesma versão em memória usada pelas outras páginas).
+with etapa('dados'):
+    versao_dados = versao_ocorrencias()
+df_todos_dados = versao_dados.df if versao_dados is not None else pd.DataFrame()
+
+# Índice de facetas: opções ordenadas e bitmaps por valor, construído uma vez por versão dos dados.
+with etapa('facetas'):
+    indice = indice_facetas(versao_dados.numero, df_todos_dados) if not df_todos_dados.empty else None
+
+if indice is not None:
+    with st.sidebar.expander("Memória dos dados"):
+        memoria = memoria_por_coluna(versao_dados.numero, df_todos_dados)
+        st.caption(f"{len(df_todos_dados)} linhas, {memoria['Bytes'].sum() / 1024 ** 2:.2f} MB no total")
+        st.dataframe(memoria, hide_index=True, use_container_width=True)
+
+
+# --- 4. Inicialização dos Filtros ---
+# Um link com a visão (?mes=...&ug=...&ordem=...) define os filtros iniciais da sessão.
+def parametros_da_url():
+    return {p: st.query_params.get_all(p) for p in PARAMETROS_CONSULTA if p in st.query_params}
+
+if indice and 'url_aplicada' not in st.session_state:
+    st.session_state.url_aplicada = True
+    parametros = parametros_da_url()
+    if parametros:
+        consulta_url = Consulta.de_parametros(parametros, indice)
+        for dim, valores in consulta_url.selecao(indice).items():
+            st.session_state[CHAVES_FILTROS[dim]] = valores
+        st.session_state.ordenar_por = next(r for r, c in ORDENACOES.items() if c == consulta_url.ordenar_por)
+        st.session_state.ordem_lista = ORDENS[int(consulta_url.crescente)]
 
-# Garante que a coluna de data/hora está no formato correto
-df_todos_dados['Desligamento'] = pd.to_datetime(df_todos_dados['Desligamento'], errors='coerce')
-
-
-# --- 5. Inicialização dos Filtros ---
 if 'filtros_meses' not in st.session_state:
     st.session_state.filtros_meses = [meses_traducao[datetime.now().strftime('%B')]]
 if 'filtros_anos' not in st.session_state:
-    if not df_todos_dados.empty and 'Ano' in df_todos_dados.columns:
-        anos_atuais = sorted(df_todos_dados['Ano'].unique().tolist())
-        st.session_state.filtros_anos = [a for a in anos_atuais if a != 0]
-    else:
-        st.session_state.filtros_anos = []
+    st.session_state.filtros_anos = [a for a in indice.opcoes('Ano') if a != 0] if indice else []
 if 'filtros_dias' not in st.session_state:
-    if not df_todos_dados.empty and {'Mês','Ano'}.issubset(df_todos_dados.columns):
-        dias_atuais = sorted(df_todos_dados[(df_todos_dados['Mês'].isin(st.session_state.filtros_meses)) & (df_todos_dados['Ano'].isin(st.session_state.filtros_anos))]['Dia'].unique().tolist())
-        st.session_state.filtros_dias = [d for d in dias_atuais if d != 0]
+    if indice:
+        mascara_periodo = indice.filtrar({'Mês': st.session_state.filtros_meses, 'Ano': st.session_state.filtros_anos})
+        st.session_state.filtros_dias = [d for d in indice.opcoes_onde('Dia', mascara_periodo) if d != 0]
     else:
         st.session_state.filtros_dias = []
 if 'filtros_categorias' not in st.session_state:
-    st.session_state.filtros_categorias = sorted(df_todos_dados['Categoria'].unique().tolist()) if not df_todos_dados.empty else []
+    st.session_state.filtros_categorias = indice.opcoes('Categoria') if indice else []
 if 'filtros_clientes' not in st.session_state:
-    st.session_state.filtros_clientes = sorted(df_todos_dados['Cliente'].unique().tolist()) if not df_todos_dados.empty else []
+    st.session_state.filtros_clientes = indice.opcoes('Cliente') if indice else []
 if 'filtros_ugs' not in st.session_state:
-    st.session_state.filtros_ugs = sorted(df_todos_dados['UG'].unique().tolist()) if not df_todos_dados.empty else []
+    st.session_state.filtros_ugs = indice.opcoes('UG') if indice else []
 if 'filtros_tipos' not in st.session_state:
-    st.session_state.filtros_tipos = sorted(df_todos_dados['Tipo de ocorrência'].unique().tolist()) if not df_todos_dados.empty else []
+    st.session_state.filtros_tipos = indice.opcoes('Tipo de ocorrência') if indice else []
 if 'filtros_ativos' not in st.session_state:
-    st.session_state.filtros_ativos = sorted(df_todos_dados['Ativo'].unique().tolist()) if not df_todos_dados.empty else []
+    st.session_state.filtros_ativos = indice.opcoes('Ativo') if indice else []
 if 'filtros_ocorrencias' not in st.session_state:
-    st.session_state.filtros_ocorrencias = sorted(df_todos_dados['Ocorrência'].unique().tolist()) if not df_todos_dados.empty else []
+    st.session_state.filtros_ocorrencias = indice.opcoes('Ocorrência') if indice else []
+
+# --- 5. Filtros escolhidos e atualização automática ---
+# Os KPIs e a lista de ocorrências ficam em fragmentos. Com a atualização automática ligada,
+# só eles rodam de novo a cada intervalo, sobre a versão quente dos dados e os índices já em
+# cache, sem reconstruir o painel de filtros. Por isso a seleção é lida do session_state, e não
+# das variáveis do rerun completo.
+def selecao_filtros(indice):
+    """Filtros escolhidos no painel. Antes de um checkbox existir, vale o valor inicial que ele vai receber."""
+    anos = [a for a in indice.opcoes('Ano')
+            if a != 0 and st.session_state.get(f'cb_ano_{a}', a in st.session_state.filtros_anos)]
+    meses = [m for m in meses_cronologicos if st.session_state.get(f'cb_mes_{m}', m in st.session_state.filtros_meses)]
+    dias_disponiveis = indice.opcoes_onde('Dia', indice.filtrar({'Mês': meses, 'Ano': anos}))
+    dias = [d for d in dias_disponiveis
+            if d != 0 and st.session_state.get(f'cb_dia_{d}', d in st.session_state.filtros_dias)]
+    return {
+        'Mês': meses,
+        'Ano': anos,
+        'Dia': dias,
+        'Categoria': st.session_state.filtros_categorias,
+        'Cliente': st.session_state.filtros_clientes,
+        'UG': st.session_state.filtros_ugs,
+        'Tipo de ocorrência': st.session_state.filtros_tipos,
+        'Ativo': st.session_state.filtros_ativos,
+        'Ocorrência': st.session_state.filtros_ocorrencias,
+    }
+
+def desligadas(versao):
+    """(consulta atual, posições já ordenadas das ocorrências abertas que a atendem).
+
+    O resultado vem do cache de consultas do processo: outra sessão com os mesmos filtros e a
+    mesma ordenação (ou o outro fragmento deste rerun) já pode tê-lo calculado."""
+    indice_versao = indice_facetas(versao.numero, versao.df)
+    crescente = st.session_state.get('ordem_lista', ORDENS[0]) == 'Ascendente'
+    consulta = Consulta.de_selecao(selecao_filtros(indice_versao), indice_versao,
+                                   ORDENACOES[st.session_state.get('ordenar_por', 'Data do Desligamento')], crescente)
+    with etapa('filtro'):
+        return consulta, desligadas_da_consulta(versao, consulta)
+
+def sincronizar_url(consulta):
+    """Deixa na URL a visão atual, para compartilhar por link."""
+    parametros = consulta.como_parametros()
+    if parametros_da_url() != parametros:
+        for p in PARAMETROS_CONSULTA - parametros.keys():
+            if p in st.query_params:
+                del st.query_params[p]
+        st.query_params.update(parametros)
+
+intervalo_automatico = (INTERVALOS_ATUALIZACAO[st.session_state.get('intervalo_automatico', '1 min')]
+                        if st.session_state.get('atualizacao_automatica') else None)
 
 # --- 6. Título e KPIs ---
 st.title('Usinas desligadas no momento')
-col_kpi1, col_kpi2 = st.columns(2)
-with col_kpi1:
-    if not df_todos_dados.empty and 'Normalização' in df_todos_dados.columns:
-        df_desligadas_geral = df_todos_dados[pd.isna(df_todos_dados['Normalização']) | (df_todos_dados['Normalização'] == '')].copy()
-        total_kpi_value = df_desligadas_geral.shape[0]
-    else:
-        total_kpi_value = 0
-    st.markdown(f"""
-    <div class="kpi-card">
-        <div class="kpi-label">Total no Banco de Dados Completo</div>
-        <div class="kpi-value">{total_kpi_value}</div>
-    </div>
-    """, unsafe_allow_html=True)
-
-# --- 7. Botão de Atualização ---
-col_top_left, col_top_right = st.columns([0.2, 0.8])
+
+@st.fragment(run_every=intervalo_automatico)
+def painel_kpis():
+    with medir_fragmento(PAGINA, 'kpis'):
+        versao = versao_ocorrencias()
+        if versao is not None:
+            carregado_em = versao.carregado_em.strftime('%d/%m/%Y %H:%M')
+            st.caption(f"Dados carregados em {carregado_em} (há {int(versao.idade_segundos // 60)} min).")
+            erro_atualizacao = obter_atualizador().ultimo_erro
+            if erro_atualizacao is not None:
+                st.warning(f"Planilha indisponível ({erro_atualizacao}). Exibindo a última versão carregada, de {carregado_em}.")
+            elif versao.origem == 'snapshot':
+                st.info(f"Exibindo a cópia local de {carregado_em} enquanto os dados são sincronizados com a planilha.")
+        df = versao.df if versao is not None else pd.DataFrame()
+        col_kpi1, col_kpi2 = st.columns(2)
+        with col_kpi1:
+            if not df.empty and 'Normalização' in df.columns:
+                total_kpi_value = int(df['Normalização'].isna().sum())
+            else:
+                total_kpi_value = 0
+            st.markdown(f"""
+            <div class="kpi-card">
+                <div class="kpi-label">Total no Banco de Dados Completo</div>
+                <div class="kpi-value">{total_kpi_value}</div>
+            </div>
+            """, unsafe_allow_html=True)
+        if not df.empty:
+            with col_kpi2:
+                _, posicoes = desligadas(versao)
+                st.markdown(f"""
+                <div class="kpi-card">
+                    <div class="kpi-label">Total com Filtro Selecionado</div>
+                    <div class="kpi-value">{len(posicoes)}</div>
+                </div>
+                """, unsafe_allow_html=True)
+
+area_kpis = st.container()
+
+# --- 7. Botão de Atualização e atualização automática ---
+col_top_left, col_auto, col_intervalo, _ = st.columns([0.2, 0.2, 0.15, 0.45])
 with col_top_left:
     if st.button('Atualizar Dados'):
-        st.cache_data.clear()
+        # Nova versão das ocorrências; os caches por versão se renovam sozinhos e as opções continuam quentes
+        atualizar_agora()
         st.rerun()
+with col_auto:
+    st.toggle("Atualização automática", key='atualizacao_automatica',
+              help="Atualiza os KPIs, a tabela e os cards sozinhos, sem recarregar os filtros (ex.: painel de parede).")
+with col_intervalo:
+    st.selectbox("Intervalo", list(INTERVALOS_ATUALIZACAO), index=1, key='intervalo_automatico',
+                 disabled=not st.session_state.get('atualizacao_automatica'), label_visibility='collapsed')
 
 # --- 8. Interface de Filtros ---
 if not df_todos_dados.empty:
@@ -261,7 +241,7 @@ if not df_todos_dados.empty:
     
     with col_ano:
         st.write("### Ano(s):")
-        anos_disponiveis = sorted([a for a in df_todos_dados['Ano'].unique() if a != 0])
+        anos_disponiveis = [a for a in indice.opcoes('Ano') if a != 0]
         with st.expander("Expandir anos"):
             for ano in anos_disponiveis:
                 st.checkbox(str(ano), key=f'cb_ano_{ano}', value=(ano in st.session_state.filtros_anos))
@@ -295,11 +275,8 @@ if not df_todos_dados.empty:
         st.write("### Dia(s):")
         meses_selecionados_input = [mes for mes in meses_cronologicos if st.session_state.get(f'cb_mes_{mes}')]
         anos_selecionados_input = [ano for ano in anos_disponiveis if st.session_state.get(f'cb_ano_{ano}')]
-        dias_disponiveis_temp = df_todos_dados[
-            df_todos_dados['Mês'].isin(meses_selecionados_input) & 
-            df_todos_dados['Ano'].isin(anos_selecionados_input)
-        ]['Dia'].unique().tolist()
-        dias_disponiveis = sorted([d for d in dias_disponiveis_temp if d != 0])
+        mascara_periodo = indice.filtrar({'Mês': meses_selecionados_input, 'Ano': anos_selecionados_input})
+        dias_disponiveis = [d for d in indice.opcoes_onde('Dia', mascara_periodo) if d != 0]
         
         with st.expander("Expandir dias"):
             dias_cols = st.columns(7)
@@ -327,20 +304,19 @@ if not df_todos_dados.empty:
         col_botoes = st.columns(2)
         with col_botoes[0]:
             if st.button('Sel. Todos', key='sel_cli', use_container_width=True):
-                st.session_state.filtros_clientes = sorted(df_todos_dados['Cliente'].unique().tolist())
+                st.session_state.filtros_clientes = indice.opcoes('Cliente')
                 st.rerun()
         with col_botoes[1]:
             if st.button('Desmarcar', key='des_cli', use_container_width=True):
                 st.session_state.filtros_clientes = []
                 st.rerun()
         st.session_state.filtros_clientes = st.multiselect(
-            ' ', options=sorted(df_todos_dados['Cliente'].unique().tolist()),
+            ' ', options=indice.opcoes('Cliente'),
             default=st.session_state.filtros_clientes, label_visibility='hidden')
 
     with col_ug:
         st.write("UG:")
-        df_temp = df_todos_dados[df_todos_dados['Cliente'].isin(st.session_state.filtros_clientes)]
-        ugs_disponiveis = sorted(df_temp['UG'].unique().tolist())
+        ugs_disponiveis = indice.opcoes_onde('UG', indice.mascara('Cliente', st.session_state.filtros_clientes))
 
         # --- LINHA ADICIONADA PARA A CORREÇÃO ---
         # Garante que apenas UGs válidas permaneçam selecionadas após a mudança do filtro de cliente.
@@ -364,14 +340,14 @@ if not df_todos_dados.empty:
         col_botoes = st.columns(2)
         with col_botoes[0]:
             if st.button('Sel. Todos', key='sel_tipo', use_container_width=True):
-                st.session_state.filtros_tipos = sorted(df_todos_dados['Tipo de ocorrência'].unique().tolist())
+                st.session_state.filtros_tipos = indice.opcoes('Tipo de ocorrência')
                 st.rerun()
         with col_botoes[1]:
             if st.button('Desmarcar', key='des_tipo', use_container_width=True):
                 st.session_state.filtros_tipos = []
                 st.rerun()
         st.session_state.filtros_tipos = st.multiselect(
-            ' ', options=sorted(df_todos_dados['Tipo de ocorrência'].unique().tolist()),
+            ' ', options=indice.opcoes('Tipo de ocorrência'),
             default=st.session_state.filtros_tipos, label_visibility='hidden')
 
     with col_ativo:
@@ -379,14 +355,14 @@ if not df_todos_dados.empty:
         col_botoes = st.columns(2)
         with col_botoes[0]:
             if st.button('Sel. Todos', key='sel_ativo', use_container_width=True):
-                st.session_state.filtros_ativos = sorted(df_todos_dados['Ativo'].unique().tolist())
+                st.session_state.filtros_ativos = indice.opcoes('Ativo')
                 st.rerun()
         with col_botoes[1]:
             if st.button('Desmarcar', key='des_ativo', use_container_width=True):
                 st.session_state.filtros_ativos = []
                 st.rerun()
         st.session_state.filtros_ativos = st.multiselect(
-            ' ', options=sorted(df_todos_dados['Ativo'].unique().tolist()),
+            ' ', options=indice.opcoes('Ativo'),
             default=st.session_state.filtros_ativos, label_visibility='hidden')
     
     with col_ocorrencia:
@@ -394,191 +370,109 @@ if not df_todos_dados.empty:
         col_botoes = st.columns(2)
         with col_botoes[0]:
             if st.button('Sel. Todos', key='sel_ocorr', use_container_width=True):
-                st.session_state.filtros_ocorrencias = sorted(df_todos_dados['Ocorrência'].unique().tolist())
+                st.session_state.filtros_ocorrencias = indice.opcoes('Ocorrência')
                 st.rerun()
         with col_botoes[1]:
             if st.button('Desmarcar', key='des_ocorr', use_container_width=True):
                 st.session_state.filtros_ocorrencias = []
                 st.rerun()
         st.session_state.filtros_ocorrencias = st.multiselect(
-            ' ', options=sorted(df_todos_dados['Ocorrência'].unique().tolist()),
+            ' ', options=indice.opcoes('Ocorrência'),
             default=st.session_state.filtros_ocorrencias, label_visibility='hidden')
 
-    # --- Aplicação dos Filtros ---
-    meses_selecionados = [mes for mes in meses_cronologicos if st.session_state.get(f'cb_mes_{mes}')]
-    anos_selecionados = [ano for ano in anos_disponiveis if st.session_state.get(f'cb_ano_{ano}')]
-    dias_selecionados = [dia for dia in dias_disponiveis if st.session_state.get(f'cb_dia_{dia}')]
-
-    df_filtrado = df_todos_dados[
-        (df_todos_dados['Mês'].isin(meses_selecionados)) &
-        (df_todos_dados['Ano'].isin(anos_selecionados)) &
-        (df_todos_dados['Dia'].isin(dias_selecionados)) &
-        (df_todos_dados['Categoria'].isin(st.session_state.filtros_categorias)) &
-        (df_todos_dados['Cliente'].isin(st.session_state.filtros_clientes)) &
-        (df_todos_dados['UG'].isin(st.session_state.filtros_ugs)) &
-        (df_todos_dados['Tipo de ocorrência'].isin(st.session_state.filtros_tipos)) &
-        (df_todos_dados['Ativo'].isin(st.session_state.filtros_ativos)) &
-        (df_todos_dados['Ocorrência'].isin(st.session_state.filtros_ocorrencias))
-    ].copy()
-    
-    df_desligadas = df_filtrado[pd.isna(df_filtrado['Normalização']) | (df_filtrado['Normalização'] == '')].copy()
-    
-    with col_kpi2:
-        st.markdown(f"""
-        <div class="kpi-card">
-            <div class="kpi-label">Total com Filtro Selecionado</div>
-            <div class="kpi-value">{len(df_desligadas)}</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    if not df_desligadas.empty:
-        df_desligadas['Tempo em Segundos'] = (datetime.now() - df_desligadas['Desligamento']).dt.total_seconds().astype(int)
+    # --- Lista de ocorrências (fragmento) ---
+    # Ordenação, seleção para edição, tabela e cards: rodam de novo sozinhos com a atualização automática.
+    @st.fragment(run_every=intervalo_automatico)
+    def lista_desligadas():
+        with medir_fragmento(PAGINA, 'lista'):
+            versao = versao_ocorrencias()
+            if versao is None or versao.df.empty:
+                return
+            # Filtro e ordenação saem do cache de consultas; a ordenação escolhida abaixo entra na
+            # consulta pelo session_state (o rerun do widget já a atualizou).
+            consulta, posicoes = desligadas(versao)
+            sincronizar_url(consulta)
+            # Único .copy(): a coluna 'Tempo em Segundos' é acrescentada abaixo
+            df_sorted = versao.df.iloc[posicoes].copy()
+
+            if not df_sorted.empty:
+                df_sorted['Tempo em Segundos'] = (datetime.now() - df_sorted['Desligamento']).dt.total_seconds().astype(int)
+
+                # --- CONTROLES DE ORDENAÇÃO ---
+                st.markdown("---")
+                st.write("### Ordenar e Editar")
+                sort_cols = st.columns(2)
+
+                with sort_cols[0]:
+                    st.selectbox("Ordenar por:", options=ORDENACOES.keys(), key='ordenar_por')
+
+                with sort_cols[1]:
+                    st.radio("Ordem:", options=ORDENS, horizontal=True, key='ordem_lista')
+
+                # ***** NOVO: SELEÇÃO PARA EDIÇÃO *****
+                st.markdown("---")
+                st.write("### Editar uma Ocorrência")
+
+                # Criamos uma coluna 'Display' para facilitar a seleção no selectbox
+                # (calculada uma vez por versão dos dados; aqui só selecionamos as linhas exibidas)
+                df_sorted['Display'] = display_ocorrencias(versao.numero, versao.df).loc[df_sorted.index]
+
+                ocorrencia_selecionada_display = st.selectbox(
+                    "Selecione a ocorrência para editar:",
+                    options=df_sorted['Display'],
+                    index=None, # Nenhum selecionado por padrão
+                    placeholder="Escolha uma ocorrência..."
+                )
+
+                if ocorrencia_selecionada_display:
+                    # AQUI, passamos a pegar o valor da nova coluna 'ID_Unico'
+                    id_unico_para_editar = df_sorted[df_sorted['Display'] == ocorrencia_selecionada_display].iloc[0]['ID_Unico']
+
+                    # E salvamos em uma nova variável de sessão para clareza
+                    st.session_state['id_unico_para_editar'] = id_unico_para_editar
+
+                    if st.button("📝 Editar Ocorrência Selecionada"):
+                        st.switch_page("pages/3_Editar_Ocorrência.py")
+
+                # --- LISTA DE OCORRÊNCIAS (TABELA) ---
+                st.header("Lista de Ocorrências (Tabela)")
+                with etapa('tabela'):
+                    df_para_tabela = df_sorted.reset_index(drop=True)
+                    df_para_tabela['Tempo de Desligamento'] = formatar_duracao(df_para_tabela['Tempo em Segundos'])
+                    df_para_tabela['Linha'] = df_para_tabela.index + 1
+
+                    st.dataframe(df_para_tabela[[
+                        'Linha', 'Categoria', 'Tempo de Desligamento', 'UG', 'Data', 'Hora', 'Tipo de ocorrência', 
+                        'Ativo', 'Ocorrência', 'Operador', 'Descrição', 'OS'
+                    ]], use_container_width=True)
+
+                # --- DETALHES POR OCORRÊNCIA (CARDS) ---
+                st.header("Detalhes por Ocorrência (Cards)")
+                col_tamanho, col_pagina, col_info = st.columns([1, 1, 2])
+                with col_tamanho:
+                    tamanho_pagina = st.selectbox("Cards por página", options=TAMANHOS_PAGINA, index=1, key='cards_por_pagina')
+                n_paginas = total_paginas(len(df_sorted), tamanho_pagina)
+                # Os filtros podem ter reduzido o número de páginas desde o último rerun
+                if st.session_state.get('pagina_cards', 1) > n_paginas:
+                    st.session_state.pagina_cards = n_paginas
+                with col_pagina:
+                    pagina = st.number_input("Página", min_value=1, max_value=n_paginas, step=1, key='pagina_cards')
+                with col_info:
+                    st.caption(f"{len(df_sorted)} ocorrência(s) em {n_paginas} página(s)")
+
+                # Uma página de cards = um único documento HTML, enviado em um só elemento
+                with etapa('cards'):
+                    st.html(gerar_html_cards(fatia_pagina(df_sorted, pagina, tamanho_pagina)))
+
+            else:
+                st.info("Nenhuma usina encontrada com o campo 'Normalização' em branco para os filtros selecionados.")
+
+    lista_desligadas()
+else:
+    st.warning("Não foi possível carregar os dados. Verifique o arquivo local ou os filtros aplicados.")
 
-        # --- CONTROLES DE ORDENAÇÃO ---
-        st.markdown("---")
-        st.write("### Ordenar e Editar")
-        sort_cols = st.columns(2)
-        
-        with sort_cols[0]:
-            sort_options_display = {
-                'Data do Desligamento': 'Desligamento',
-                'Tempo de Desligamento': 'Tempo em Segundos',
-                'UG': 'UG',
-                'Ativo': 'Ativo'
-            }
-            sort_by_display = st.selectbox(
-                "Ordenar por:",
-                options=sort_options_display.keys(), index=0)
-            sort_by_column = sort_options_display[sort_by_display]
-
-        with sort_cols[1]:
-            sort_order = st.radio(
-                "Ordem:",
-                options=['Descendente', 'Ascendente'], index=0, horizontal=True)
-            is_ascending = (sort_order == 'Ascendente')
-
-        df_sorted = df_desligadas.sort_values(by=sort_by_column, ascending=is_ascending)
-
-        # ***** NOVO: SELEÇÃO PARA EDIÇÃO *****
-        st.markdown("---")
-        st.write("### Editar uma Ocorrência")
-
-        # Criamos uma coluna 'Display' para facilitar a seleção no selectbox
-        df_sorted['Display'] = df_sorted['UG'].astype(str) + " | " + \
-                               df_sorted['Ativo'].astype(str) + " | " + \
-                               df_sorted['Nome Ativo'].astype(str) + " | " + \
-                               df_sorted['Ocorrência'].astype(str) + " | " + \
-                               df_sorted['Desligamento'].dt.strftime('%d/%m/%Y %H:%M')
-
-        ocorrencia_selecionada_display = st.selectbox(
-            "Selecione a ocorrência para editar:",
-            options=df_sorted['Display'],
-            index=None, # Nenhum selecionado por padrão
-            placeholder="Escolha uma ocorrência..."
-        )
-
-        if ocorrencia_selecionada_display:
-            # AQUI, passamos a pegar o valor da nova coluna 'ID_Unico'
-            id_unico_para_editar = df_sorted[df_sorted['Display'] == ocorrencia_selecionada_display].iloc[0]['ID_Unico']
-    
-            # E salvamos em uma nova variável de sessão para clareza
-            st.session_state['id_unico_para_editar'] = id_unico_para_editar
-    
-            if st.button("📝 Editar Ocorrência Selecionada"):
-                st.switch_page("pages/3_Editar_Ocorrência.py")
-        
-        # --- LISTA DE OCORRÊNCIAS (TABELA) ---
-        st.header("Lista de Ocorrências (Tabela)")
-        df_para_tabela = df_sorted.copy()
-        
-        def formatar_tempo_estatico(row):
-            dias = row['Tempo em Segundos'] // 86400
-            horas = (row['Tempo em Segundos'] % 86400) // 3600
-            minutos = (row['Tempo em Segundos'] % 3600) // 60
-            return f"{dias}d {horas}h {minutos}m"
-        
-        df_para_tabela['Tempo de Desligamento'] = df_para_tabela.apply(formatar_tempo_estatico, axis=1)
-        df_para_tabela.reset_index(inplace=True, drop=True)
-        df_para_tabela['Linha'] = df_para_tabela.index + 1
-        
-        st.dataframe(df_para_tabela[[
-            'Linha', 'Categoria', 'Tempo de Desligamento', 'UG', 'Data', 'Hora', 'Tipo de ocorrência', 
-            'Ativo', 'Ocorrência', 'Operador', 'Descrição', 'OS'
-        ]], use_container_width=True)
+# Os KPIs são calculados depois do painel de filtros (com a seleção deste rerun), no espaço reservado no topo
+with area_kpis:
+    painel_kpis()
 
-        # --- DETALHES POR OCORRÊNCIA (CARDS) ---
-        st.header("Detalhes por Ocorrência (Cards)")
-        
-        num_cols = 4
-        rows = list(df_sorted.iterrows())
-        
-        def format_datetime_card(dt_obj):
-            if pd.notna(dt_obj):
-                return dt_obj.strftime('%d/%m/%Y'), dt_obj.strftime('%H:%M')
-            return '', ''
-
-        for i in range(0, len(rows), num_cols):
-            cols = st.columns(num_cols)
-            for j in range(num_cols):
-                if i + j < len(rows):
-                    index, row = rows[i + j]
-                    with cols[j]:
-                        categoria = html.escape(str(row.get("Categoria", "")))
-                        ug = html.escape(str(row.get("UG", "N/A")))
-                        tipo_ocorrencia = html.escape(str(row.get("Tipo de ocorrência", "")))
-                        ativo = html.escape(str(row.get("Ativo", "")))
-                        nome_ativo = html.escape(str(row.get("Nome Ativo", "")))
-                        ocorrencia = html.escape(str(row.get("Ocorrência", "")))
-                        operador = html.escape(str(row.get("Operador", "")))
-                        descricao = html.escape(str(row.get("Descrição", ""))).replace('\n', '<br>')
-                        protocolo = html.escape(str(row.get("Protocolo", "")))
-                        os = html.escape(str(row.get("OS", "")))
-
-                        data_ocor, hora_ocor = format_datetime_card(row.get('Desligamento'))
-                        data_ca, hora_ca = format_datetime_card(row.get('Cliente Avisado'))
-                        data_loop, hora_loop = format_datetime_card(row.get('Atendimento Loop'))
-                        data_terc, hora_terc = format_datetime_card(row.get('Atendimento Terceiros'))
-                        data_norm, hora_norm = format_datetime_card(row.get('Normalização'))
-
-                        quantidade_html = ''
-                        if row.get('Categoria') == 'EQUIPAMENTOS':
-                            quantidade_val = row.get('Quantidade', 0)
-                            try:
-                                if pd.notna(quantidade_val) and float(quantidade_val) > 0:
-                                    quantidade_html = f'<div class="card-item"><span class="card-label">Quantidade:</span> {int(float(quantidade_val))}</div>'
-                            except (ValueError, TypeError):
-                                quantidade_html = ''
-
-                        card_html = f"""
-                        <div class="card-container">
-                            <div class="card-title">{ug}</div>
-                            <div class="card-item"><span class="card-label">Categoria:</span> {categoria}</div>
-                            <div class="card-item"><span class="card-label">Tipo de Ocorrência:</span> {tipo_ocorrencia}</div>
-                            <div class="card-item"><span class="card-label">Ativo:</span> {ativo}</div>
-                            <div class="card-item"><span class="card-label">Nome do ativo:</span> {nome_ativo}</div>
-                            <div class="card-item"><span class="card-label">Ocorrência:</span> {ocorrencia}</div>
-                            <div class="card-item"><span class="card-label">Operador:</span> {operador}</div>
-                            {quantidade_html}
-                            <br>
-                            <div class="card-item"><span class="card-label">Data da ocorrência:</span> {data_ocor}</div>
-                            <div class="card-item"><span class="card-label">Hora da ocorrência:</span> {hora_ocor}</div>
-                            <div class="card-item"><span class="card-label">Data cliente avisado:</span> {data_ca}</div>
-                            <div class="card-item"><span class="card-label">Hora cliente avisado:</span> {hora_ca}</div>
-                            <div class="card-item"><span class="card-label">Data do atendimento LOOP:</span> {data_loop}</div>
-                            <div class="card-item"><span class="card-label">Hora do atendimento LOOP:</span> {hora_loop}</div>
-                            <div class="card-item"><span class="card-label">Data do atendimento de terceiros:</span> {data_terc}</div>
-                            <div class="card-item"><span class="card-label">Hora do atendimento de terceiros:</span> {hora_terc}</div>
-                            <div class="card-item"><span class="card-label">Data de normalização:</span> {data_norm}</div>
-                            <div class="card-item"><span class="card-label">Hora de normalização:</span> {hora_norm}</div>
-                            <br>
-                            <div class="card-item"><span class="card-label">Descrição:</span> {descricao}</div>
-                            <div class="card-item"><span class="card-label">Protocolo:</span> {protocolo}</div>
-                            <div class="card-item"><span class="card-label">OS:</span> {os}</div>
-                        </div>
-                        """
-                        st.html(card_html)
-                
-    else:
-        st.info("Nenhuma usina encontrada com o campo 'Normalização' em branco para os filtros selecionados.")
-else:
-    st.warning("Não foi possível carregar os dados. Verifique o arquivo local ou os filtros aplicados.")
\ No newline at end of file
+painel_desempenho()
@@ -1,15 +1,15 @@
-import os
-from webdav3.client import Client
-import io
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-import gspread
-from google.oauth2.service_account import Credentials
 import re
+from Dados.ocorrencias import carregar_opcoes, registrar_escrita, obter_armazenamento, PLANILHA_DESLIGAMENTOS, PLANILHA_EQUIPAMENTOS
+from Dados.instrumentacao import etapa
+from GoogleSheets.cota import eh_erro_de_cota, MENSAGEM_COTA
+from Componentes.desempenho import iniciar_medicao, painel_desempenho
 
 # --- 1. CONFIGURAÇÃO DA PÁGINA E CSS ---
 st.set_page_config(layout="wide")
+iniciar_medicao("Adicionar Ocorrência")
 st.title("Adicionar Nova Ocorrência")
 st.markdown("""
 <style>
@@ -49,59 +49,19 @@ def format_datetime_card(dt_obj):
         except (ValueError, TypeError): return '', ''
     return '', ''
 
-PLANILHA_DESLIGAMENTOS = 'DESLIGAMENTOS'
-PLANILHA_EQUIPAMENTOS = 'EQUIPAMENTOS'
-PLANILHA_DADOS = 'DADOS'
-PLANILHA_DETALHADA = 'Usinas_Detalhado'
-
-SCOPES = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
-CREDS_FILE = "google_credentials.json"
-SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/1KeJjbsLVP9DkxPCmNSN4VzbSBeG3SFSCAdPhir39iqg/edit?usp=sharing"
-
-def fetch_sheet_as_df(worksheet):
-    data = worksheet.get_all_values()
-    if not data: return pd.DataFrame()
-    headers = [h.replace('\xa0', '').strip() for h in data.pop(0)]
-    return pd.DataFrame(data, columns=headers)
-
-@st.cache_resource(ttl=600)
-def connect_to_google_sheets():
-    # Verifica se está rodando localmente (o arquivo existe) ou na nuvem (usa st.secrets)
-    if os.path.exists(CREDS_FILE):
-        creds = Credentials.from_service_account_file(CREDS_FILE, scopes=SCOPES)
-    else:
-        creds = Credentials.from_service_account_info(st.secrets["gcp_service_account"], scopes=SCOPES)
-    
-    client = gspread.authorize(creds)
-    return client
-
-@st.cache_data(ttl=60)
 def carregar_dados_e_opcoes():
-    try:
-        client = connect_to_google_sheets()
-        workbook = client.open_by_url(SPREADSHEET_URL)
-        df_dados = fetch_sheet_as_df(workbook.worksheet(PLANILHA_DADOS)).fillna('')
-        df_detalhado = fetch_sheet_as_df(workbook.worksheet(PLANILHA_DETALHADA)).fillna('')
-
-        for col in df_dados.columns:
-            if df_dados[col].dtype == 'object': df_dados[col] = df_dados[col].str.strip()
-        for col in df_detalhado.columns:
-            if df_detalhado[col].dtype == 'object': df_detalhado[col] = df_detalhado[col].str.strip()
-        
-        op_cliente = ['-'] + sorted(df_dados[df_dados['CLIENTE'] != '']['CLIENTE'].unique().tolist())
-        op_ocorrencia = ['-'] + sorted(df_dados[df_dados['OCORRÊNCIA'] != '']['OCORRÊNCIA'].unique().tolist())
-        op_tipo = ['-'] + sorted(df_dados[df_dados['TIPO DE OCORRÊNCIA'] != '']['TIPO DE OCORRÊNCIA'].unique().tolist())
-        op_ativo = ['-'] + sorted(df_dados[df_dados['ATIVO'] != '']['ATIVO'].unique().tolist())
-        op_operador = ['-'] + sorted(df_dados[df_dados['OPERADOR'] != '']['OPERADOR'].unique().tolist())
-        
-        return { 'df_dados': df_dados, 'df_detalhado': df_detalhado, 'Cliente': op_cliente,
-                 'Ocorrência': op_ocorrencia, 'Tipo de ocorrência': op_tipo, 'Ativo': op_ativo,
-                 'Operador': op_operador }
-    except Exception as e:
-        st.error(f"Erro ao carregar os dados das planilhas: {e}"); return {}
+    """Cadastros compartilhados, com a opção vazia '-' no início de cada lista."""
+    opcoes = carregar_opcoes()
+    if not opcoes:
+        return {}
+    dados_e_opcoes = dict(opcoes)
+    for chave in ['Cliente', 'Ocorrência', 'Tipo de ocorrência', 'Ativo', 'Operador']:
+        dados_e_opcoes[chave] = ['-'] + opcoes[chave]
+    return dados_e_opcoes
 
 # --- 3. INTERFACE DO STREAMLIT ---
-dados_e_opcoes = carregar_dados_e_opcoes()
+with etapa('opcoes'):
+    dados_e_opcoes = carregar_dados_e_opcoes()
 if not dados_e_opcoes: st.stop()
 df_dados = dados_e_opcoes.get('df_dados', pd.DataFrame())
 df_detalhado = dados_e_opcoes.get('df_detalhado', pd.DataFrame())
@@ -315,47 +275,25 @@ if st.button('Adicionar Ocorrência', type="primary", use_container_width=True):
 
         if not erro_encontrado and ocorrencias_para_salvar:
             try:
-                client = connect_to_google_sheets()
-                workbook = client.open_by_url(SPREADSHEET_URL)
-                worksheet = workbook.worksheet(st.session_state.categoria_selecionada)
-                colunas_planilha = worksheet.row_values(1)
-                
-                COLUNAS_EDITAVEIS = [
-                    "UG", "TIPO DE OCORRÊNCIA", "ATIVO", "NOME ATIVO", "OCORRÊNCIA", 
-                    "OPERADOR", "DESLIGAMENTO", "CLIENTE AVISADO", "ATENDIMENTO LOOP", 
-                    "ATENDIMENTO TERCEIROS", "NORMALIZAÇÃO", "DESCRIÇÃO", "PROTOCOLO", "OS",
-                    "QUANTIDADE"
-                ]
+                # '-' é a opção vazia dos seletores
+                registros = [{col: ('' if valor == '-' else valor) for col, valor in occ.items()}
+                             for occ in ocorrencias_para_salvar]
+                with etapa('gravacao'):
+                    obter_armazenamento().incluir_linhas(st.session_state.categoria_selecionada, registros)
+                # As novas linhas devem aparecer na Página Principal na próxima leitura.
+                registrar_escrita(st.session_state.categoria_selecionada)
 
-                ug_col_index = colunas_planilha.index('UG') + 1
-                ug_column_values = worksheet.col_values(ug_col_index)
-                start_row = len(ug_column_values) + 1
-                try:
-                    start_row = ug_column_values.index('') + 1
-                except ValueError:
-                    pass
+                # O dicionário 'ocorrencias_para_salvar' já está no formato correto.
+                for item_dict in ocorrencias_para_salvar:
+                    item_dict['Categoria'] = st.session_state.categoria_selecionada
 
-                linhas_para_adicionar = []
-                for occ in ocorrencias_para_salvar:
-                    linha_ordenada = []
-                    for col_header in colunas_planilha:
-                        col_strip = col_header.strip()
-                        if col_strip in COLUNAS_EDITAVEIS:
-                            valor = occ.get(col_strip, '')
-                            linha_ordenada.append('' if valor == '-' else valor)
-                        else:
-                            linha_ordenada.append(None)
-                    linhas_para_adicionar.append(linha_ordenada)
-                
-                if linhas_para_adicionar:
-                    worksheet.update(f'A{start_row}', linhas_para_adicionar, value_input_option='USER_ENTERED')
-                    
-                    # O dicionário 'ocorrencias_para_salvar' já está no formato correto.
-                    for item_dict in ocorrencias_para_salvar:
-                        item_dict['Categoria'] = st.session_state.categoria_selecionada
-
-                    st.session_state.last_submission_details = ocorrencias_para_salvar
-                    st.rerun()
+                st.session_state.last_submission_details = ocorrencias_para_salvar
+                st.rerun()
 
             except Exception as e:
-                st.error(f"Ocorreu um erro ao salvar na Planilha Google: {e}")
\ No newline at end of file
+                if eh_erro_de_cota(e):
+                    st.error(f"{MENSAGEM_COTA} A ocorrência não foi salva.")
+                else:
+                    st.error(f"Ocorreu um erro ao salvar em {obter_armazenamento().nome}: {e}")
+
+painel_desempenho()
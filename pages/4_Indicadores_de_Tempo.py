@@ -0,0 +1,89 @@
+import streamlit as st
+from Dados.ocorrencias import versao_ocorrencias, indicadores_tempo, cubo_diario
+from Dados.indicadores import DIMENSOES_AGRUPAMENTO, PERCENTIS
+from Dados.cubo import FREQUENCIAS
+from Dados.instrumentacao import etapa
+from Componentes.desempenho import iniciar_medicao, painel_desempenho
+
+# --- 1. Configuração da Página ---
+st.set_page_config(layout="wide")
+iniciar_medicao("Indicadores de Tempo")
+
+st.title("Indicadores de tempo de atendimento")
+st.write("Tempo do desligamento até o aviso ao cliente, até o primeiro atendimento (Loop ou terceiros) "
+         "e até a normalização, sobre todo o histórico.")
+
+# --- 2. Dados ---
+# Os agregados são calculados uma vez por versão dos dados e compartilhados entre as sessões.
+with etapa('dados'):
+    versao_dados = versao_ocorrencias()
+
+if versao_dados is None or versao_dados.df.empty:
+    st.warning("Não foi possível carregar os dados.")
+else:
+    with etapa('indicadores'):
+        indicadores = indicadores_tempo(versao_dados.numero, versao_dados.df)
+    st.caption(f"{indicadores.tamanho} ocorrências, dados carregados em "
+               f"{versao_dados.carregado_em.strftime('%d/%m/%Y %H:%M')}.")
+
+    # --- 3. Visão geral ---
+    colunas_kpi = st.columns(len(indicadores.percentis))
+    for coluna, (indicador, linha) in zip(colunas_kpi, indicadores.percentis.iterrows()):
+        with coluna:
+            st.metric(f"{indicador} (mediana)", f"{linha['P50 (h)']:.1f} h",
+                      help=f"P90: {linha['P90 (h)']:.1f} h, sobre {int(linha['Ocorrências'])} ocorrências")
+    st.dataframe(indicadores.percentis, use_container_width=True,
+                 column_config={c: st.column_config.NumberColumn(format="%.2f") for c in indicadores.percentis.columns
+                                if c != 'Ocorrências'})
+    inconsistentes = sum(indicadores.inconsistentes.values())
+    if inconsistentes:
+        st.caption(f"{inconsistentes} registro(s) com horário anterior ao desligamento foram desconsiderados.")
+
+    # --- 4. Por dimensão ---
+    st.markdown("---")
+    col_dimensao, col_indicador = st.columns([1, 2])
+    with col_dimensao:
+        dimensao = st.selectbox("Agrupar por", DIMENSOES_AGRUPAMENTO, key='indicadores_dimensao')
+    with col_indicador:
+        indicador = st.radio("Indicador", list(indicadores.horas), horizontal=True, key='indicadores_indicador')
+    ordenar_por = st.radio("Ordenar por", ['Ocorrências', 'Média (h)'] + [f'{p} (h)' for p in PERCENTIS],
+                           index=4, horizontal=True, key='indicadores_ordem')
+
+    with etapa('agrupamento'):
+        tabela = indicadores.por_dimensao(dimensao)[indicador].sort_values(ordenar_por, ascending=False)
+    st.dataframe(tabela, use_container_width=True,
+                 column_config={c: st.column_config.NumberColumn(format="%.2f") for c in tabela.columns
+                                if c != 'Ocorrências'})
+
+    # --- 5. Distribuição e tendência mensal ---
+    col_distribuicao, col_tendencia = st.columns(2)
+    with col_distribuicao:
+        st.subheader("Distribuição")
+        st.bar_chart(indicadores.distribuicao[indicador], sort=False, x_label="Faixa", y_label="Ocorrências")
+    with col_tendencia:
+        st.subheader("Tendência mensal")
+        tendencia = indicadores.tendencia.get(indicador)
+        if tendencia is not None and not tendencia.empty:
+            st.line_chart(tendencia[['P50 (h)', 'P90 (h)']], y_label="Horas")
+
+    # --- 6. Histórico de desligamentos ---
+    # Lido do cubo diário (células dia x UG x categoria x tipo x ocorrência), não das linhas.
+    st.markdown("---")
+    st.subheader("Histórico de desligamentos")
+    col_frequencia, col_separar = st.columns([1, 2])
+    with col_frequencia:
+        frequencia = st.radio("Período", list(FREQUENCIAS), index=1, horizontal=True, key='historico_frequencia')
+    with col_separar:
+        separar_por = st.selectbox("Separar por", [None, 'Categoria', 'Tipo de ocorrência', 'Ocorrência'],
+                                   format_func=lambda d: d or 'Nenhum', key='historico_separar')
+    with etapa('historico'):
+        historico = cubo_diario().resumo(frequencia, separar_por)
+    if historico.empty:
+        st.info("Sem ocorrências no histórico.")
+    else:
+        horas = historico['Horas desligado'].unstack() if separar_por else historico['Horas desligado']
+        st.bar_chart(horas, y_label="Horas desligado")
+        st.dataframe(historico, use_container_width=True,
+                     column_config={'Horas desligado': st.column_config.NumberColumn(format="%.1f")})
+
+painel_desempenho()
@@ -0,0 +1,78 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime, timedelta
+from Dados.ocorrencias import versao_ocorrencias, indice_intervalos
+from Dados.instrumentacao import etapa
+from Componentes.desempenho import iniciar_medicao, painel_desempenho
+
+COLUNAS_TABELA = ['Categoria', 'UG', 'Cliente', 'Tipo de ocorrência', 'Ativo', 'Nome Ativo', 'Ocorrência',
+                  'Desligamento', 'Normalização', 'Descrição']
+JANELA_GRAFICO = timedelta(days=3)   # antes e depois do instante, no gráfico do modo "Instante"
+
+# --- 1. Configuração da Página ---
+st.set_page_config(layout="wide")
+iniciar_medicao("Desligamentos no Tempo")
+
+st.title("Usinas desligadas em um instante do passado")
+st.write("Escolha um instante (ou um intervalo) para ver o que estava desligado. "
+         "Ocorrências ainda abertas contam como desligadas até agora.")
+
+# --- 2. Dados ---
+with etapa('dados'):
+    versao_dados = versao_ocorrencias()
+
+if versao_dados is None or versao_dados.df.empty:
+    st.warning("Não foi possível carregar os dados.")
+else:
+    df_todos_dados = versao_dados.df
+    with etapa('intervalos'):
+        indice = indice_intervalos(versao_dados.numero, df_todos_dados)
+    # Slider de hora em hora: limites em horas cheias (o fim é a próxima hora cheia)
+    agora = datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    primeiro = indice.primeiro.to_pydatetime().replace(minute=0, second=0) if indice.primeiro is not None else agora
+
+    # --- 3. Instante ou intervalo ---
+    modo = st.radio("Consultar", ['Instante', 'Intervalo'], horizontal=True, key='tempo_modo')
+    if modo == 'Instante':
+        instante = st.slider("Instante", min_value=primeiro, max_value=agora,
+                             value=max(agora - timedelta(days=1), primeiro), step=timedelta(hours=1), format="DD/MM/YYYY HH:mm", key='tempo_instante')
+        inicio, fim = instante, instante
+        inicio_grafico, fim_grafico = max(instante - JANELA_GRAFICO, primeiro), min(instante + JANELA_GRAFICO, agora)
+    else:
+        inicio, fim = st.slider("Intervalo", min_value=primeiro, max_value=agora,
+                                value=(max(agora - timedelta(days=7), primeiro), agora), step=timedelta(hours=1),
+                                format="DD/MM/YYYY HH:mm", key='tempo_intervalo')
+        inicio_grafico, fim_grafico = inicio, fim
+
+    with etapa('consulta'):
+        posicoes = indice.em(inicio) if modo == 'Instante' else indice.durante(inicio, fim)
+        df_periodo = df_todos_dados.iloc[posicoes]
+        if modo == 'Intervalo' and fim > inicio:
+            pico, quando = indice.pico(inicio, fim)
+        else:
+            pico, quando = indice.simultaneas(inicio), pd.Timestamp(inicio)
+
+    # --- 4. KPIs ---
+    col_ocorrencias, col_usinas, col_pico = st.columns(3)
+    with col_ocorrencias:
+        st.metric("Ocorrências em andamento", len(df_periodo))
+    with col_usinas:
+        st.metric("Usinas (UGs) afetadas", df_periodo['UG'].nunique())
+    with col_pico:
+        st.metric("Pico de ocorrências simultâneas", pico, help=f"Atingido em {quando.strftime('%d/%m/%Y %H:%M')}")
+
+    # --- 5. Simultâneas ao longo do tempo ---
+    if fim_grafico > inicio_grafico:
+        with etapa('grafico'):
+            serie = indice.serie_simultaneas(inicio_grafico, fim_grafico)
+        st.line_chart(serie, y_label="Ocorrências simultâneas")
+
+    # --- 6. Ocorrências ---
+    if df_periodo.empty:
+        st.info("Nenhuma ocorrência em andamento no período escolhido.")
+    else:
+        st.dataframe(df_periodo[[c for c in COLUNAS_TABELA if c in df_periodo.columns]]
+                     .sort_values('Desligamento', ascending=False),
+                     hide_index=True, use_container_width=True)
+
+painel_desempenho()
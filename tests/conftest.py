@@ -0,0 +1,48 @@
+# conftest.py
+# Planilha falsa em memória (mesma interface de values_batch_get do gspread) sobre os dados
+# sintéticos de benchmarks/gerador_ocorrencias.py, para testar sem rede nem credenciais.
+# Rodar na raiz do projeto: python -m pytest
+import re
+import sys
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.gerador_ocorrencias import gerar_planilha, como_valores
+
+# 'Aba', 'Aba'!1:1, 'Aba'!A10:R (até o fim) e 'Aba'!A10:R20: os formatos pedidos pela sincronização
+_FAIXA = re.compile(r"'(?P<aba>[^']+)'(?:!(?:(?P<l1>\d+):(?P<l2>\d+)|A(?P<inicio>\d+):[A-Z]+(?P<fim>\d*)))?$")
+
+class PlanilhaFalsa:
+    """{aba: [cabeçalho, linha, ...]} respondendo como a API de valores (sem células e linhas vazias no fim)."""
+
+    def __init__(self, abas):
+        self.abas = abas
+        self.requisicoes = []
+
+    def _valores(self, faixa):
+        m = _FAIXA.match(faixa)
+        linhas = self.abas[m['aba']]
+        if m['l1']:
+            linhas = linhas[int(m['l1']) - 1:int(m['l2'])]
+        elif m['inicio']:
+            linhas = linhas[int(m['inicio']) - 1:int(m['fim']) if m['fim'] else None]
+        valores = []
+        for linha in linhas:
+            linha = list(linha)
+            while linha and linha[-1] == '':
+                linha.pop()
+            valores.append(linha)
+        while valores and not valores[-1]:
+            valores.pop()
+        return {'range': faixa, 'values': valores} if valores else {'range': faixa}
+
+    def values_batch_get(self, faixas):
+        self.requisicoes.append(list(faixas))
+        return {'valueRanges': [self._valores(f) for f in faixas]}
+
+@pytest.fixture
+def planilha():
+    # Mais linhas em DESLIGAMENTOS que a janela de revalidação: há linhas abertas antigas fora da cauda
+    return PlanilhaFalsa({nome: como_valores(df) for nome, df in gerar_planilha(1000).items()})
@@ -0,0 +1,76 @@
+# test_consultas.py
+# O cache de consultas tem de devolver o mesmo que filtrar e ordenar o DataFrame direto (como a
+# Página Principal fazia com isin + sort_values), para a consulta e para as equivalentes a ela.
+from datetime import datetime
+import numpy as np
+import pytest
+from Dados.atualizador import VersaoDados
+from Dados.consultas import Consulta, CacheConsultas, posicoes_desligadas
+from Dados.facetas import IndiceFacetas
+from Dados.ocorrencias import cache_consultas, desligadas_da_consulta
+from Dados.sincronizacao import COLUNA_LINHA
+from tests.test_sincronizacao import novo_sincronizador, coluna
+
+def direto(df, indice, consulta):
+    """Posições das abertas que atendem à consulta, sem índice de facetas nem cache."""
+    filtros = dict(consulta.filtros)
+    mascara = df['Normalização'].isna()
+    for dim in indice.dimensoes:
+        mascara &= df[dim].isin(filtros.get(dim, indice.opcoes(dim)))
+    ordenado = df[mascara].sort_values(consulta.ordenar_por, ascending=consulta.crescente, kind='stable')
+    return df.index.get_indexer(ordenado.index)
+
+@pytest.fixture
+def df(planilha):
+    return novo_sincronizador().sincronizar(planilha)
+
+def consultas(indice):
+    clientes, ugs = indice.opcoes('Cliente'), indice.opcoes('UG')
+    return [
+        Consulta({}),
+        Consulta({'Cliente': clientes[:2], 'Categoria': ['DESLIGAMENTOS']}, 'UG', True),
+        Consulta({'Ano': indice.opcoes('Ano')[-1:], 'Mês': indice.opcoes('Mês')[:6]}, 'Tempo em Segundos', True),
+        Consulta({'UG': ugs[::2], 'Ativo': ['Inversor', 'String']}, 'Ativo', False),
+        Consulta({'Ocorrência': []}),
+    ]
+
+def test_cache_igual_ao_filtro_direto(df):
+    indice, cache = IndiceFacetas(df), CacheConsultas()
+    for consulta in consultas(indice):
+        esperado = direto(df, indice, consulta)
+        for _ in range(2):
+            resultado = cache.obter(consulta, lambda: posicoes_desligadas(df, indice, consulta))
+            np.testing.assert_array_equal(resultado, esperado)
+    assert cache.metricas()['acertos'] == cache.metricas()['faltas'] == len(consultas(indice))
+
+def test_consultas_equivalentes_usam_a_mesma_entrada(df):
+    indice, cache = IndiceFacetas(df), CacheConsultas()
+    clientes = indice.opcoes('Cliente')[:2]
+    consulta = Consulta({'Cliente': clientes}, 'Desligamento', False)
+    equivalentes = [
+        Consulta({'Cliente': clientes[::-1]}, 'Tempo em Segundos', True),
+        Consulta.de_selecao({'Cliente': clientes, 'UG': indice.opcoes('UG')}, indice),
+        Consulta.de_parametros(consulta.como_parametros(), indice),
+    ]
+    esperado = cache.obter(consulta, lambda: posicoes_desligadas(df, indice, consulta))
+    for outra in equivalentes:
+        assert outra == consulta
+        resultado = cache.obter(outra, lambda: pytest.fail(f'{outra!r} recalculada'))
+        np.testing.assert_array_equal(resultado, esperado)
+        np.testing.assert_array_equal(direto(df, indice, outra), esperado)
+
+def test_nova_versao_nao_reaproveita_resultado(planilha):
+    sincronizador = novo_sincronizador()
+    df = sincronizador.sincronizar(planilha)
+    consulta = Consulta({'Categoria': ['DESLIGAMENTOS']})
+    cache_consultas.clear()
+    antes = desligadas_da_consulta(VersaoDados(df, 1, datetime.now(), 'planilha'), consulta)
+
+    # Normaliza a aberta que aparece primeiro na lista
+    linha = int(df[COLUNA_LINHA].iloc[antes[0]])
+    planilha.abas['DESLIGAMENTOS'][linha - 1][coluna(planilha, 'DESLIGAMENTOS', 'NORMALIZAÇÃO')] = '2026-01-31 12:00:00'
+    df = sincronizador.sincronizar(planilha)
+    depois = desligadas_da_consulta(VersaoDados(df, 2, datetime.now(), 'planilha'), consulta)
+
+    np.testing.assert_array_equal(depois, direto(df, IndiceFacetas(df), consulta))
+    assert len(depois) == len(antes) - 1
@@ -0,0 +1,48 @@
+# test_cubo.py
+# O cubo mantido por diferença (só as linhas que a sincronização trocou, ou a versão inteira
+# comparada com a anterior) tem de ser igual ao montado do zero: agregar(contribuicoes(df)).
+import pandas as pd
+from Dados.cubo import CuboDiario, agregar, contribuicoes
+from tests.test_sincronizacao import novo_sincronizador, coluna
+
+def conferir(cubo, df):
+    pd.testing.assert_frame_equal(cubo.celulas.sort_index(), agregar(contribuicoes(df)).sort_index())
+
+def editar(planilha):
+    """Acrescenta uma linha, edita a última, normaliza uma aberta antiga e apaga a data de outra."""
+    aba = planilha.abas['DESLIGAMENTOS']
+    normalizacao = coluna(planilha, 'DESLIGAMENTOS', 'NORMALIZAÇÃO')
+    aba.append(list(aba[5]))
+    aba[-2][coluna(planilha, 'DESLIGAMENTOS', 'UG')] = 'UFV nova'
+    aberta = next(i for i, linha in enumerate(aba[1:], start=1) if linha[normalizacao] == '')
+    aba[aberta][normalizacao] = '2026-01-31 12:00:00'
+    aba[-3][coluna(planilha, 'DESLIGAMENTOS', 'DESLIGAMENTO')] = ''
+
+def test_cubo_pelas_linhas_alteradas(planilha):
+    sincronizador, cubo = novo_sincronizador(), CuboDiario()
+    cubo.atualizar(sincronizador.sincronizar(planilha), sincronizador.ultimo_delta)
+    for _ in range(3):
+        editar(planilha)
+        df = sincronizador.sincronizar(planilha)
+        assert sincronizador.ultimo_delta is not None
+        assert 0 < cubo.atualizar(df, sincronizador.ultimo_delta) < len(df)
+        conferir(cubo, df)
+
+def test_cubo_pela_versao_inteira(planilha):
+    sincronizador, cubo = novo_sincronizador(), CuboDiario()
+    cubo.atualizar(sincronizador.sincronizar(planilha))
+    editar(planilha)
+    df = sincronizador.sincronizar(planilha)
+    cubo.atualizar(df)
+    conferir(cubo, df)
+
+def test_cubo_gravado_continua_pelas_alteracoes(planilha, tmp_path):
+    sincronizador, cubo = novo_sincronizador(), CuboDiario()
+    cubo.atualizar(sincronizador.sincronizar(planilha))
+    caminhos = (tmp_path / 'cubo.parquet', tmp_path / 'cubo_linhas.parquet')
+    cubo.salvar(*caminhos)
+    cubo = CuboDiario.carregar(*caminhos)
+    editar(planilha)
+    df = sincronizador.sincronizar(planilha)
+    cubo.atualizar(df, sincronizador.ultimo_delta)
+    conferir(cubo, df)
@@ -0,0 +1,48 @@
+# test_sincronizacao.py
+# A sincronização incremental tem de chegar ao mesmo DataFrame (valores e tipos) que uma carga
+# completa da mesma planilha.
+import pandas as pd
+from Dados.ocorrencias import ABAS_OCORRENCIAS, ABAS_CATALOGO, normalizar_ocorrencias, tipar_ocorrencias
+from Dados.sincronizacao import SincronizadorOcorrencias, JANELA_REVALIDACAO
+
+def novo_sincronizador():
+    return SincronizadorOcorrencias(ABAS_OCORRENCIAS, ABAS_CATALOGO, normalizar_ocorrencias, tipar_ocorrencias)
+
+def conferir_com_carga_completa(sincronizador, planilha):
+    incremental = sincronizador.sincronizar(planilha)
+    assert sincronizador.ultimo_delta is not None   # não caiu na carga completa
+    pd.testing.assert_frame_equal(incremental, novo_sincronizador().sincronizar(planilha))
+    return sincronizador.ultimo_delta[0]
+
+def coluna(planilha, aba, nome):
+    return planilha.abas[aba][0].index(nome)
+
+def test_linha_acrescentada(planilha):
+    sincronizador = novo_sincronizador()
+    sincronizador.sincronizar(planilha)
+    aba = planilha.abas['DESLIGAMENTOS']
+    nova = list(aba[5])
+    nova[coluna(planilha, 'DESLIGAMENTOS', 'IDENTIFICADOR')] = str(len(aba))
+    aba.append(nova)
+
+    assert conferir_com_carga_completa(sincronizador, planilha) == {'DESLIGAMENTOS': {len(aba)}}
+
+def test_linha_recente_editada(planilha):
+    sincronizador = novo_sincronizador()
+    sincronizador.sincronizar(planilha)
+    aba = planilha.abas['EQUIPAMENTOS']
+    aba[-1][coluna(planilha, 'EQUIPAMENTOS', 'UG')] = 'UFV nova'
+
+    assert conferir_com_carga_completa(sincronizador, planilha) == {'EQUIPAMENTOS': {len(aba)}}
+
+def test_linha_aberta_antiga_normalizada(planilha):
+    sincronizador = novo_sincronizador()
+    sincronizador.sincronizar(planilha)
+    aba = planilha.abas['DESLIGAMENTOS']
+    normalizacao = coluna(planilha, 'DESLIGAMENTOS', 'NORMALIZAÇÃO')
+    # Primeira aberta antes da janela de revalidação: só volta pela faixa de linhas abertas
+    indice = next(i for i, linha in enumerate(aba[1:len(aba) - JANELA_REVALIDACAO], start=1)
+                  if linha[normalizacao] == '')
+    aba[indice][normalizacao] = '2026-01-31 12:00:00'
+
+    assert conferir_com_carga_completa(sincronizador, planilha) == {'DESLIGAMENTOS': {indice + 1}}